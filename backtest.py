@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Rolling-origin backtest (өдөр бүрийн таамаглалыг түүхэн дээр дахин тоглуулах)
+- Сүүлийн BACKTEST_CONFIG['days'] өдрийн 00:00 бүр нэг origin: origin-оос өмнөх
+  өгөгдлөөр сургасан моделиор дараагийн 24 цагийг таамаглаж бодит утгатай харьцуулна
+- retrain_every_days: моделийг хэдэн origin тутамд дахин сургах (хооронд нь дахин ашиглана)
+  train_window_days: None бол бүх түүхээр (expanding), тоо бол сүүлийн тэдэн өдрөөр
+- Өдрийн модель: 24 цагийг origin дээрх мэдэгдэж буй lag-аар (main.py-н 24 цагийн таамаглал)
+- Цагийн модель: цаг бүрээс FORECAST_CONFIG['hourly_horizon'] цаг хүртэл recursive
+  (өмнөх алхмын таамаглал дараагийн load-kh болно), lead бүрээр үнэлнэ.
+  Бүх эхлэх цагийг алхам бүрт нэг predict-ээр (vectorized) бодно
+- Feature матрицыг нэг удаа үүсгээд fold бүр мөрийн индексээр хэрчинэ;
+  retrain-ий блок бүр process pool дээр зэрэг ажиллана (joblib/loky, матриц memmap-аар)
+- Температур нь бодит (түүхэн) утга - цаг агаарын таамаглалын алдаа ороогүй
+
+Үр дүн ({dir}/{name}_*): бүх таамаглал, цаг (0-23) тус бүрийн, сар тус бүрийн MAE/RMSE/MAPE/bias
+
+Хэрэглээ:
+    python backtest.py main
+    python backtest.py system_total --days 90
+"""
+
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from config import MODEL_CONFIG, FORECAST_CONFIG, BACKTEST_CONFIG
+from regressors import build_regressor
+from outputs import write_output
+from model_registry import tuned_model_config
+from features import DAILY_FEATURES, HOURLY_FEATURES, HOURLY_LAGS, MAX_HOURLY_HORIZON
+from tune import TARGETS, load_training_frame
+
+warnings.filterwarnings("ignore")
+
+HOURLY_LAG_COLUMNS = [HOURLY_FEATURES.index(f'load-{j}h') for j in range(1, HOURLY_LAGS + 1)]
+
+
+# ==========================
+# Fold-ууд
+# ==========================
+def make_blocks(times, days=None, retrain_every_days=None, train_window_days=None):
+    """
+    Origin-уудыг retrain блокоор бүлэглэх.
+    Буцаах утга: [(train_start, train_end, [(origin, start, end), ...]), ...] - бүгд мөрийн индекс
+    """
+    days = days or BACKTEST_CONFIG['days']
+    retrain_every_days = retrain_every_days or BACKTEST_CONFIG['retrain_every_days']
+    train_window_days = BACKTEST_CONFIG['train_window_days'] if train_window_days is None else train_window_days
+
+    times = pd.DatetimeIndex(times)
+    last_origin = times[-1].normalize()
+    origins = pd.date_range(end=last_origin, periods=days, freq='D')
+    origins = origins[origins > times[0] + pd.Timedelta(days=7)]
+
+    starts = np.searchsorted(times, origins, side='left')
+    ends = np.searchsorted(times, origins + pd.Timedelta(days=1), side='left')
+
+    blocks = []
+    for i in range(0, len(origins), retrain_every_days):
+        block_origin = origins[i]
+        train_end = starts[i]
+        train_start = 0
+        if train_window_days:
+            train_start = np.searchsorted(times, block_origin - pd.Timedelta(days=train_window_days), side='left')
+        folds = [(origins[k], starts[k], ends[k])
+                 for k in range(i, min(i + retrain_every_days, len(origins))) if ends[k] > starts[k]]
+        if folds and train_end > train_start:
+            blocks.append((train_start, train_end, folds))
+    return blocks
+
+
+# ==========================
+# Нэг блок (worker дээр)
+# ==========================
+def recursive_hourly(model, X_hourly, hour_ts, start, end, horizon):
+    """
+    [start, end) мөр бүрээс horizon цаг хүртэл recursive таамаглал.
+    Алхам k-д load-jh нь j <= k бол өмнөх алхмын таамаглал, бусад нь бодит lag.
+    Буцаах утга: (мөрийн индекс, lead, таамаглал) массивууд
+    """
+    origins = np.arange(start, end)
+    preds = []
+    rows_out, leads_out, values_out = [], [], []
+    for k in range(horizon):
+        rows = origins + k
+        # Цагийн цуваа тасарсан (мөр дутуу) эсвэл өгөгдлийн төгсгөл давсан эхлэлүүдийг хасна
+        valid = rows < len(X_hourly)
+        valid[valid] &= hour_ts[rows[valid]] - hour_ts[origins[valid]] == k * 3600
+        if not valid.any():
+            break
+
+        X = X_hourly[np.where(valid, rows, 0)].copy()
+        for j in range(1, min(k, HOURLY_LAGS) + 1):
+            X[:, HOURLY_LAG_COLUMNS[j - 1]] = preds[k - j]
+
+        pred = model.predict(X)
+        preds.append(pred)
+        rows_out.append(rows[valid])
+        leads_out.append(np.full(valid.sum(), k + 1))
+        values_out.append(pred[valid])
+
+    if not rows_out:
+        return np.array([], dtype=int), np.array([], dtype=int), np.array([])
+    return np.concatenate(rows_out), np.concatenate(leads_out), np.concatenate(values_out)
+
+
+def run_block(block, X_daily, X_hourly, y, hour_ts, model_config, horizon):
+    """Нэг retrain блок: моделиудыг нэг удаа сургаж блокийн origin бүрийг үнэлэх"""
+    train_start, train_end, folds = block
+    model_daily = build_regressor(model_config['daily'])
+    model_daily.fit(X_daily[train_start:train_end], y[train_start:train_end])
+    model_hourly = build_regressor(model_config['hourly'])
+    model_hourly.fit(X_hourly[train_start:train_end], y[train_start:train_end])
+
+    frames = []
+    for origin, start, end in folds:
+        frames.append(pd.DataFrame({
+            'origin': origin,
+            'kind': 'daily',
+            'lead': (hour_ts[start:end] - origin.value // 10**9) // 3600 + 1,
+            'row': np.arange(start, end),
+            'forecast': model_daily.predict(X_daily[start:end]),
+        }))
+        rows, leads, values = recursive_hourly(model_hourly, X_hourly, hour_ts, start, end, horizon)
+        frames.append(pd.DataFrame({
+            'origin': origin, 'kind': 'hourly', 'lead': leads, 'row': rows, 'forecast': values,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+# ==========================
+# Үнэлгээ
+# ==========================
+def error_summary(df_pred, by):
+    """by баганаар бүлэглэсэн MAE / RMSE / MAPE / bias"""
+    error = df_pred['forecast'] - df_pred['actual']
+    df = df_pred.assign(abs_error=error.abs(), sq_error=error ** 2,
+                        ape=(error / df_pred['actual']).abs() * 100, error=error)
+    summary = df.groupby(by).agg(
+        n=('error', 'size'),
+        mae=('abs_error', 'mean'),
+        rmse=('sq_error', 'mean'),
+        mape=('ape', 'mean'),
+        bias=('error', 'mean'),
+    ).reset_index()
+    summary['rmse'] = np.sqrt(summary['rmse'])
+    return summary.round({'mae': 2, 'rmse': 2, 'mape': 2, 'bias': 2})
+
+
+def run_backtest(df, model_config, days=None, horizon=None, n_jobs=None):
+    """
+    Feature хүснэгт df дээр rolling-origin backtest.
+    Буцаах утга: таамаглал бүрийн хүснэгт (origin, kind, lead, time_, actual, forecast)
+    """
+    horizon = min(horizon or FORECAST_CONFIG['hourly_horizon'], MAX_HOURLY_HORIZON)
+    n_jobs = BACKTEST_CONFIG['max_workers'] if n_jobs is None else n_jobs
+
+    # Нэг удаа үүсгэсэн матрицууд (worker-ууд memmap-аар хуваалцана)
+    X_daily = np.ascontiguousarray(df[DAILY_FEATURES].to_numpy(dtype='float64'))
+    X_hourly = np.ascontiguousarray(df[HOURLY_FEATURES].to_numpy(dtype='float64'))
+    y = df['load'].to_numpy(dtype='float64')
+    hour_ts = df['time_'].to_numpy(dtype='datetime64[s]').astype('int64')
+
+    blocks = make_blocks(df['time_'], days)
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(run_block)(block, X_daily, X_hourly, y, hour_ts, model_config, horizon)
+        for block in blocks
+    )
+
+    df_pred = pd.concat(results, ignore_index=True)
+    df_pred['time_'] = df['time_'].to_numpy()[df_pred['row']]
+    df_pred['actual'] = y[df_pred['row']]
+    return df_pred.drop(columns='row')[['origin', 'kind', 'lead', 'time_', 'actual', 'forecast']]
+
+
+def print_summary(df_pred):
+    """Нийт, цагийн, lead-ийн товч тайлан"""
+    overall = error_summary(df_pred, ['kind'])
+    print("\n📊 Нийт:")
+    for _, row in overall.iterrows():
+        print(f"   {row['kind']:7s} MAE {row['mae']:7.2f}  RMSE {row['rmse']:7.2f}  "
+              f"MAPE {row['mape']:5.2f}%  bias {row['bias']:+7.2f}  ({row['n']} цаг)")
+
+    by_lead = error_summary(df_pred[df_pred['kind'] == 'hourly'], ['lead'])
+    print("\n📊 Цагийн модель, lead тус бүр:")
+    for _, row in by_lead.iterrows():
+        print(f"   +{int(row['lead'])}ц  MAE {row['mae']:7.2f}  MAPE {row['mape']:5.2f}%")
+
+    by_hour = error_summary(df_pred.assign(hour=df_pred['time_'].dt.hour), ['kind', 'hour'])
+    worst = by_hour[by_hour['kind'] == 'daily'].nlargest(3, 'mae')
+    print("\n📊 Өдрийн моделийн хамгийн муу цагууд: " +
+          ", ".join(f"{h:02d}:00 ({m:.1f})" for h, m in zip(worst['hour'], worst['mae'])))
+
+
+# ==========================
+# CLI
+# ==========================
+def parse_args(argv):
+    """python backtest.py <main|system_total> [--days N]"""
+    name = argv[0] if argv and not argv[0].startswith('--') else 'main'
+    if name not in TARGETS:
+        raise ValueError(f"Нэр нь {tuple(TARGETS)}-ийн нэг байх ёстой: {name}")
+    days = BACKTEST_CONFIG['days']
+    for i, arg in enumerate(argv):
+        if arg == '--days' and i + 1 < len(argv):
+            days = int(argv[i + 1])
+        elif arg.startswith('--days='):
+            days = int(arg.split('=', 1)[1])
+    return name, days
+
+
+def main(argv=None):
+    name, days = parse_args(sys.argv[1:] if argv is None else argv)
+    model_config = tuned_model_config(name, MODEL_CONFIG)
+    started = time.perf_counter()
+
+    print(f"🔁 Rolling-origin backtest: {name}, сүүлийн {days} өдөр, "
+          f"{BACKTEST_CONFIG['retrain_every_days']} өдөр тутам дахин сургана")
+    df = load_training_frame(name)
+    print(f"   Өгөгдөл: {len(df)} мөр, {df['time_'].min()} → {df['time_'].max()}")
+
+    df_pred = run_backtest(df, model_config, days)
+    print(f"   ✅ {df_pred['origin'].nunique()} origin, {len(df_pred)} таамаглал "
+          f"({time.perf_counter() - started:.1f} сек)")
+    print_summary(df_pred)
+
+    os.makedirs(BACKTEST_CONFIG['dir'], exist_ok=True)
+    prefix = os.path.join(BACKTEST_CONFIG['dir'], name)
+    write_output(df_pred, f"{prefix}_predictions")
+    write_output(error_summary(df_pred.assign(hour=df_pred['time_'].dt.hour), ['kind', 'hour']), f"{prefix}_by_hour")
+    write_output(error_summary(df_pred.assign(month=df_pred['time_'].dt.strftime('%Y-%m')), ['kind', 'month']),
+                 f"{prefix}_by_month")
+    write_output(error_summary(df_pred, ['kind', 'lead']), f"{prefix}_by_lead")
+    print(f"\n💾 Үр дүн: {prefix}_*")
+
+
+if __name__ == '__main__':
+    main()
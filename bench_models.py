@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Регрессийн backend-уудыг ижил feature матриц дээр харьцуулах
+- regressors.ENGINES-ийн backend бүрийг main.py-тай ижил train/test хуваалтаар
+  (shuffle=False, MODEL_CONFIG['test_size']) сургаж хэмжинэ:
+    сургалтын хугацаа, batch predict (мөр бүрт), нэг мөрийн predict-ийн хоцрогдол
+    (цагийн recursive таамаглал нэг мөрөөр predict хийдэг), моделийн хэмжээ, MAE / MAPE
+- MODEL_CONFIG-д сонгосон backend нь MODEL_CONFIG-ийн параметрээр,
+  бусад нь regressors.ENGINE_DEFAULTS-аар сургагдана
+
+Хэрэглээ:
+    python bench_models.py main
+    python bench_models.py system_total --kind hourly
+"""
+
+import io
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error
+
+from config import MODEL_CONFIG
+from regressors import ENGINES, ENGINE_DEFAULTS, build_regressor, engine_name
+from model_registry import tuned_model_config
+from tune import KINDS, load_training_frame, parse_args
+
+warnings.filterwarnings("ignore")
+
+SINGLE_ROW_REPEATS = 50
+
+
+def model_size_bytes(model):
+    """joblib-ээр хадгалахад эзлэх хэмжээ"""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.getbuffer().nbytes
+
+
+def benchmark_engine(params, x_train, y_train, x_test, y_test):
+    """Нэг backend-ийг сургаж хэмжих"""
+    model = build_regressor(params)
+
+    started = time.perf_counter()
+    model.fit(x_train, y_train)
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    y_pred = model.predict(x_test)
+    batch_seconds = time.perf_counter() - started
+
+    row = x_test.iloc[[-1]]
+    timings = []
+    for _ in range(SINGLE_ROW_REPEATS):
+        started = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - started)
+
+    return {
+        'engine': engine_name(params),
+        'fit_seconds': round(fit_seconds, 3),
+        'predict_us_per_row': round(batch_seconds / len(x_test) * 1e6, 2),
+        'single_row_ms': round(float(np.median(timings)) * 1e3, 3),
+        'size_mb': round(model_size_bytes(model) / 1e6, 2),
+        'mae': round(mean_absolute_error(y_test, y_pred), 2),
+        'mape': round(mean_absolute_percentage_error(y_test, y_pred) * 100, 2),
+    }
+
+
+def benchmark(df, model_config, kind):
+    """ENGINES бүрийг kind-ийн feature матриц дээр харьцуулах"""
+    X = df[KINDS[kind]].astype('float64')
+    y = df['load'].astype('float64')
+    n_train = int(len(df) * (1 - model_config['test_size']))
+    x_train, x_test = X.iloc[:n_train], X.iloc[n_train:]
+    y_train, y_test = y.iloc[:n_train], y.iloc[n_train:]
+
+    configured = engine_name(model_config[kind])
+    rows = []
+    for engine in ENGINES:
+        params = model_config[kind] if engine == configured else ENGINE_DEFAULTS[engine]
+        rows.append(benchmark_engine(params, x_train, y_train, x_test, y_test))
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    name, kinds = parse_args(sys.argv[1:] if argv is None else argv)
+    model_config = tuned_model_config(name, MODEL_CONFIG)
+
+    print(f"⏱️ Моделийн backend харьцуулалт: {name}")
+    df = load_training_frame(name)
+    print(f"   Өгөгдөл: {len(df)} мөр, test {model_config['test_size']:.0%}")
+
+    results = {}
+    for kind in kinds:
+        results[kind] = benchmark(df, model_config, kind)
+        print(f"\n📊 {kind}:")
+        print(results[kind].to_string(index=False))
+    return results
+
+
+if __name__ == '__main__':
+    main()
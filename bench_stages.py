@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline-ийн үе шат бүрийг тусад нь хэмжих бенчмарк (synthetic өгөгдөл дээр)
+- Өгөгдөл: synthetic_data.generate_raw (seed-тэй) - MySQL / Open-Meteo / Laravel шаардлагагүй
+- Хэмжээ: BENCH_CONFIG['years'] (жишээ нь 1, 5, 10 жилийн минутын өгөгдөл) - scaling
+  хугацаа огцом өсөх цэгийг production-оос өмнө илрүүлнэ
+- Үе шат бүрийг warmup-ын дараа repeats удаа ажиллуулж min / median / mean / stddev
+  (pytest-benchmark-ийн адил); сургалт шиг хүнд үе шатууд heavy_repeats удаа
+- --save NAME: үр дүнг {dir}/NAME.json-д хадгална
+  --compare NAME: хадгалсантай median-аар харьцуулж regression_threshold-оос удааширсныг тэмдэглэнэ
+
+Үе шатууд:
+    ingest_hourly      - түүхий мөрүүдийг цаг + VAR-аар нэгтгэх (aggregate_raw_hourly)
+    battery_netting    - батарейн цэнэглэлтийг хасах (build_load_frame)
+    temperature_merge  - load + температур merge
+    lag_features       - merge + lag / календарийн feature (build_feature_frame)
+    train              - өдрийн + цагийн модель сургах (MODEL_CONFIG)
+    predict_day_ahead  - 24 цагийн таамаглал (forecast_day_ahead)
+    predict_hourly     - сүүлийн хоногийн recursive цагийн таамаглал (forecast_hourly)
+    serialize_payload  - түүхийг Laravel-ийн JSON payload болгох (frame_to_records + _encode)
+    plot               - 24 цагийн графикийг PNG болгох (render_chart)
+
+Хэрэглээ:
+    python bench_stages.py --years 1,5,10 --save baseline
+    python bench_stages.py --years 1 --compare baseline
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import MODEL_CONFIG, BENCH_CONFIG
+from regressors import build_regressor
+from hourly_store import aggregate_raw_hourly, build_load_frame
+from features import DAILY_FEATURES, HOURLY_FEATURES, build_feature_frame, forecast_day_ahead, forecast_hourly
+from laravel_client import frame_to_records, _encode
+from plotting import new_chart, add_series, render_chart
+from synthetic_data import generate_raw, generate_temperature
+
+warnings.filterwarnings("ignore")
+
+
+# ==========================
+# Хэмжих
+# ==========================
+def measure(func, repeats=None, warmup=None):
+    """func-ийг warmup + repeats удаа ажиллуулж хугацааны статистик буцаах"""
+    repeats = repeats or BENCH_CONFIG['repeats']
+    warmup = BENCH_CONFIG['warmup'] if warmup is None else warmup
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    timings = np.array(timings)
+    return {
+        'min': float(timings.min()),
+        'median': float(np.median(timings)),
+        'mean': float(timings.mean()),
+        'stddev': float(timings.std(ddof=1)) if len(timings) > 1 else 0.0,
+        'rounds': len(timings),
+    }
+
+
+def run_stages(years, seed=None):
+    """years жилийн synthetic өгөгдөл дээр бүх үе шатыг хэмжих"""
+    seed = BENCH_CONFIG['seed'] if seed is None else seed
+    heavy = {'repeats': BENCH_CONFIG['heavy_repeats'], 'warmup': 0}
+
+    df_raw = generate_raw(years=years, seed=seed)
+    df_hourly = aggregate_raw_hourly(df_raw)
+    df_load = build_load_frame(df_hourly, tz_offset_hours=8)
+    df_temp = generate_temperature(df_load['time_'], seed=seed)
+    df = build_feature_frame(df_load, df_temp, weekday='excel')
+
+    model_daily = build_regressor(MODEL_CONFIG['daily']).fit(df[DAILY_FEATURES], df['load'])
+    model_hourly = build_regressor(MODEL_CONFIG['hourly']).fit(df[HOURLY_FEATURES], df['load'])
+
+    last_day = df['time_'].max().normalize()
+    future_times = [last_day + timedelta(hours=h) for h in range(1, 25)]
+    fallback_temp = df['temp'].tail(24).mean()
+
+    def _train():
+        build_regressor(MODEL_CONFIG['daily']).fit(df[DAILY_FEATURES], df['load'])
+        build_regressor(MODEL_CONFIG['hourly']).fit(df[HOURLY_FEATURES], df['load'])
+
+    def _payload():
+        return _encode({'type': 'history', 'data': frame_to_records(df_load, 'load', ['system_load'])})
+
+    png_path = os.path.join(tempfile.mkdtemp(prefix='bench_plot_'), 'chart.png')
+
+    def _plot():
+        df_day = df.tail(24)
+        chart = new_chart('Бенчмарк', (df_day['time_'].min(), df_day['time_'].max()))
+        add_series(chart, 'Бодит', df_day['time_'], df_day['load'], color='red', linewidth=2)
+        add_series(chart, 'Таамаглал', df_day['time_'], model_daily.predict(df_day[DAILY_FEATURES]),
+                   color='dodgerblue', linestyle='--')
+        render_chart(chart, png_path, output='png')
+
+    stages = [
+        ('ingest_hourly', len(df_raw), lambda: aggregate_raw_hourly(df_raw), {}),
+        ('battery_netting', len(df_hourly), lambda: build_load_frame(df_hourly, tz_offset_hours=8), {}),
+        ('temperature_merge', len(df_load), lambda: pd.merge(df_load, df_temp, on='time_', how='inner'), {}),
+        ('lag_features', len(df_load), lambda: build_feature_frame(df_load, df_temp, weekday='excel'), {}),
+        ('train', len(df), _train, heavy),
+        ('predict_day_ahead', 24,
+         lambda: forecast_day_ahead(model_daily, df, df_temp, future_times, fallback_temp), {}),
+        ('predict_hourly', 24 + 3,
+         lambda: forecast_hourly(model_hourly, df, df_temp, last_day - timedelta(hours=23),
+                                 df['time_'].max() + timedelta(hours=3)), {}),
+        ('serialize_payload', len(df_load), _payload, {}),
+        ('plot', 24, _plot, {}),
+    ]
+
+    results = []
+    for stage, rows, func, options in stages:
+        stats = measure(func, **options)
+        results.append(dict(years=years, stage=stage, rows=rows, **stats))
+        print(f"   {stage:18s} {rows:>10,} мөр  median {stats['median'] * 1e3:10.1f} мс  "
+              f"(min {stats['min'] * 1e3:.1f}, ±{stats['stddev'] * 1e3:.1f}, {stats['rounds']} удаа)")
+    return results
+
+
+# ==========================
+# Хадгалах / харьцуулах
+# ==========================
+def _result_path(name):
+    return os.path.join(BENCH_CONFIG['dir'], f"{name}.json")
+
+
+def save_results(results, name):
+    os.makedirs(BENCH_CONFIG['dir'], exist_ok=True)
+    path = _result_path(name)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=1)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def compare_results(results, name):
+    """Хадгалсан үр дүнтэй median-аар харьцуулах. Буцаах утга: удааширсан үе шатууд"""
+    with open(_result_path(name), 'r', encoding='utf-8') as f:
+        baseline = {(r['years'], r['stage']): r for r in json.load(f)}
+
+    threshold = BENCH_CONFIG['regression_threshold']
+    regressions = []
+    print(f"\n📊 '{name}'-тэй харьцуулалт (median):")
+    for r in results:
+        base = baseline.get((r['years'], r['stage']))
+        if base is None:
+            continue
+        ratio = r['median'] / base['median'] if base['median'] > 0 else float('inf')
+        flag = '🔴' if ratio > threshold else '✅'
+        print(f"   {flag} {r['years']:>2} жил {r['stage']:18s} ×{ratio:.2f}")
+        if ratio > threshold:
+            regressions.append(r['stage'])
+    return regressions
+
+
+# ==========================
+# CLI
+# ==========================
+def parse_args(argv):
+    """--years 1,5,10  --save NAME  --compare NAME"""
+    args = {'years': BENCH_CONFIG['years'], 'save': None, 'compare': None}
+    for i, arg in enumerate(argv):
+        key, _, value = arg.lstrip('-').partition('=')
+        if key not in args:
+            continue
+        if not value and i + 1 < len(argv):
+            value = argv[i + 1]
+        args[key] = [float(y) if '.' in y else int(y) for y in value.split(',')] if key == 'years' else value
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    results = []
+    for years in args['years']:
+        print(f"\n⏱️ {years} жилийн synthetic өгөгдөл:")
+        results.extend(run_stages(years))
+
+    if args['save']:
+        print(f"\n💾 Хадгалагдлаа: {save_results(results, args['save'])}")
+    if args['compare']:
+        regressions = compare_results(results, args['compare'])
+        if regressions:
+            print(f"\n⚠️ Удааширсан үе шат: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
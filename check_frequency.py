@@ -3,28 +3,13 @@
 Өгөгдлийн давтамж шалгах
 """
 import pandas as pd
-from sqlalchemy import create_engine
-from config import DB_CONFIG
-
-engine = create_engine(
-    "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
-)
+from db import read_named
+from hourly_store import ALL_VARS
 
 print("📊 Өгөгдлийн давтамж шалгаж байна...\n")
 
-# Сүүлийн 100 бичлэг авах
-query = """
-SELECT
-    TIMESTAMP_S,
-    VAR,
-    CAST(VALUE AS DECIMAL(10,2)) AS value
-FROM z_conclusion
-WHERE VAR IN ('SYSTEM_TOTAL_P', 'ERDENE_SPP_BHB_TOTAL_P', 'BAGANUUR_BESS_TOTAL_P_T', 'SONGINO_BESS_TOTAL_P')
-ORDER BY TIMESTAMP_S DESC
-LIMIT 200
-"""
-
-df_raw = pd.read_sql(query, engine)
+# Сүүлийн 200 бичлэг авах
+df_raw = read_named('latest_raw', vars=ALL_VARS, limit=200)
 df_raw['time_'] = pd.to_datetime(df_raw['TIMESTAMP_S'], unit='s')
 df_raw['hour_group'] = df_raw['time_'].dt.floor('H')
 
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Pushdown (MySQL дээрх pivot) болон pandas аргын үр дүнг харьцуулах
+"""
+import pandas as pd
+from datetime import datetime, timedelta
+from hourly_store import ASSET_COLUMNS, fetch_since, aggregate_raw_hourly, build_load_frame, fetch_hourly_pivot
+from db import get_engine
+
+engine = get_engine()
+
+# Сүүлийн хэдэн хоногийг шалгах
+DAYS = 7
+since = datetime.now() - timedelta(days=DAYS)
+since_ts = int(since.timestamp()) // 3600 * 3600
+print(f"📅 Шалгах хугацаа: сүүлийн {DAYS} хоног ({since.strftime('%Y-%m-%d %H:00')}-аас)\n")
+
+# 1️⃣ pandas арга
+print("=" * 60)
+print("1️⃣ PANDAS арга (түүхий мөрүүд):")
+print("=" * 60)
+df_raw = fetch_since(engine, since_ts)
+df1 = build_load_frame(aggregate_raw_hourly(df_raw), tz_offset_hours=8)
+print(f"Түүхий мөр: {len(df_raw)}, цаг: {len(df1)}")
+
+# 2️⃣ Pushdown арга
+print("\n" + "=" * 60)
+print("2️⃣ PUSHDOWN арга (MySQL pivot):")
+print("=" * 60)
+df2 = fetch_hourly_pivot(engine, since_ts, tz_offset_hours=8)
+print(f"Цаг: {len(df2)}")
+
+# 3️⃣ Харьцуулах
+print("\n" + "=" * 60)
+print("3️⃣ ХАРЬЦУУЛАЛТ:")
+print("=" * 60)
+
+if len(df1) == len(df2):
+    print(f"✅ Мөр тоо тохирч байна: {len(df1)} цаг")
+else:
+    print(f"❌ Мөр тоо ялгаатай: pandas={len(df1)}, pushdown={len(df2)}")
+
+merged = pd.merge(df1, df2, on='time_', suffixes=('_pandas', '_pushdown'))
+
+if len(merged) > 0:
+    for col in ['system_load'] + ASSET_COLUMNS + ['load']:
+        max_diff = (merged[f'{col}_pandas'] - merged[f'{col}_pushdown']).abs().max()
+        if max_diff < 0.01:
+            print(f"✅ {col}: адилхан (хамгийн их зөрүү: {max_diff:.4f})")
+        else:
+            print(f"⚠️ {col}: зөрүүтэй (хамгийн их зөрүү: {max_diff:.2f})")
+else:
+    print("❌ Нэгдсэн өгөгдөл байхгүй - цагууд таарахгүй байна")
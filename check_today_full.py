@@ -3,13 +3,9 @@
 Өнөөдрийн бүх өгөгдөл шалгах
 """
 import pandas as pd
-from sqlalchemy import create_engine
 from datetime import datetime
-from config import DB_CONFIG
-
-engine = create_engine(
-    "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
-)
+from db import read_named
+from queries import day_range
 
 today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 today_str = today.strftime('%Y-%m-%d')
@@ -17,17 +13,8 @@ print(f"📅 Өнөөдөр: {today_str}")
 print(f"⏰ Одоо: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 # Өнөөдрийн бүх өгөгдлийг татах
-query = f"""
-SELECT
-    TIMESTAMP_S,
-    CAST(VALUE AS DECIMAL(10,2)) AS value
-FROM z_conclusion
-WHERE VAR = 'SYSTEM_TOTAL_P'
-    AND FROM_UNIXTIME(TIMESTAMP_S) >= '{today_str} 00:00:00'
-ORDER BY TIMESTAMP_S
-"""
-
-df_raw = pd.read_sql(query, engine)
+start_ts, end_ts = day_range()
+df_raw = read_named('raw_range', vars=['SYSTEM_TOTAL_P'], start_ts=start_ts, end_ts=end_ts)
 df_raw['time_'] = pd.to_datetime(df_raw['TIMESTAMP_S'], unit='s')
 
 print(f"\n📊 Өнөөдрийн бүх өгөгдөл:")
@@ -3,13 +3,11 @@
 Хоёр графикийн өгөгдлийг харьцуулах
 """
 import pandas as pd
-from sqlalchemy import create_engine
 from datetime import datetime
-from config import DB_CONFIG
+from queries import read_last_value_per_hour, last_value_per_hour_query, day_range
+from db import get_engine, read_sql
 
-engine = create_engine(
-    "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
-)
+engine = get_engine()
 
 today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 print(f"📅 Өнөөдөр: {today.date()}\n")
@@ -19,27 +17,9 @@ print("=" * 60)
 print("1️⃣ TODAY_ACTUAL.PY-н query:")
 print("=" * 60)
 
-query1 = """
-SELECT
-    FROM_UNIXTIME(t.max_ts, '%%Y-%%m-%%d %%H:00:00') AS time_,
-    z.VALUE AS load_value
-FROM z_conclusion z
-JOIN (
-    SELECT
-        MAX(TIMESTAMP_S) AS max_ts
-    FROM z_conclusion
-    WHERE VAR = 'SYSTEM_TOTAL_P'
-      AND TIMESTAMP_S >= UNIX_TIMESTAMP(CURDATE())
-      AND TIMESTAMP_S < UNIX_TIMESTAMP(CURDATE() + INTERVAL 1 DAY)
-    GROUP BY FROM_UNIXTIME(TIMESTAMP_S, '%%Y-%%m-%%d %%H')
-) t ON z.TIMESTAMP_S = t.max_ts
-WHERE z.VAR = 'SYSTEM_TOTAL_P'
-ORDER BY time_
-"""
-
-df1 = pd.read_sql(query1, engine)
-df1['time_'] = pd.to_datetime(df1['time_'])
-df1['load_value'] = pd.to_numeric(df1['load_value'])
+start_ts, end_ts = day_range()
+df1 = read_last_value_per_hour(engine, start_ts=start_ts, end_ts=end_ts, calculation=None)
+df1 = df1.rename(columns={'value': 'load_value'})[['time_', 'load_value']]
 
 print(f"Өгөгдөл: {len(df1)} цаг")
 print(f"\n{df1.to_string(index=False)}")
@@ -49,23 +29,7 @@ print("\n" + "=" * 60)
 print("2️⃣ MAIN_SYSTEM_TOTAL.PY-н query (бүх түүх):")
 print("=" * 60)
 
-query2 = """
-SELECT
-    t.max_ts AS TIMESTAMP_S,
-    CAST(z.VALUE AS DECIMAL(10,2)) AS value
-FROM z_conclusion z
-JOIN (
-    SELECT
-        MAX(TIMESTAMP_S) AS max_ts
-    FROM z_conclusion
-    WHERE VAR = 'SYSTEM_TOTAL_P'
-    GROUP BY FROM_UNIXTIME(TIMESTAMP_S, '%%Y-%%m-%%d %%H')
-) t ON z.TIMESTAMP_S = t.max_ts
-WHERE z.VAR = 'SYSTEM_TOTAL_P'
-ORDER BY t.max_ts
-"""
-
-df2_raw = pd.read_sql(query2, engine)
+df2_raw = read_sql(last_value_per_hour_query(calculation=None))
 df2_raw['time_'] = pd.to_datetime(df2_raw['TIMESTAMP_S'], unit='s')
 
 # Зөвхөн өнөөдрийн өгөгдөл
@@ -21,6 +21,18 @@ DB_CONFIG = {
 LARAVEL_API_URL = "http://localhost:8000/api/forecast/store"
 LARAVEL_LAST_HISTORY_URL = "http://localhost:8000/api/forecast/last-history-time"
 
+# batch_size мөр тутамд хувааж max_workers хүртэл зэрэг илгээнэ
+# gzip: True бол body-г шахаж Content-Encoding: gzip илгээнэ
+#       (Laravel талд gzip body задлах middleware шаардлагатай)
+LARAVEL_CONFIG = {
+    'timeout': 30,
+    'batch_size': 1000,
+    'max_workers': 4,
+    'max_retries': 2,
+    'backoff_seconds': 1.0,
+    'gzip': False
+}
+
 # ==========================
 # Ulaanbaatar координат
 # ==========================
@@ -33,13 +45,18 @@ LOCATION = {
 # ==========================
 # Модель тохиргоо
 # ==========================
+# engine: 'adaboost' (анхны) эсвэл 'hist_gbm' (HistGradientBoosting, бүх цөм) - regressors.py
+# hist_gbm-ийн параметр: max_iter, learning_rate, max_depth, max_leaf_nodes,
+#   min_samples_leaf, l2_regularization
 MODEL_CONFIG = {
     'daily': {
+        'engine': 'adaboost',
         'max_depth': 12,
         'n_estimators': 50,
         'random_state': 42
     },
     'hourly': {
+        'engine': 'adaboost',
         'max_depth': 15,
         'n_estimators': 50,
         'random_state': 42
@@ -50,20 +67,39 @@ MODEL_CONFIG = {
 # ==========================
 # Файлын нэрс
 # ==========================
+# Өргөтгөлийг OUTPUT_CONFIG['format']-аар тодорхойлно (plot-оос бусад)
 FILES = {
-    'temperature': 'temperature_full.xlsx',
-    'daily_forecast': 'forecast_daily_24h.csv',
-    'hourly_forecast': 'forecast_hourly_3h.csv',
-    'history': 'forecast_history.csv',
-    'plot': 'forecast_today.png'
+    'temperature': 'temperature_full',
+    'daily_forecast': 'forecast_daily_24h',
+    'hourly_forecast': 'forecast_hourly_3h',
+    'history': 'forecast_history',
+    'system_total_daily': 'forecast_system_total_daily',
+    'system_total_hourly': 'forecast_system_total_hourly',
+    'system_total_history': 'forecast_system_total_history',
+    'plot': 'forecast_today.png',
+    'system_total_plot': 'forecast_system_total.png'
+}
+
+# ==========================
+# Үр дүнгийн файлын формат (outputs.py)
+# ==========================
+# format: 'parquet' эсвэл 'feather' (үндсэн, төрөлтэй, хурдан)
+# exports: нэмэлтээр бичих формат - ['csv'], ['csv', 'xlsx'] гэх мэт (openpyxl шаардлагатай)
+OUTPUT_CONFIG = {
+    'format': 'parquet',
+    'exports': []
 }
 
 # ==========================
 # График тохиргоо
 # ==========================
+# output: 'png', 'json' (вэб frontend-д зориулсан цуваа), 'both', 'none'
+# background: True бол PNG-г background thread дээр зурна (Laravel илгээлт хүлээхгүй)
 PLOT_CONFIG = {
     'figsize': (16, 8),
     'dpi': 200,
+    'output': 'png',
+    'background': True,
     'colors': {
         'actual': 'red',
         'daily': 'dodgerblue',
@@ -72,3 +108,243 @@ PLOT_CONFIG = {
         'actual_point': 'darkgreen'
     }
 }
+
+# ==========================
+# Өгөгдөл татах (ingestion) тохиргоо
+# ==========================
+# mode:
+#   'store' - локал цагийн сан + watermark (зөвхөн шинэ мөрүүдийг татна)
+#   'pushdown' - MySQL дээр цагаар pivot хийж нэгтгэсэн өгөгдөл татах
+#               (алдаа гарвал 'full' руу шилжинэ, check_pushdown.py-аар шалгана)
+#   'stream' - бүх түүхий өгөгдлийг server-side cursor-оор chunk_rows мөрөөр урсгаж
+#              цагийн нэгтгэлд шууд нугалах (санах ой нь chunk-ийн хэмжээгээр хязгаарлагдана)
+#   'full'  - бүх түүхий өгөгдлийг MySQL-ээс дахин татах (хуучин арга)
+# start: эхлэх цаг - MySQL session-ий цагийн бүсээр (UTC + QUERY_CONFIG['db_tz_offset_hours']),
+#        анхны UNIX_TIMESTAMP('2024-01-05 00:00:00')-тэй ижил.
+#        'store' / 'stream' горимд main_system_total.py-н SYSTEM_TOTAL_P түүх ч энэ цагаас
+#        эхэлнэ (анхны query бүх түүхийг уншдаг байсан, 'full' горим одоо ч бүгдийг уншина).
+#        Илүү урт түүхээр сургах бол start-ыг эрт болгоод store_dir-ийг устгаж дахин татна
+#        (watermark байгаа санд өмнөх цагууд нэмэгдэхгүй)
+# value_dtype: түүхий value баганын төрөл ('float64' эсвэл санах ой хэмнэх 'float32')
+# reader: 'pandas' (pd.read_sql) эсвэл 'connectorx' (Arrow-д суурилсан, pip install connectorx)
+# chunk_rows: 'stream' горим болон 'store'-ийн татахад нэг chunk-ийн мөрийн тоо
+INGEST_CONFIG = {
+    'mode': 'store',
+    'start': '2024-01-05 00:00:00',
+    'store_dir': 'data_store',
+    'overlap_hours': 3,
+    'value_dtype': 'float64',
+    'reader': 'pandas',
+    'chunk_rows': 500000
+}
+
+# ==========================
+# Feature сан (цагийн сангийн хажууд, {store_dir}/features/{name})
+# ==========================
+# enabled: False бол feature-ийг ажиллалт бүрт бүх түүхээр дахин бодно.
+#          True бол хадгалсан оролттой (load + температур) зөрсөн цагаас хойшхийг л бодно
+# temperature_backfill_hours: сүүлийн хэдэн цагийн температур хожим өөрчлөгдөж болох вэ
+#          (Archive API-ийн сүүлийн өдрүүдийн null, өнөөдрийн Forecast → Archive утга).
+#          Утгыг зөвхөн энэ цонхонд (overlap_hours-аас багагүй) харьцуулна
+FEATURE_STORE_CONFIG = {
+    'enabled': True,
+    'temperature_backfill_hours': 168
+}
+
+# ==========================
+# Хадгалах / үүсгүүр станцууд (батарей, нарны станц г.м.)
+# ==========================
+# system_var: системийн нийт ачааллын VAR (цагийн max)
+# assets: станц бүр
+#   var         - z_conclusion.VAR
+#   column      - df_load дахь баганын нэр
+#   aggregation - цагийн нэгтгэл: 'mean', 'max', 'min', 'last'
+#   netting     - 'charge' - зөвхөн цэнэглэлтийг (сөрөг утгын абсолют) ачааллаас хасна
+#                 'both'   - хоёр чиглэлд: цэнэглэлтийг хасаж, цэнэг өгсөнийг нэмнэ
+#                 'none'   - баганыг хадгалах ч ачааллаас хасахгүй
+# Станц нэмэхэд түүхий өгөгдлийг дахин давтаж уншихгүй (нэг pivot-оор бодогдоно).
+# 'max' / 'min' нэгтгэл нь цагийн сангийн 'min' баганыг ашиглана - хуучин сангаа дахин үүсгэнэ
+ASSET_CONFIG = {
+    'system_var': 'SYSTEM_TOTAL_P',
+    'assets': [
+        {'var': 'ERDENE_SPP_BHB_TOTAL_P', 'column': 'erdene_bess', 'aggregation': 'mean', 'netting': 'charge'},
+        {'var': 'BAGANUUR_BESS_TOTAL_P_T', 'column': 'baganuur_bess', 'aggregation': 'mean', 'netting': 'charge'},
+        {'var': 'SONGINO_BESS_TOTAL_P', 'column': 'songino_bess', 'aggregation': 'mean', 'netting': 'charge'},
+    ]
+}
+
+# ==========================
+# SQL query тохиргоо
+# ==========================
+# db_tz_offset_hours: TIMESTAMP_S-ийг цаг болгоход нэмэх цаг (FROM_UNIXTIME-тэй адил)
+# use_window: "цаг бүрийн сүүлийн утга"-д ROW_NUMBER() ашиглах (MySQL 8+)
+QUERY_CONFIG = {
+    'db_tz_offset_hours': 0,
+    'use_window': False
+}
+
+# ==========================
+# Температурын кэш
+# ==========================
+WEATHER_CONFIG = {
+    'cache_path': 'temperature_cache.sqlite',
+    'incomplete_retry_hours': 6,
+    # Archive API зэрэгцээ татах
+    'chunk_days': 90,
+    'max_workers': 4,
+    'timeout': 30,
+    'max_retries': 4,
+    'backoff_seconds': 1.0,
+    # Token bucket: секундэд хүсэлт, зэрэг хүсэлтийн дээд хэмжээ
+    'rate_per_second': 2,
+    'burst': 4
+}
+
+# ==========================
+# Моделийн registry
+# ==========================
+REGISTRY_CONFIG = {
+    'dir': 'models',
+    'keep_last': 10
+}
+
+# ==========================
+# Hyperparameter тааруулалт (python tune.py main|system_total)
+# ==========================
+# apply: main.py / main_system_total.py нь {dir}-ийн хамгийн сүүлийн хувилбарын search_space
+#        параметрүүдийг MODEL_CONFIG дээр давхарлах эсэх. MODEL_CONFIG (engine, test_size г.м.)
+#        тааруулснаас хойш өөрчлөгдсөн бол тааруулгыг үл тооцно - tune.py-г дахин ажиллуулна
+# min_resources: successive halving-ийн эхний шатны мөрийн тоо ('exhaust' = автоматаар)
+# mae_tolerance: MAE нь хамгийн сайнаасаа энэ хувь дотор байвал илүү хурдан нэр дэвшигчийг сонгоно
+# max_workers: -1 = бүх CPU
+TUNING_CONFIG = {
+    'dir': 'tuning',
+    'apply': True,
+    'n_splits': 5,
+    'factor': 3,
+    'min_resources': 'exhaust',
+    'mae_tolerance': 0.01,
+    'max_workers': -1,
+    # MODEL_CONFIG-ийн engine бүрийн хайх орон зай
+    'search_space': {
+        'adaboost': {
+            'max_depth': [6, 9, 12, 15, 18],
+            'min_samples_leaf': [1, 5, 20],
+            'n_estimators': [20, 50, 100],
+            'learning_rate': [0.3, 1.0],
+            'loss': ['linear', 'square']
+        },
+        'hist_gbm': {
+            'max_iter': [100, 300, 600],
+            'learning_rate': [0.03, 0.1, 0.3],
+            'max_leaf_nodes': [15, 31, 63],
+            'min_samples_leaf': [10, 20, 50],
+            'l2_regularization': [0.0, 1.0]
+        }
+    }
+}
+
+# ==========================
+# Сургалт / таамаглалын хуваарь
+# ==========================
+# mode: 'auto' (доорх дүрмээр), 'train' (үргэлж сургах), 'predict' (зөвхөн predict)
+# Командын мөрөөс: python main.py --mode predict
+SCHEDULE_CONFIG = {
+    'mode': 'auto',
+    'retrain_hour': 2,
+    'retrain_after_new_hours': 24,
+    'minute': 5
+}
+
+# ==========================
+# Таамаглалын хугацаа
+# ==========================
+# hourly_horizon: сүүлийн бодит цагаас хойш хэдэн цаг таамаглах (хамгийн ихдээ 48)
+FORECAST_CONFIG = {
+    'hourly_horizon': 3
+}
+
+# ==========================
+# Rolling-origin backtest (python backtest.py main|system_total)
+# ==========================
+# days: хэдэн өдрийн origin дахин тоглуулах
+# retrain_every_days: моделийг хэдэн origin тутамд дахин сургах (1 = өдөр бүр)
+# train_window_days: None = бүх түүхээр, тоо = сүүлийн тэдэн өдрөөр сургана
+# max_workers: -1 = бүх CPU
+BACKTEST_CONFIG = {
+    'dir': 'backtests',
+    'days': 180,
+    'retrain_every_days': 7,
+    'train_window_days': None,
+    'max_workers': -1
+}
+
+# ==========================
+# Үе шатын хэмжилт (instrumentation.py)
+# ==========================
+# jsonl: ажиллалт бүрт нэг мөр JSON нэмэгдэнэ (None = бичихгүй)
+# prometheus_textfile: node_exporter textfile collector-ийн .prom файл (None = бичихгүй)
+METRICS_CONFIG = {
+    'jsonl': 'metrics/pipeline_runs.jsonl',
+    'prometheus_textfile': None
+}
+
+# ==========================
+# Офлайн record / replay (python offline.py record-db, OFFLINE_MODE=replay)
+# ==========================
+# mode: 'live', 'record' (HTTP хариуг bundle-д бичих), 'replay' (SQLite + stub server)
+# OFFLINE_MODE орчны хувьсагч энэ утгыг дарна
+OFFLINE_CONFIG = {
+    'mode': 'live',
+    'bundle_dir': 'offline_bundle'
+}
+
+# ==========================
+# Үе шатын бенчмарк (python bench_stages.py --years 1,5,10)
+# ==========================
+# years: synthetic минутын өгөгдлийн хэмжээ (жил)
+# heavy_repeats: сургалт шиг удаан үе шатыг хэдэн удаа давтах
+# regression_threshold: --compare-д median энэ дахин удааширвал алдаа гэж үзнэ
+BENCH_CONFIG = {
+    'dir': 'benchmarks',
+    'years': [1, 5, 10],
+    'seed': 42,
+    'repeats': 5,
+    'warmup': 1,
+    'heavy_repeats': 1,
+    'regression_threshold': 1.2
+}
+
+# ==========================
+# Таамаглалын сервис (forecast_service.py)
+# ==========================
+# refresh_minutes: өгөгдөл + моделийг автоматаар шинэчлэх давтамж (0 бол зөвхөн POST /refresh)
+SERVICE_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8765,
+    'refresh_minutes': 60,
+    'cache_size': 32,          # санах ойд барих хариуны тоо (LRU)
+    'max_temp_delta': 20.0     # what-if temp_delta-ийн дээд хэмжээ (°C)
+}
+
+# ==========================
+# Өгөгдлийн сангийн pool + кэш (db.py)
+# ==========================
+# cache_ttl_seconds: ижил query-г энэ хугацаанд дахин MySQL руу явуулахгүй (0 бол кэшгүй)
+# cache_max_rows: кэшийн нийт мөрийн дээд хэмжээ. Үүнээс том үр дүн (олон жилийн
+#   raw_since, pivot гэх мэт) кэшлэгдэхгүй - зөвхөн жижиг lookup query-нууд кэшлэгдэнэ
+DB_POOL_CONFIG = {
+    'pool_size': 5,
+    'max_overflow': 5,
+    'pool_recycle': 1800,
+    'cache_ttl_seconds': 60,
+    'cache_max_rows': 10_000
+}
+
+# ==========================
+# Таамаглалын архив (forecast_archive.py)
+# ==========================
+# Ажиллах бүрийн таамаглал {dir}/target_date=YYYY-MM-DD/ дотор шинэ файлаар нэмэгдэнэ
+ARCHIVE_CONFIG = {
+    'dir': 'forecast_archive'
+}
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Дундын өгөгдлийн хандалт (бүх скрипт үүнийг ашиглана)
+- get_engine(): процесс бүрт нэг pooled engine (pool_pre_ping, pool_recycle)
+- QUERIES: нэртэй, параметртэй SQL-ууд. list/tuple параметр нь IN (...) болж задарна
+- OFFLINE_MODE=replay үед get_engine() нь offline bundle-ийн SQLite-ийг буцаана
+- read_sql / read_named: богино TTL-тэй санах ойн кэш - нэг циклийн дотор
+  ижил query + параметрийг MySQL руу дахин явуулахгүй. Кэш нь нийтдээ
+  DB_POOL_CONFIG['cache_max_rows'] мөрөөр хязгаарлагдана - том үр дүн кэшлэгдэхгүй
+- Түүхий мөрүүд шууд төрөлтэй ирнэ: value нь float (VALUE_SQL нь DECIMAL-ийг
+  DOUBLE болгож мөр бүрт Decimal объект үүсгэхгүй), TIMESTAMP_S нь int64, VAR нь category.
+  INGEST_CONFIG['reader'] = 'connectorx' бол Arrow-д суурилсан уншигч (суулгасан бол)
+- stream_sql / stream_named: олон жилийн түүхий мөрийг server-side cursor-оор chunk-аар
+  уншина (санах ой нь түүхийн уртаас биш chunk-ийн хэмжээнээс хамаарна)
+
+Жишээ:
+    from db import read_named
+    df = read_named('latest_raw', vars=['SYSTEM_TOTAL_P'], limit=100)
+"""
+
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine, text, bindparam
+
+from config import DB_CONFIG, DB_POOL_CONFIG, INGEST_CONFIG
+from offline import replay_database_url
+
+try:
+    import connectorx
+except ImportError:
+    connectorx = None
+
+
+def value_sql(column='VALUE'):
+    """
+    column-ийг 2 оронтой бутархайгаар тоймлоод DOUBLE болгох (MySQL: DOUBLE, SQLite: REAL).
+    "+ 0E0"-гүй бол драйвер мөр бүрийг decimal.Decimal объект болгож object багана үүсгэнэ
+    """
+    return f"(CAST({column} AS DECIMAL(10,2)) + 0E0)"
+
+
+VALUE_SQL = value_sql()
+
+# ==========================
+# Нэртэй query-нууд
+# ==========================
+QUERIES = {
+    # Түүхий мөрүүд: since-ээс хойш (CALCULATION шүүлттэй)
+    'raw_since': f"""
+SELECT
+    TIMESTAMP_S,
+    VAR,
+    {VALUE_SQL} AS value
+FROM z_conclusion
+WHERE VAR IN :vars
+  AND CALCULATION = :calculation
+  AND TIMESTAMP_S >= :since
+ORDER BY TIMESTAMP_S
+""",
+    # Түүхий мөрүүд: [start_ts, end_ts) хугацаанд
+    'raw_range': f"""
+SELECT
+    TIMESTAMP_S,
+    VAR,
+    {VALUE_SQL} AS value
+FROM z_conclusion
+WHERE VAR IN :vars
+  AND TIMESTAMP_S >= :start_ts
+  AND TIMESTAMP_S < :end_ts
+ORDER BY TIMESTAMP_S
+""",
+    # Сүүлийн limit түүхий мөр
+    'latest_raw': f"""
+SELECT
+    TIMESTAMP_S,
+    VAR,
+    {VALUE_SQL} AS value
+FROM z_conclusion
+WHERE VAR IN :vars
+ORDER BY TIMESTAMP_S DESC
+LIMIT :limit
+""",
+    # [start_ts, end_ts) хугацааны мөрийн тоо
+    'count_range': """
+SELECT COUNT(*) AS cnt
+FROM z_conclusion
+WHERE VAR = :var
+  AND TIMESTAMP_S >= :start_ts
+  AND TIMESTAMP_S < :end_ts
+""",
+    # Офлайн bundle-д хуулах бүх баганатай мөрүүд (offline.py record-db)
+    'snapshot_range': """
+SELECT TIMESTAMP_S, VAR, VALUE, CALCULATION
+FROM z_conclusion
+WHERE VAR IN :vars
+  AND TIMESTAMP_S >= :start_ts
+  AND TIMESTAMP_S < :end_ts
+ORDER BY TIMESTAMP_S
+""",
+    # LIKE хэв маягтай VAR нэрс
+    'var_names': """
+SELECT DISTINCT VAR
+FROM z_conclusion
+WHERE UPPER(VAR) LIKE :pattern
+ORDER BY VAR
+""",
+}
+
+_engines = {}
+_engine_lock = threading.Lock()
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+# ==========================
+# Холболтын pool
+# ==========================
+def database_url():
+    """DB_CONFIG-оос MySQL холболтын URL"""
+    return "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
+
+
+def get_engine(url=None):
+    """URL бүрт нэг pooled engine (процесс дотор дахин ашиглана)"""
+    url = url or replay_database_url() or database_url()
+    with _engine_lock:
+        if url not in _engines:
+            kwargs = {'pool_pre_ping': True}
+            if not url.startswith('sqlite'):
+                kwargs.update(
+                    pool_size=DB_POOL_CONFIG['pool_size'],
+                    max_overflow=DB_POOL_CONFIG['max_overflow'],
+                    pool_recycle=DB_POOL_CONFIG['pool_recycle'],
+                )
+            _engines[url] = create_engine(url, **kwargs)
+        return _engines[url]
+
+
+# ==========================
+# Query + TTL кэш
+# ==========================
+def named_query(name, **params):
+    """QUERIES-ээс нэрээр нь авч параметрүүдийг bind хийх"""
+    expanding = [
+        bindparam(key, value=list(value), expanding=True)
+        for key, value in params.items() if isinstance(value, (list, tuple, set))
+    ]
+    scalars = {key: value for key, value in params.items() if not isinstance(value, (list, tuple, set))}
+    return text(QUERIES[name]).bindparams(*expanding, **scalars)
+
+
+def _cache_key(engine, query):
+    if isinstance(query, str):
+        return str(engine.url), query, ()
+    binds = query.compile().binds
+    return str(engine.url), str(query), tuple(sorted((k, repr(v.value)) for k, v in binds.items()))
+
+
+# ==========================
+# Төрөлтэй унших
+# ==========================
+def typed_frame(df):
+    """
+    Түүхий баганыг нягт төрөлд шилжүүлэх (байгаа баганад л):
+    value → INGEST_CONFIG['value_dtype'], TIMESTAMP_S → int64, VAR → category
+    """
+    value_dtype = INGEST_CONFIG.get('value_dtype', 'float64')
+    for column in ('value', 'VALUE'):
+        if column in df.columns and df[column].dtype != value_dtype:
+            df[column] = pd.to_numeric(df[column]).astype(value_dtype)
+    if 'TIMESTAMP_S' in df.columns and df['TIMESTAMP_S'].notna().all():
+        df['TIMESTAMP_S'] = df['TIMESTAMP_S'].astype('int64')
+    if 'VAR' in df.columns and df['VAR'].dtype != 'category':
+        df['VAR'] = df['VAR'].astype('category')
+    return df
+
+
+def _connectorx_url(engine):
+    """SQLAlchemy URL → connectorx URL (mysql://, sqlite://)"""
+    url = engine.url.set(drivername=engine.url.get_backend_name(), query={})
+    return url.render_as_string(hide_password=False)
+
+
+def _fetch(query, engine):
+    """
+    INGEST_CONFIG['reader']-ийн дагуу унших:
+    'connectorx' - Arrow буфер руу шууд (мөр бүрийн Python объектгүй), суулгаагүй бол pandas
+    'pandas'     - pd.read_sql
+    """
+    if INGEST_CONFIG.get('reader', 'pandas') == 'connectorx' and connectorx is not None:
+        sql = query if isinstance(query, str) else str(
+            query.compile(engine, compile_kwargs={'literal_binds': True}))
+        table = connectorx.read_sql(_connectorx_url(engine), sql, return_type='arrow')
+        df = table.to_pandas()
+    else:
+        df = pd.read_sql(query, engine)
+    return typed_frame(df)
+
+
+def read_sql(query, engine=None, ttl=None):
+    """
+    Төрөлтэй унших (_fetch) + TTL кэш.
+    ttl (секунд) дотор ижил query + параметрийг кэшээс буцаана; 0 бол кэшгүй.
+    Кэшийн DataFrame-ийг өөрчлөхгүйн тулд хуулбарыг буцаана.
+    DB_POOL_CONFIG['cache_max_rows']-аас олон мөртэй үр дүнг кэшлэхгүй (хуулбаргүй шууд
+    буцаана) - олон жилийн түүхий уншилт санах ойд давхар хадгалагдахгүй.
+    """
+    engine = engine or get_engine()
+    ttl = DB_POOL_CONFIG['cache_ttl_seconds'] if ttl is None else ttl
+    if ttl <= 0:
+        return _fetch(query, engine)
+
+    key = _cache_key(engine, query)
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+    if hit is not None and now < hit[0]:
+        return hit[1].copy()
+
+    df = _fetch(query, engine)
+    max_rows = DB_POOL_CONFIG.get('cache_max_rows', 10_000)
+    if len(df) > max_rows:
+        return df
+    with _cache_lock:
+        # Хугацаа нь дууссан бичлэгүүдийг цэвэрлэх
+        for old_key in [k for k, (expires, _) in _cache.items() if expires <= now]:
+            del _cache[old_key]
+        _cache[key] = (now + ttl, df)
+        # Нийт мөрийн тоо хязгаараас хэтэрвэл хамгийн эртний бичлэгүүдийг хасах
+        total = sum(len(cached) for _, cached in _cache.values())
+        for old_key in list(_cache):
+            if total <= max_rows:
+                break
+            if old_key != key:
+                total -= len(_cache.pop(old_key)[1])
+    return df.copy()
+
+
+def read_named(name, engine=None, ttl=None, **params):
+    """Нэртэй query-г кэштэйгээр унших"""
+    return read_sql(named_query(name, **params), engine, ttl)
+
+
+# ==========================
+# Урсгалаар (chunk-аар) унших
+# ==========================
+def stream_sql(query, engine=None, chunk_rows=None):
+    """
+    Server-side (unbuffered) cursor-оор chunk_rows мөрөөр унших generator (кэшгүй).
+    MySQL/pymysql дээр stream_results нь SSCursor ашиглана - үр дүн бүхэлдээ
+    клиентийн санах ойд ачаалагдахгүй. Chunk бүр typed_frame-ээр төрөлждөг.
+    """
+    engine = engine or get_engine()
+    chunk_rows = chunk_rows or INGEST_CONFIG.get('chunk_rows', 500_000)
+    with engine.connect().execution_options(stream_results=True, max_row_buffer=chunk_rows) as conn:
+        for chunk in pd.read_sql(query, conn, chunksize=chunk_rows):
+            yield typed_frame(chunk)
+
+
+def stream_named(name, engine=None, chunk_rows=None, **params):
+    """Нэртэй query-г chunk-аар урсгах"""
+    return stream_sql(named_query(name, **params), engine, chunk_rows)
+
+
+def clear_cache():
+    """Кэшийг бүхэлд нь цэвэрлэх (жишээ нь refresh хийхийн өмнө)"""
+    with _cache_lock:
+        _cache.clear()
@@ -3,24 +3,12 @@
 df_load датафрэймийг шалгах
 """
 import pandas as pd
-from sqlalchemy import create_engine
 from datetime import datetime
-from config import DB_CONFIG
+from db import read_named
+from queries import day_range
 
-engine = create_engine(
-    "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
-)
-
-query = """
-SELECT
-    TIMESTAMP_S,
-    CAST(VALUE AS DECIMAL(10,2)) AS value
-FROM z_conclusion
-WHERE VAR = 'SYSTEM_TOTAL_P'
-ORDER BY TIMESTAMP_S
-"""
-
-df_raw = pd.read_sql(query, engine)
+# Эхнээс өнөөдрийн төгсгөл хүртэлх бүх мөр
+df_raw = read_named('raw_range', vars=['SYSTEM_TOTAL_P'], start_ts=0, end_ts=day_range()[1])
 df_raw['time_'] = pd.to_datetime(df_raw['TIMESTAMP_S'], unit='s')
 df_raw['hour_group'] = df_raw['time_'].dt.floor('h')
 
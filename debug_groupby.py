@@ -3,26 +3,12 @@
 Groupby хийхэд өгөгдөл алдагдаж байгааг шалгах
 """
 import pandas as pd
-from sqlalchemy import create_engine
-from config import DB_CONFIG
-
-engine = create_engine(
-    "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
-)
+from db import read_named
+from queries import day_range
 
 # Өнөөдрийн өгөгдлийг шууд татах
-query = """
-SELECT
-    TIMESTAMP_S,
-    CAST(VALUE AS DECIMAL(10,2)) AS value
-FROM z_conclusion
-WHERE VAR = 'SYSTEM_TOTAL_P'
-  AND TIMESTAMP_S >= UNIX_TIMESTAMP(CURDATE())
-  AND TIMESTAMP_S < UNIX_TIMESTAMP(CURDATE() + INTERVAL 1 DAY)
-ORDER BY TIMESTAMP_S
-"""
-
-df_raw = pd.read_sql(query, engine)
+start_ts, end_ts = day_range()
+df_raw = read_named('raw_range', vars=['SYSTEM_TOTAL_P'], start_ts=start_ts, end_ts=end_ts)
 df_raw['time_'] = pd.to_datetime(df_raw['TIMESTAMP_S'], unit='s')
 df_raw['hour_group'] = df_raw['time_'].dt.floor('h')
 
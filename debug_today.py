@@ -3,29 +3,14 @@
 Өнөөдрийн өгөгдөл шалгах
 """
 import pandas as pd
-from sqlalchemy import create_engine
 from datetime import datetime
-from config import DB_CONFIG
-
-engine = create_engine(
-    "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
-)
+from db import read_named
 
 today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 print(f"📅 Өнөөдөр: {today.strftime('%Y-%m-%d')}")
 
 # MySQL-ээс өнөөдрийн өгөгдөл татах
-query = """
-SELECT
-    TIMESTAMP_S,
-    CAST(VALUE AS DECIMAL(10,2)) AS value
-FROM z_conclusion
-WHERE VAR = 'SYSTEM_TOTAL_P'
-ORDER BY TIMESTAMP_S DESC
-LIMIT 100
-"""
-
-df_raw = pd.read_sql(query, engine)
+df_raw = read_named('latest_raw', vars=['SYSTEM_TOTAL_P'], limit=100)
 df_raw['time_'] = pd.to_datetime(df_raw['TIMESTAMP_S'], unit='s')
 
 print(f"\n📊 MySQL-ээс татсан сүүлийн өгөгдөл:")
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+"Цаг бүрийн сүүлийн утга" query-нуудын EXPLAIN шалгах (full scan илрүүлэх)
+
+Ажиллуулах:
+    python explain_check.py                      # config.py-н MySQL
+    python explain_check.py sqlite:///local.db   # локал SQLite
+"""
+import sys
+from sqlalchemy import text
+from db import get_engine
+from queries import last_value_per_hour_query, day_range, explain_plan, find_full_scans, RECOMMENDED_INDEX
+
+engine = get_engine(sys.argv[1] if len(sys.argv) > 1 else None)
+
+print(f"🔍 EXPLAIN шалгаж байна ({engine.dialect.name})...\n")
+
+start_ts, end_ts = day_range()
+checks = {
+    "Өнөөдөр (self-join)": last_value_per_hour_query(start_ts=start_ts, end_ts=end_ts, window=False),
+    "Өнөөдөр (window)": last_value_per_hour_query(start_ts=start_ts, end_ts=end_ts, window=True),
+    "Сүүлийн 7 хоног (self-join)": last_value_per_hour_query(start_ts=start_ts - 7 * 24 * 3600, window=False),
+    "Бүх түүх (self-join)": last_value_per_hour_query(window=False),
+}
+
+if engine.dialect.name == 'mysql':
+    # Хуучин FROM_UNIXTIME-аар group хийдэг query (харьцуулах зорилгоор)
+    checks["Хуучин FROM_UNIXTIME query"] = text("""
+    SELECT MAX(TIMESTAMP_S) AS max_ts
+    FROM z_conclusion
+    WHERE VAR = 'SYSTEM_TOTAL_P'
+    GROUP BY FROM_UNIXTIME(TIMESTAMP_S, '%Y-%m-%d %H')
+    """)
+
+n_flagged = 0
+for name, query in checks.items():
+    print("=" * 60)
+    print(f"📌 {name}")
+    print("=" * 60)
+    try:
+        df_plan = explain_plan(engine, query)
+    except Exception as e:
+        print(f"   ⚠️ EXPLAIN алдаа: {e}\n")
+        continue
+
+    print(df_plan.to_string(index=False))
+
+    df_full = find_full_scans(engine, df_plan)
+    if len(df_full) > 0:
+        n_flagged += 1
+        print(f"\n   ❌ Full scan: {len(df_full)} алхам")
+    else:
+        print(f"\n   ✅ Full scan байхгүй")
+    print()
+
+if n_flagged > 0:
+    print(f"⚠️ {n_flagged} query full scan хийж байна. Санал болгох индекс:")
+    print(f"   {RECOMMENDED_INDEX};")
+else:
+    print("✅ Бүх query индекс ашиглаж байна")
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Инкремент feature сан (цагийн сангийн хажууд)
+- build_feature_frame-ийн мөрүүдийг (dropna-аас өмнөх бүх мөр + complete багана)
+  жилээр хуваасан Parquet файлд хадгална
+- Ажиллалт бүрт оролтыг (load + температур, merge хийсэн) хадгалсан мөрүүдтэй
+  харьцуулж, анх зөрсөн цагаас хойшхийг л дахин бодно: lag-уудыг хадгалсан tail-ийн
+  (MAX_LAG_ROWS мөр) load-оос үргэлжлүүлнэ. Зөрөх нь: шинэ цаг, хожуу засварлагдсан
+  load (цагийн сангийн overlap), хожим бөглөгдсөн / өөрчлөгдсөн температур
+  (Archive API-ийн сүүлийн өдрүүдийн null, хуучин температурын цоорхой).
+  lag нь мөрийн байрлалаар тул дундаас нэмэгдсэн мөр хойшхи бүх мөрийг өөрчилнө
+- Утгыг зөвхөн өөрчлөгдөж болох цонхонд (сүүлийн цаг - max(overlap_hours,
+  temperature_backfill_hours)) харьцуулна. Цонхноос өмнөх хэсэгт зөвхөн мөрийн тоог
+  шалгана - мөр нэмэгдсэн / хасагдсан бол (хуучин цоорхой бөглөгдөх) бүх түүхийг харьцуулна
+- Тохиргоо / баганууд / эхлэх цаг өөрчлөгдвөл бүхэлд нь дахин үүсгэнэ
+- read_features: баганын проекцтой, зөвхөн complete мөрүүдийг унших
+
+Хадгалах бүтэц:
+    {store_dir}/features/{name}/2024.parquet - нэг жилийн feature мөрүүд
+                                                 (цөөн файл - унших overhead бага)
+    {store_dir}/features/{name}/meta.json       - weekday, баганууд, сүүлийн цаг
+
+Жишээ:
+    df = feature_frame('main', df_load, df_temp, weekday='excel')  # build_feature_frame-тэй ижил
+"""
+
+import os
+import json
+import glob
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.dataset
+
+from config import INGEST_CONFIG, FEATURE_STORE_CONFIG
+from features import MAX_LAG_ROWS, add_feature_columns, build_feature_frame
+
+# add_feature_columns-ийн логик өөрчлөгдвөл нэмэгдүүлнэ (хуучин санг дахин үүсгэнэ)
+FEATURE_VERSION = 1
+
+
+def _store_dir(name, store_dir=None):
+    return os.path.join(store_dir or INGEST_CONFIG['store_dir'], 'features', name)
+
+
+def _partition_paths(name, store_dir=None):
+    return sorted(glob.glob(os.path.join(_store_dir(name, store_dir), '*.parquet')))
+
+
+def _write_partition(df, path):
+    tmp_path = path + '.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+# ==========================
+# Meta
+# ==========================
+def read_meta(name, store_dir=None):
+    """meta.json (байхгүй бол None)"""
+    path = os.path.join(_store_dir(name, store_dir), 'meta.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_meta(name, meta, store_dir=None):
+    path = os.path.join(_store_dir(name, store_dir), 'meta.json')
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    os.replace(path + '.tmp', path)
+
+
+def _signature(df_load, weekday):
+    """Энэ утгууд хадгалсантай зөрвөл санг дахин үүсгэнэ"""
+    return {
+        'version': FEATURE_VERSION,
+        'weekday': weekday,
+        'columns': list(df_load.columns),
+        'load_start': str(df_load['time_'].min()),
+    }
+
+
+# ==========================
+# Унших
+# ==========================
+def read_features(name, columns=None, start_time=None, store_dir=None):
+    """
+    Хадгалсан feature мөрүүдийг унших (build_feature_frame-ийн үр дүнтэй ижил).
+    columns: зөвхөн эдгээр баганыг уншина (time_-ийг үргэлж оруулна)
+    """
+    paths = _partition_paths(name, store_dir)
+    if start_time is not None:
+        start_year = pd.Timestamp(start_time).strftime('%Y')
+        paths = [p for p in paths if os.path.basename(p)[:4] >= start_year]
+    if columns is not None:
+        columns = ['time_'] + [c for c in columns if c != 'time_']
+    if not paths:
+        return pd.DataFrame(columns=columns or [])
+
+    # Бүх файлыг нэг pyarrow dataset болгож (олон thread) уншина
+    dataset = pyarrow.dataset.dataset(paths, format='parquet')
+    df = dataset.to_table(columns=columns, filter=pyarrow.dataset.field('complete')).to_pandas()
+    if 'complete' in df.columns:
+        df = df.drop(columns='complete')
+    if start_time is not None:
+        df = df[df['time_'] >= pd.Timestamp(start_time)]
+    return df.reset_index(drop=True)
+
+
+def _time_filter(since=None, before=None):
+    field = pyarrow.dataset.field('time_')
+    if since is not None:
+        return field >= pd.Timestamp(since).to_pydatetime()
+    return field < pd.Timestamp(before).to_pydatetime()
+
+
+def _read_inputs(name, columns, since=None, store_dir=None):
+    """Хадгалсан мөрүүдийн (complete эсэхээс үл хамааран) оролтын баганууд, since-ээс хойш"""
+    paths = _partition_paths(name, store_dir)
+    if since is not None:
+        paths = [p for p in paths if os.path.basename(p)[:4] >= pd.Timestamp(since).strftime('%Y')]
+    if not paths:
+        return pd.DataFrame({column: pd.Series(dtype='float64') for column in columns}).assign(
+            time_=pd.Series(dtype='datetime64[ns]'))[['time_'] + columns]
+    dataset = pyarrow.dataset.dataset(paths, format='parquet')
+    table = dataset.to_table(columns=['time_'] + columns,
+                             filter=None if since is None else _time_filter(since=since))
+    return table.to_pandas()
+
+
+def _count_before(name, before, store_dir=None):
+    """before-оос өмнөх хадгалсан мөрийн тоо (Parquet-ийн time_ баганаар л)"""
+    paths = _partition_paths(name, store_dir)
+    if not paths:
+        return 0
+    return pyarrow.dataset.dataset(paths, format='parquet').count_rows(filter=_time_filter(before=before))
+
+
+def _window_start(meta):
+    """Утга нь өөрчлөгдөж болох хамгийн эрт цаг (цагийн сангийн overlap, температурын нөхөлт)"""
+    hours = max(INGEST_CONFIG['overlap_hours'], FEATURE_STORE_CONFIG['temperature_backfill_hours'])
+    return pd.Timestamp(meta['last_time']) - pd.Timedelta(hours=hours)
+
+
+def _first_change(df_stored, df_merged, columns):
+    """
+    Хадгалсан оролт ба шинэ оролт анх зөрөх цаг (зөрөөгүй бол None).
+    Зөвхөн нэг талд байгаа цаг, эсвэл аль нэг баганын утга өөр бол зөрсөн гэж үзнэ
+    """
+    joined = df_stored.merge(df_merged, on='time_', how='outer', suffixes=('_old', ''), indicator=True)
+    changed = joined['_merge'] != 'both'
+    for column in columns:
+        old, new = joined[f"{column}_old"], joined[column]
+        changed |= ~((old == new) | (old.isna() & new.isna()))
+    if not changed.any():
+        return None
+    return joined.loc[changed, 'time_'].min()
+
+
+def _read_tail(name, before, rows, store_dir=None):
+    """before-оос өмнөх сүүлийн rows мөрийн load (complete эсэхээс үл хамааран)"""
+    frames, count = [], 0
+    for path in reversed(_partition_paths(name, store_dir)):
+        df = pd.read_parquet(path, columns=['time_', 'load'])
+        df = df[df['time_'] < before]
+        frames.insert(0, df)
+        count += len(df)
+        if count >= rows:
+            break
+    if not frames:
+        return pd.Series(dtype='float64')
+    return pd.concat(frames, ignore_index=True)['load'].tail(rows)
+
+
+# ==========================
+# Шинэчлэх
+# ==========================
+def update_feature_store(name, df_load, df_temp, weekday='excel', store_dir=None):
+    """
+    Санг df_load + df_temp-тэй тааруулах.
+    Буцаах утга: дахин бодсон мөрийн тоо
+    """
+    directory = _store_dir(name, store_dir)
+    os.makedirs(directory, exist_ok=True)
+
+    signature = _signature(df_load, weekday)
+    meta = read_meta(name, store_dir)
+    rebuild = meta is None or meta.get('last_time') is None or not _partition_paths(name, store_dir) or \
+        any(meta.get(key) != value for key, value in signature.items())
+
+    if rebuild:
+        for path in _partition_paths(name, store_dir):
+            os.remove(path)
+        df = pd.merge(df_load, df_temp, on='time_', how='inner')
+        last_time = df['time_'].max() if not df.empty else None
+        cutoff = None
+        history = None
+    else:
+        since = _window_start(meta)
+        # Цонхноос өмнө merge-д орох цагууд (мөрийн тоог л харьцуулна)
+        before = df_load['time_'][(df_load['time_'] < since) & df_load['time_'].isin(df_temp['time_'])]
+        if len(before) != _count_before(name, since, store_dir):
+            since = None
+            print("   🧮 Feature сан: цонхноос өмнө мөр нэмэгдсэн/хасагдсан, бүх түүхийг харьцуулна")
+        else:
+            df_load = df_load[df_load['time_'] >= since]
+            df_temp = df_temp[df_temp['time_'] >= since]
+
+        df = pd.merge(df_load, df_temp, on='time_', how='inner')
+        last_time = df['time_'].max() if not df.empty else before.max()
+        inputs = [c for c in df.columns if c != 'time_']
+        cutoff = _first_change(_read_inputs(name, inputs, since, store_dir), df, inputs)
+        if cutoff is None:
+            return 0
+        history = _read_tail(name, cutoff, MAX_LAG_ROWS, store_dir)
+        df = df[df['time_'] >= cutoff].reset_index(drop=True)
+
+    df = add_feature_columns(df, weekday, history_load=history)
+    df['complete'] = df.notna().all(axis=1)
+
+    # cutoff-оос хойшхи хуучин мөрүүдийг шинээр солино
+    years = df['time_'].dt.strftime('%Y')
+    touched = set(years)
+    if cutoff is not None:
+        cutoff_year = cutoff.strftime('%Y')
+        touched |= {os.path.basename(p)[:4] for p in _partition_paths(name, store_dir)
+                    if os.path.basename(p)[:4] >= cutoff_year}
+
+    for year in sorted(touched):
+        path = os.path.join(directory, f"{year}.parquet")
+        df_year = df[years == year]
+        if cutoff is not None and os.path.exists(path):
+            df_old = pd.read_parquet(path)
+            df_year = pd.concat([df_old[df_old['time_'] < cutoff], df_year], ignore_index=True)
+        if df_year.empty:
+            if os.path.exists(path):
+                os.remove(path)
+            continue
+        _write_partition(df_year.sort_values('time_').reset_index(drop=True), path)
+
+    write_meta(name, dict(
+        signature,
+        last_time=None if last_time is None or pd.isna(last_time) else str(last_time),
+        updated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    ), store_dir)
+    return len(df)
+
+
+def feature_frame(name, df_load, df_temp, weekday='excel', columns=None, store_dir=None):
+    """
+    build_feature_frame-ийн оронд: санг шинэчилж (шинэ цагуудыг л бодож) уншина.
+    FEATURE_STORE_CONFIG['enabled'] False бол шууд build_feature_frame.
+    """
+    if not FEATURE_STORE_CONFIG['enabled']:
+        df = build_feature_frame(df_load, df_temp, weekday)
+        return df if columns is None else df[['time_'] + [c for c in columns if c != 'time_']]
+
+    rows = update_feature_store(name, df_load, df_temp, weekday, store_dir)
+    print(f"   🧮 Feature сан: {rows} мөр дахин бодогдлоо")
+    return read_features(name, columns, store_dir=store_dir)
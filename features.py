@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Feature engineering + forecast-д зориулсан feature мөр үүсгэх
+- build_feature_frame: load + температурыг нэгтгэж lag/календарийн feature нэмэх
+- add_feature_columns: lag/календарийн feature (feature_store инкрементээр ашиглана)
+- DAILY_FEATURES / HOURLY_FEATURES: моделийн баганууд
+- Өдрийн таамаглалын 24 мөрийг нэг дор (vectorized) үүсгэж нэг predict дуудна
+- Цагийн таамаглал: бодит lag-тай цагуудыг нэг predict-ээр, ирээдүйн цагуудыг
+  ring buffer-т өөрийн таамаглалаа буцааж хийх замаар (recursive) алхам алхмаар
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+DAILY_FEATURES = ['year', 'month', 'day', 'hour', 'temp', 'wd',
+                  'load-1d', 'load-2d', 'load-3d', 'load-4d',
+                  'load-5d', 'load-6d', 'load-7d']
+HOURLY_FEATURES = ['month', 'day', 'hour', 'temp', 'wd', 'load-1h', 'load-2h', 'load-3h']
+HOURLY_LAGS = 3
+MAX_HOURLY_HORIZON = 48
+# add_feature_columns-ийн хамгийн урт lag (мөр) - feature_store-ийн tail-ийн урт
+MAX_LAG_ROWS = 24 * 7
+
+
+def weekday_values(times, style='excel'):
+    """
+    Долоо хоногийн өдөр
+    - 'excel':  Excel WEEKDAY() - Ням=1, Даваа=2, ..., Бямба=7 (main.py)
+    - 'python': Даваа=0, ..., Ням=6 (main_system_total.py)
+    """
+    weekday = pd.DatetimeIndex(times).weekday.to_numpy()
+    if style == 'python':
+        return weekday
+    wd = (weekday + 2) % 7
+    return np.where(wd == 0, 7, wd)
+
+
+def add_feature_columns(df, weekday='excel', history_load=None):
+    """
+    Нэгтгэсэн (load + temp) df-д lag / календарийн feature нэмэх (dropna хийхгүй).
+    load-kh / load-kd нь мөрийн байрлалаар shift хийнэ.
+    history_load: df-ээс өмнөх мөрүүдийн сүүлийн load утгууд (feature_store-ийн tail) -
+    өгвөл lag-ууд түүнээс үргэлжилнэ, эс бөгөөс эхний мөрүүдийн lag нь NaN.
+    """
+    offset = 0 if history_load is None else len(history_load)
+    load = df['load'] if history_load is None else pd.concat(
+        [pd.Series(history_load, dtype='float64'), df['load']], ignore_index=True)
+
+    df['wd'] = weekday_values(df['time_'], weekday)
+
+    for i in range(1, 4):
+        df[f'load-{i}h'] = load.shift(i).to_numpy()[offset:]
+
+    for i in range(1, 8):
+        df[f'load-{i}d'] = load.shift(i*24).to_numpy()[offset:]
+
+    df['year'] = df['time_'].dt.year
+    df['month'] = df['time_'].dt.month
+    df['day'] = df['time_'].dt.day
+    df['hour'] = df['time_'].dt.hour
+
+    return df
+
+
+def build_feature_frame(df_load, df_temp, weekday='excel'):
+    """
+    Load + температурыг цагаар нэгтгэж сургалтын feature-үүдийг нэмэх.
+    load-kh / load-kd нь мөрийн байрлалаар shift хийнэ, NaN мөрүүд хасагдана.
+    """
+    df = pd.merge(df_load, df_temp, on='time_', how='inner')
+    df = add_feature_columns(df, weekday)
+
+    return df.dropna().reset_index(drop=True)
+
+
+def lookup_temperature(df_temp, times, fallback):
+    """times-ийн цаг бүрийн температур (олдохгүй бол fallback)"""
+    temp_map = df_temp.drop_duplicates(subset=['time_']).set_index('time_')['temp']
+    times = pd.DatetimeIndex(times)
+    found = times.isin(temp_map.index)
+    return np.where(found, temp_map.reindex(times).to_numpy(), fallback)
+
+
+def build_daily_forecast_features(df, df_temp, future_times, fallback_temp, weekday='excel'):
+    """
+    Өдрийн моделийн feature мөрүүдийг нэг дор үүсгэх.
+    Цаг бүрд df-ийн тухайн цагаас өмнөх мөрүүдээс байрлалаар (24*k мөрийн өмнө)
+    load-kd утгыг авна - df[df['time_'] < t].tail(24*7).iloc[-24*k]-тэй ижил.
+    df нь time_-ээр эрэмбэлэгдсэн байх ёстой. 7 хоногийн түүхгүй цагууд хасагдана.
+    """
+    times = pd.DatetimeIndex(future_times)
+    pos = np.searchsorted(df['time_'].to_numpy(), times.to_numpy(), side='left')
+
+    valid = pos >= 24 * 7
+    times, pos = times[valid], pos[valid]
+
+    loads = df['load'].to_numpy()
+    features = pd.DataFrame({
+        'year': times.year,
+        'month': times.month,
+        'day': times.day,
+        'hour': times.hour,
+        'temp': lookup_temperature(df_temp, times, fallback_temp),
+        'wd': weekday_values(times, weekday),
+    })
+    for k in range(1, 8):
+        features[f'load-{k}d'] = loads[pos - 24 * k]
+
+    return times, features[DAILY_FEATURES]
+
+
+def forecast_day_ahead(model, df, df_temp, future_times, fallback_temp, weekday='excel'):
+    """Өдрийн таамаглал: бүх цагийг нэг predict дуудлагаар бодох"""
+    times, features = build_daily_forecast_features(df, df_temp, future_times, fallback_temp, weekday)
+    if len(features) == 0:
+        return pd.DataFrame(columns=['time_', 'forecast_daily'])
+
+    return pd.DataFrame({
+        'time_': times,
+        'forecast_daily': model.predict(features).round(0),
+    })
+
+
+def _hourly_rows(times, temps, weekdays, lags):
+    """Цагийн моделийн feature мөрүүд (lags: [load-1h, load-2h, load-3h] баганууд)"""
+    features = pd.DataFrame({
+        'month': times.month,
+        'day': times.day,
+        'hour': times.hour,
+        'temp': temps,
+        'wd': weekdays,
+    })
+    for k in range(HOURLY_LAGS):
+        features[f'load-{k + 1}h'] = lags[k]
+    return features[HOURLY_FEATURES]
+
+
+def forecast_hourly(model, df, df_temp, start_time, end_time, weekday='excel'):
+    """
+    start_time ~ end_time хугацааны цагийн таамаглал.
+    - Бодит өгөгдөлтэй цагууд (t <= df-ийн сүүлийн цаг): lag-ууд нь df-ийн t-ээс
+      өмнөх мөрүүд (байрлалаар) - бүгдийг нэг predict-ээр бодно
+    - Түүнээс хойших цагууд: сүүлийн HOURLY_LAGS бодит утгаар ring buffer үүсгэж,
+      алхам бүрийн таамаглалыг буцааж buffer-т хийнэ (алхам бүр O(1))
+    Температур олдохгүй бол t-ээс өмнөх 24 мөрийн дундажийг авна.
+    df нь time_-ээр эрэмбэлэгдсэн байх ёстой.
+    """
+    start_time, end_time = pd.Timestamp(start_time), pd.Timestamp(end_time)
+    times_df = df['time_'].to_numpy()
+    loads = df['load'].to_numpy(dtype=float)
+    if len(loads) < HOURLY_LAGS or end_time < start_time:
+        return pd.DataFrame(columns=['time_', 'forecast_hourly'])
+
+    last_actual = pd.Timestamp(times_df[-1])
+    times = pd.date_range(start_time, end_time, freq='h')
+
+    # Температурын fallback: t-ээс өмнөх 24 мөрийн дундаж (cumsum-аар)
+    temp_cumsum = np.concatenate([[0.0], np.nancumsum(df['temp'].to_numpy(dtype=float))])
+    pos = np.searchsorted(times_df, times.to_numpy(), side='left')
+    window = np.minimum(pos, 24)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fallback = (temp_cumsum[pos] - temp_cumsum[pos - window]) / window
+    temps = lookup_temperature(df_temp, times, fallback)
+    weekdays = weekday_values(times, weekday)
+
+    result = []
+
+    # 1) Бодит lag-тай цагууд - нэг predict
+    known = (times <= last_actual) & (pos >= HOURLY_LAGS)
+    if known.any():
+        known_pos = pos[known]
+        lags = [loads[known_pos - k] for k in range(1, HOURLY_LAGS + 1)]
+        features = _hourly_rows(times[known], temps[known], weekdays[known], lags)
+        result.append(pd.DataFrame({
+            'time_': times[known],
+            'forecast_hourly': model.predict(features).round(0),
+        }))
+
+    # 2) Ирээдүйн цагууд - ring buffer (load-1h нь buffer[-1])
+    future = times > last_actual
+    if future.any():
+        steps = pd.date_range(last_actual + pd.Timedelta(hours=1), end_time, freq='h')
+        step_temps = lookup_temperature(df_temp, steps, fallback[future][0])
+        step_weekdays = weekday_values(steps, weekday)
+        buffer = deque(loads[-HOURLY_LAGS:], maxlen=HOURLY_LAGS)
+
+        predictions = np.empty(len(steps))
+        for i, t in enumerate(steps):
+            row = [t.month, t.day, t.hour, step_temps[i], step_weekdays[i]]
+            row += [buffer[-k] for k in range(1, HOURLY_LAGS + 1)]
+            predictions[i] = model.predict(pd.DataFrame([row], columns=HOURLY_FEATURES))[0]
+            buffer.append(predictions[i])
+
+        keep = steps >= start_time
+        result.append(pd.DataFrame({
+            'time_': steps[keep],
+            'forecast_hourly': predictions[keep].round(0),
+        }))
+
+    if not result:
+        return pd.DataFrame(columns=['time_', 'forecast_hourly'])
+    return pd.concat(result, ignore_index=True)
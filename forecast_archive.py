@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Гаргасан таамаглалын архив (append-only, зорилтот өдрөөр хуваасан)
+- Ажиллах бүрийн өдрийн / цагийн таамаглалыг дарж бичихгүй, шинэ файлаар нэмнэ
+- Мөр бүр: issue_time (гаргасан цаг), target_time (таамагласан цаг),
+  source ('main', 'system_total'), kind ('daily', 'hourly'), model_version, value
+- Зорилтот өдрөөр, эсвэл issue_time-аар уншихдаа зөвхөн хэрэгтэй файлуудыг нээнэ
+
+Хадгалах бүтэц:
+    {dir}/target_date=2025-01-15/20250115T080500_main_hourly.3f9a1c2e.parquet
+Файлын нэрний эхэнд issue_time байгаа тул issue_time-аар шүүхэд файлыг нээх шаардлагагүй.
+Төгсгөлийн санамсаргүй suffix нь нэг секундэд (эсвэл зэрэг ажиллах процессуудаас)
+гарсан ижил source/kind-ийн таамаглалуудыг бие биеэ дарж бичихээс хамгаална.
+"""
+
+import os
+import glob
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+from config import ARCHIVE_CONFIG
+
+ARCHIVE_COLUMNS = ['issue_time', 'target_time', 'source', 'kind', 'model_version', 'value']
+ISSUE_FORMAT = '%Y%m%dT%H%M%S'
+
+
+def _partition_dir(day, archive_dir=None):
+    archive_dir = archive_dir or ARCHIVE_CONFIG['dir']
+    return os.path.join(archive_dir, f"target_date={pd.Timestamp(day).strftime('%Y-%m-%d')}")
+
+
+def archive_forecast(df_forecast, value_column, kind, source, model_version,
+                     issue_time=None, archive_dir=None):
+    """
+    Нэг таамаглалыг архивт нэмэх (зорилтот өдөр бүрт нэг шинэ файл).
+    Буцаах утга: бичигдсэн файлуудын жагсаалт
+    """
+    if len(df_forecast) == 0:
+        return []
+
+    # Багананд бүрэн нарийвчлалаар (latest_per_target эрэмбэлэхэд), нэрэнд секундээр
+    issue_time = pd.Timestamp(issue_time or datetime.now())
+    df = pd.DataFrame({
+        'issue_time': issue_time,
+        'target_time': pd.to_datetime(df_forecast['time_']).to_numpy(),
+        'source': source,
+        'kind': kind,
+        'model_version': str(model_version),
+        'value': df_forecast[value_column].astype('float64').to_numpy(),
+    })
+
+    written = []
+    for day, df_day in df.groupby(df['target_time'].dt.normalize()):
+        part_dir = _partition_dir(day, archive_dir)
+        os.makedirs(part_dir, exist_ok=True)
+        name = f"{issue_time.strftime(ISSUE_FORMAT)}_{source}_{kind}.{uuid.uuid4().hex[:8]}"
+        path = os.path.join(part_dir, f"{name}.parquet")
+        tmp_path = os.path.join(part_dir, f"{name}.tmp")
+        df_day[ARCHIVE_COLUMNS].to_parquet(tmp_path, index=False)
+        # Байгаа файлыг хэзээ ч дарахгүй (link нь зорилтот нэр байвал алдаа өгнө)
+        os.link(tmp_path, path)
+        os.remove(tmp_path)
+        written.append(path)
+    return written
+
+
+def _parse_name(path):
+    """Файлын нэрээс (issue_time, source, kind) - suffix-гүй хуучин нэрийг ч уншина"""
+    name = os.path.basename(path)[:-len('.parquet')].split('.', 1)[0]
+    issue, rest = name.split('_', 1)
+    # source нэрэнд '_' байж болно ('system_total')
+    source, kind = rest.rsplit('_', 1)
+    return pd.Timestamp(datetime.strptime(issue, ISSUE_FORMAT)), source, kind
+
+
+def read_archive(start_day=None, end_day=None, issued_from=None, issued_to=None,
+                 source=None, kind=None, archive_dir=None):
+    """
+    Архиваас унших.
+    - start_day / end_day: зорилтот өдрийн хязгаар (хоёулаа багтана)
+    - issued_from / issued_to: issue_time-ийн хязгаар (хоёулаа багтана)
+    - source / kind: шүүлт
+    """
+    archive_dir = archive_dir or ARCHIVE_CONFIG['dir']
+    start_day = pd.Timestamp(start_day).strftime('%Y-%m-%d') if start_day is not None else None
+    end_day = pd.Timestamp(end_day).strftime('%Y-%m-%d') if end_day is not None else None
+    issued_from = pd.Timestamp(issued_from) if issued_from is not None else None
+    issued_to = pd.Timestamp(issued_to) if issued_to is not None else None
+
+    paths = []
+    for part_dir in sorted(glob.glob(os.path.join(archive_dir, 'target_date=*'))):
+        day = os.path.basename(part_dir).split('=', 1)[1]
+        if (start_day and day < start_day) or (end_day and day > end_day):
+            continue
+        for path in sorted(glob.glob(os.path.join(part_dir, '*.parquet'))):
+            issued, file_source, file_kind = _parse_name(path)
+            if (source and file_source != source) or (kind and file_kind != kind):
+                continue
+            # Нэр секунд хүртэл таслагдсан тул issued_from-ийн секундийг ч авч, доор мөрөөр шүүнэ
+            if (issued_from is not None and issued < issued_from.floor('s')) or \
+                    (issued_to is not None and issued > issued_to):
+                continue
+            paths.append(path)
+
+    if not paths:
+        return pd.DataFrame(columns=ARCHIVE_COLUMNS)
+    df = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+    if issued_from is not None:
+        df = df[df['issue_time'] >= issued_from]
+    if issued_to is not None:
+        df = df[df['issue_time'] <= issued_to]
+    return df.sort_values(['target_time', 'issue_time']).reset_index(drop=True)
+
+
+def latest_per_target(df_archive, min_lead_hours=0):
+    """
+    target_time бүрийн хамгийн сүүлд гаргасан таамаглал.
+    min_lead_hours > 0 бол зорилтот цагаас дор хаяж тэдэн цагийн өмнө гаргасныг л авна
+    (жишээ нь өдрийн өмнөх таамаглалын нарийвчлал шалгахад).
+    """
+    lead = df_archive['target_time'] - df_archive['issue_time']
+    df = df_archive[lead >= pd.Timedelta(hours=min_lead_hours)]
+    df = df.sort_values('issue_time').drop_duplicates(subset=['source', 'kind', 'target_time'], keep='last')
+    return df.sort_values('target_time').reset_index(drop=True)
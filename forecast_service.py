@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Байнга ажиллах таамаглалын сервис (локал HTTP API)
+- Цагийн түүх, температур, сургасан моделиудыг санах ойд барина
+- Хүсэлт бүрт MySQL / Open-Meteo / сургалт хийхгүй - зөвхөн predict
+- Модель нь registry-ээс ('main' - main.py-н сургасан) ачаалагдана,
+  сургалтыг `python main.py --mode train` (шөнийн cron) хийнэ
+
+Ажиллуулах:
+    python forecast_service.py
+
+Endpoint-ууд (JSON):
+    GET  /health                               - төлөв, өгөгдлийн хугацаа, модель
+    GET  /forecast/day?date=2025-01-15         - D өдрийн 01:00 → 00:00 таамаглал
+    GET  /forecast/day?date=...&temp_delta=-5  - what-if: температурыг ±N°C өөрчлөх
+                                                 (|temp_delta| ≤ max_temp_delta, date нь
+                                                 /health-ийн day_min..day_max дотор)
+    GET  /forecast/hourly?horizon=12           - сүүлийн бодит цагаас хойш N цаг (≤48)
+    POST /refresh                              - өгөгдөл + моделийг дахин ачаалах
+"""
+
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+from config import MODEL_CONFIG, SERVICE_CONFIG, FORECAST_CONFIG
+from db import get_engine, clear_cache
+from features import (DAILY_FEATURES, HOURLY_FEATURES, MAX_HOURLY_HORIZON,
+                      build_feature_frame, forecast_day_ahead, forecast_hourly)
+from hourly_store import update_hourly_store, load_hourly_store, build_load_frame
+from model_registry import load_latest, tuned_model_config
+from scheduler import incompatible_reason
+from weather import get_temperature_history, get_temperature_forecast
+
+MODEL_NAME = 'main'
+
+
+# ==========================
+# Санах ойд барих төлөв
+# ==========================
+class ForecastService:
+    """
+    Өгөгдөл + моделийн snapshot-ийг барих.
+    refresh() шинэ snapshot-ийг бүрэн бэлдсэний дараа нэг дор солино,
+    тиймээс refresh явж байх үед ч хүсэлтүүд хуучин snapshot-оор хариулна.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.state = None
+        self.refresh_lock = threading.Lock()
+        self.cache_lock = threading.Lock()
+
+    def refresh(self):
+        """Цагийн сан, температур, моделийг дахин ачаалах"""
+        with self.refresh_lock:
+            started = time.perf_counter()
+            clear_cache()
+
+            update_hourly_store(self.engine)
+            df_load = build_load_frame(load_hourly_store(), tz_offset_hours=8)
+            if df_load.empty:
+                raise RuntimeError("Цагийн өгөгдөл олдсонгүй")
+
+            df_temp = get_temperature_history(
+                df_load['time_'].min().strftime('%Y-%m-%d'),
+                df_load['time_'].max().strftime('%Y-%m-%d')
+            )
+            try:
+                df_temp = pd.concat([df_temp, get_temperature_forecast()], ignore_index=True)
+                df_temp = df_temp.drop_duplicates(subset=['time_'], keep='last').sort_values('time_')
+            except Exception as e:
+                print(f"   ⚠️ Өнөөдрийн температур алдаа: {e}")
+
+            df = build_feature_frame(df_load, df_temp, weekday='excel')
+
+            models = load_latest(MODEL_NAME)
+            meta = models['meta'] if models is not None else None
+            feature_columns = {'daily': DAILY_FEATURES, 'hourly': HOURLY_FEATURES}
+            reason = incompatible_reason(meta, feature_columns, tuned_model_config(MODEL_NAME, MODEL_CONFIG))
+            if reason is not None:
+                raise RuntimeError(f"Модель ашиглах боломжгүй: {reason} (python main.py --mode train)")
+
+            self.state = {
+                'df': df,
+                'df_load': df_load,
+                'df_temp': df_temp,
+                'model_daily': models['daily'],
+                'model_hourly': models['hourly'],
+                'model_key': meta['key'],
+                'refreshed_at': datetime.now(),
+                # Өдрийн таамаглалд 7 хоногийн lag + тухайн өдрийн температур/fallback хэрэгтэй
+                'day_min': (df['time_'].min() + timedelta(hours=167)).ceil('D'),
+                'day_max': df['time_'].max().normalize(),
+                'cache': OrderedDict(),
+            }
+
+            # Хамгийн их дуудагдах хоёр хариуг урьдчилан бодож кэшлэх
+            today = pd.Timestamp(datetime.now()).normalize()
+            if self.state['day_min'] <= today <= self.state['day_max']:
+                self.forecast_day(today)
+            self.forecast_nowcast(FORECAST_CONFIG['hourly_horizon'])
+
+            elapsed = time.perf_counter() - started
+            print(f"🔄 Refresh: {len(df)} мөр, модель {meta['key']} ({elapsed:.1f} сек)")
+            return self.health()
+
+    def health(self):
+        state = self.state
+        if state is None:
+            return {'status': 'loading'}
+        return {
+            'status': 'ok',
+            'model': state['model_key'],
+            'data_start': str(state['df']['time_'].min()),
+            'data_end': str(state['df_load']['time_'].max()),
+            'day_min': state['day_min'].strftime('%Y-%m-%d'),
+            'day_max': state['day_max'].strftime('%Y-%m-%d'),
+            'refreshed_at': state['refreshed_at'].strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+    def _cached(self, state, key, compute):
+        """
+        Snapshot солигдох хүртэл ижил хүсэлтийн хариуг дахин бодохгүй.
+        Кэш нь хамгийн сүүлд хэрэглэсэн cache_size хариуг л барина (LRU)
+        """
+        cache = state['cache']
+        with self.cache_lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        value = compute()
+        with self.cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > SERVICE_CONFIG['cache_size']:
+                cache.popitem(last=False)
+        return value
+
+    def forecast_day(self, day, temp_delta=0.0):
+        """D өдрийн 01:00 → маргаашийн 00:00 өдрийн таамаглал (main.py-тай ижил)"""
+        state = self.state
+        if not math.isfinite(temp_delta) or abs(temp_delta) > SERVICE_CONFIG['max_temp_delta']:
+            raise ValueError(f"temp_delta -{SERVICE_CONFIG['max_temp_delta']}..{SERVICE_CONFIG['max_temp_delta']} байх ёстой")
+        if not state['day_min'] <= day <= state['day_max']:
+            raise ValueError(f"date {state['day_min']:%Y-%m-%d}..{state['day_max']:%Y-%m-%d} байх ёстой")
+        return self._cached(state, ('day', day, temp_delta),
+                            lambda: self._forecast_day(state, day, temp_delta))
+
+    def _forecast_day(self, state, day, temp_delta):
+        df, df_temp = state['df'], state['df_temp']
+        if temp_delta:
+            df_temp = df_temp.assign(temp=df_temp['temp'] + temp_delta)
+
+        future_times = [day + timedelta(hours=hour) for hour in range(1, 25)]
+        fallback_temp = df[df['time_'].dt.date == day.date()]['temp'].mean() + temp_delta
+        return forecast_day_ahead(state['model_daily'], df, df_temp, future_times,
+                                  fallback_temp, weekday='excel')
+
+    def forecast_nowcast(self, horizon):
+        """Өнөөдрийн 01:00-өөс сүүлийн бодит цаг + horizon хүртэл цагийн таамаглал"""
+        state = self.state
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return self._cached(state, ('hourly', today, horizon),
+                            lambda: self._forecast_nowcast(state, today, horizon))
+
+    def _forecast_nowcast(self, state, today, horizon):
+        last_hour = state['df_load']['time_'].max()
+        return forecast_hourly(state['model_hourly'], state['df'], state['df_temp'],
+                               today + timedelta(hours=1), last_hour + timedelta(hours=horizon),
+                               weekday='excel')
+
+
+def _records(df_forecast, column):
+    return [
+        {'time': t.strftime('%Y-%m-%d %H:%M:%S'), 'value': float(v)}
+        for t, v in zip(df_forecast['time_'], df_forecast[column])
+    ]
+
+
+# ==========================
+# HTTP handler
+# ==========================
+class ForecastHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        started = time.perf_counter()
+
+        if url.path == '/health':
+            return self._send(200, self.service.health())
+        if self.service.state is None:
+            return self._send(503, {'error': 'Сервис ачаалж байна'})
+
+        try:
+            if url.path == '/forecast/day':
+                day = pd.Timestamp(params.get('date', datetime.now().strftime('%Y-%m-%d'))).normalize()
+                temp_delta = float(params.get('temp_delta', 0))
+                df_forecast = self.service.forecast_day(day, temp_delta)
+                payload = {'date': day.strftime('%Y-%m-%d'), 'temp_delta': temp_delta,
+                           'forecast': _records(df_forecast, 'forecast_daily')}
+            elif url.path == '/forecast/hourly':
+                horizon = int(params.get('horizon', FORECAST_CONFIG['hourly_horizon']))
+                if not 1 <= horizon <= MAX_HOURLY_HORIZON:
+                    return self._send(400, {'error': f"horizon 1..{MAX_HOURLY_HORIZON} байх ёстой"})
+                df_forecast = self.service.forecast_nowcast(horizon)
+                payload = {'horizon': horizon, 'forecast': _records(df_forecast, 'forecast_hourly')}
+            else:
+                return self._send(404, {'error': f"Олдсонгүй: {url.path}"})
+        except ValueError as e:
+            return self._send(400, {'error': str(e)})
+        except Exception as e:
+            return self._send(500, {'error': str(e)})
+
+        payload['model'] = self.service.state['model_key']
+        payload['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        self._send(200, payload)
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/refresh':
+            return self._send(404, {'error': f"Олдсонгүй: {self.path}"})
+        try:
+            self._send(200, self.service.refresh())
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        print(f"   {self.address_string()} {format % args}")
+
+
+def _auto_refresh(service):
+    """refresh_minutes тутамд өгөгдөл + моделийг шинэчлэх"""
+    while True:
+        time.sleep(SERVICE_CONFIG['refresh_minutes'] * 60)
+        try:
+            service.refresh()
+        except Exception as e:
+            print(f"⚠️ Автомат refresh алдаа: {e}")
+
+
+def serve():
+    engine = get_engine()
+    service = ForecastService(engine)
+
+    print("🚀 Таамаглалын сервис эхэлж байна...")
+    try:
+        service.refresh()
+    except Exception as e:
+        print(f"⚠️ Эхний ачаалалт амжилтгүй ({e}), POST /refresh-ээр дахин оролдоно уу")
+
+    if SERVICE_CONFIG['refresh_minutes']:
+        threading.Thread(target=_auto_refresh, args=(service,), daemon=True).start()
+
+    ForecastHandler.service = service
+    server = ThreadingHTTPServer((SERVICE_CONFIG['host'], SERVICE_CONFIG['port']), ForecastHandler)
+    print(f"✅ http://{SERVICE_CONFIG['host']}:{SERVICE_CONFIG['port']} дээр хүлээж байна")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Сервис зогслоо")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    serve()
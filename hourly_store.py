@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+"""
+Цагийн өгөгдлийн локал сан (incremental ingestion)
+- z_conclusion-оос зөвхөн watermark-аас хойшхи мөрүүдийг татах
+- Цаг бүрийн нэгтгэлийг (VAR тус бүрээр) сараар хуваасан Parquet файлд хадгалах
+- TIMESTAMP_S watermark-ыг JSON файлд хадгалах
+- Давхцах цонх (overlap) ашиглаж хожуу засварлагдсан утгуудыг дахин татах
+
+Хадгалах бүтэц:
+    {store_dir}/hourly/2024-01.parquet   - нэг сарын цагийн нэгтгэл
+    {store_dir}/watermark.json            - сүүлд татсан TIMESTAMP_S
+
+Нэгтгэлийн баганууд (hour_ts, VAR тус бүрд):
+    n, sum, charge_sum, max, min, last_ts, last
+Эдгээрээс дундаж, max, min, сүүлийн утгыг түүхийг дахин уншихгүйгээр гаргаж болно.
+
+Станцуудын (ASSET_CONFIG) хасалтыг build_load_frame бүгдэд нь нэг pivot-оор бодно.
+"""
+
+import os
+import json
+import glob
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text, bindparam
+
+from config import INGEST_CONFIG, ASSET_CONFIG, QUERY_CONFIG
+from db import VALUE_SQL, read_sql, read_named, stream_named
+
+AGGREGATIONS = ('mean', 'max', 'min', 'last')
+NETTING_RULES = ('charge', 'both', 'none')
+
+
+def _load_assets(assets):
+    """ASSET_CONFIG['assets']-ийг шалгаж VAR-ыг том үсгээр нормчлох"""
+    loaded = []
+    for asset in assets:
+        asset = {'aggregation': 'mean', 'netting': 'charge', **asset}
+        asset['var'] = asset['var'].upper()
+        if asset['aggregation'] not in AGGREGATIONS:
+            raise ValueError(f"{asset['var']}: aggregation нь {AGGREGATIONS}-ийн нэг байх ёстой")
+        if asset['netting'] not in NETTING_RULES:
+            raise ValueError(f"{asset['var']}: netting нь {NETTING_RULES}-ийн нэг байх ёстой")
+        loaded.append(asset)
+    return loaded
+
+
+# Татах VAR-ууд
+SYSTEM_VAR = ASSET_CONFIG['system_var'].upper()
+ASSETS = _load_assets(ASSET_CONFIG['assets'])
+BATTERY_VARS = {asset['var']: asset['column'] for asset in ASSETS}
+ASSET_COLUMNS = [asset['column'] for asset in ASSETS]
+NETTED_COLUMNS = [asset['column'] for asset in ASSETS if asset['netting'] != 'none']
+LOAD_COLUMNS = ['time_', 'system_load'] + ASSET_COLUMNS + ['load']
+ALL_VARS = [SYSTEM_VAR] + list(BATTERY_VARS.keys())
+
+AGG_COLUMNS = ['hour_ts', 'VAR', 'n', 'sum', 'charge_sum', 'max', 'min', 'last_ts', 'last']
+
+# Pushdown горим: MySQL өөрөө цаг бүрт нэг мөр, VAR бүрт нэг багана буцаана.
+# hour_ts-ийг бүхэл тооны арифметикаар (TIMESTAMP_S - TIMESTAMP_S % 3600) бодно.
+PIVOT_SYSTEM_COLUMN = f"MAX(CASE WHEN VAR = '{{var}}' THEN {VALUE_SQL} END) AS system_load"
+PIVOT_ASSET_COLUMN = "COALESCE({function}(CASE WHEN VAR = '{var}' THEN {value} END), 0) AS {column}"
+PIVOT_NETTING_VALUE = {
+    'charge': f"CASE WHEN {VALUE_SQL} < 0 THEN -{VALUE_SQL} ELSE 0 END",
+    'both': f"-{VALUE_SQL}",
+    'none': VALUE_SQL,
+}
+PIVOT_FUNCTIONS = {'mean': 'AVG', 'max': 'MAX', 'min': 'MIN'}
+
+
+# ==========================
+# Цагийн нэгтгэл
+# ==========================
+def aggregate_raw_hourly(df_raw):
+    """
+    Түүхий мөрүүдийг (TIMESTAMP_S, VAR, value) цаг + VAR-аар нэгтгэх.
+    charge_sum нь 'charge' хасалттай ижил: сөрөг утгын абсолют, эерэг бол 0.
+    """
+    if df_raw.empty:
+        return pd.DataFrame(columns=AGG_COLUMNS)
+
+    df = df_raw[['TIMESTAMP_S', 'VAR', 'value']].copy()
+    df['TIMESTAMP_S'] = df['TIMESTAMP_S'].astype('int64')
+    # category бол upper() зөвхөн ангилал бүрт нэг удаа ажиллана
+    df['VAR'] = df['VAR'].astype('category').map(str.upper)
+    df['value'] = pd.to_numeric(df['value']).astype('float64')
+    df['charge'] = (-df['value']).clip(lower=0)
+    df['hour_ts'] = df['TIMESTAMP_S'] // 3600 * 3600
+    df = df.sort_values('TIMESTAMP_S', kind='stable')
+
+    agg = df.groupby(['hour_ts', 'VAR'], sort=True, observed=True).agg(
+        n=('value', 'size'),
+        sum=('value', 'sum'),
+        charge_sum=('charge', 'sum'),
+        max=('value', 'max'),
+        min=('value', 'min'),
+        last_ts=('TIMESTAMP_S', 'max'),
+        last=('value', 'last'),
+    ).reset_index()
+    # Parquet партицууд хооронд ангилал зөрөхгүйн тулд нэгтгэлд энгийн мөр
+    agg['VAR'] = agg['VAR'].astype(str)
+
+    return agg[AGG_COLUMNS]
+
+
+def combine_hourly(frames):
+    """
+    Хэсэгчилсэн цагийн нэгтгэлүүдийг (AGG_COLUMNS) нийлүүлэх.
+    Нэг цаг хэд хэдэн chunk-д хуваагдсан бол n/sum/charge_sum нэмэгдэж, max/min,
+    last_ts-ийг авч, last нь хамгийн сүүлийн last_ts-тэй хэсгийнх болно.
+    """
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=AGG_COLUMNS)
+
+    df = pd.concat(frames, ignore_index=True)
+    if not df.duplicated(['hour_ts', 'VAR']).any():
+        return df.sort_values(['hour_ts', 'VAR']).reset_index(drop=True)[AGG_COLUMNS]
+
+    df = df.sort_values(['hour_ts', 'VAR', 'last_ts'], kind='stable')
+    agg = df.groupby(['hour_ts', 'VAR'], sort=True).agg(
+        n=('n', 'sum'),
+        sum=('sum', 'sum'),
+        charge_sum=('charge_sum', 'sum'),
+        max=('max', 'max'),
+        min=('min', 'min'),
+        last_ts=('last_ts', 'max'),
+        last=('last', 'last'),
+    ).reset_index()
+    return agg[AGG_COLUMNS]
+
+
+# ==========================
+# Watermark
+# ==========================
+def _watermark_path(store_dir):
+    return os.path.join(store_dir, 'watermark.json')
+
+
+def read_watermark(store_dir=None):
+    """Хадгалсан TIMESTAMP_S watermark-ыг унших (байхгүй бол None)"""
+    store_dir = store_dir or INGEST_CONFIG['store_dir']
+    path = _watermark_path(store_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('TIMESTAMP_S')
+
+
+def write_watermark(timestamp_s, store_dir=None):
+    """Watermark-ыг атомаар хадгалах"""
+    store_dir = store_dir or INGEST_CONFIG['store_dir']
+    os.makedirs(store_dir, exist_ok=True)
+    path = _watermark_path(store_dir)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'TIMESTAMP_S': int(timestamp_s),
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }, f)
+    os.replace(tmp_path, path)
+
+
+# ==========================
+# Сараар хуваасан Parquet
+# ==========================
+def _partition_dir(store_dir):
+    return os.path.join(store_dir, 'hourly')
+
+
+def _month_key(hour_ts):
+    return pd.to_datetime(hour_ts, unit='s').dt.strftime('%Y-%m')
+
+
+def _write_partition(df, path):
+    tmp_path = path + '.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def write_partitions(df_new, since_ts, store_dir=None):
+    """
+    Шинэ нэгтгэлийг сарын файлуудад бичих.
+    since_ts-ээс хойшхи хуучин мөрүүдийг шинээр солино (overlap засвар).
+    """
+    store_dir = store_dir or INGEST_CONFIG['store_dir']
+    part_dir = _partition_dir(store_dir)
+    os.makedirs(part_dir, exist_ok=True)
+
+    if df_new.empty:
+        return []
+
+    df_new = df_new.copy()
+    df_new['_month'] = _month_key(df_new['hour_ts'])
+
+    written = []
+    for month, df_month in df_new.groupby('_month'):
+        path = os.path.join(part_dir, f"{month}.parquet")
+        df_month = df_month.drop(columns='_month')
+
+        if os.path.exists(path):
+            df_old = pd.read_parquet(path)
+            df_old = df_old[df_old['hour_ts'] < since_ts]
+            df_month = pd.concat([df_old, df_month], ignore_index=True)
+
+        df_month = df_month.sort_values(['hour_ts', 'VAR']).reset_index(drop=True)
+        _write_partition(df_month[AGG_COLUMNS], path)
+        written.append(path)
+
+    return written
+
+
+def load_hourly_store(store_dir=None, start_ts=None, columns=None):
+    """Сарын файлуудаас цагийн нэгтгэлийг унших"""
+    store_dir = store_dir or INGEST_CONFIG['store_dir']
+    paths = sorted(glob.glob(os.path.join(_partition_dir(store_dir), '*.parquet')))
+
+    if start_ts is not None:
+        start_month = pd.to_datetime(start_ts, unit='s').strftime('%Y-%m')
+        paths = [p for p in paths if os.path.basename(p)[:7] >= start_month]
+
+    if not paths:
+        return pd.DataFrame(columns=columns or AGG_COLUMNS)
+
+    df = pd.concat([pd.read_parquet(p, columns=columns) for p in paths], ignore_index=True)
+    if columns is None:
+        # 'min' баганагүй хуучин партицуудыг одоогийн бүтэцтэй болгох
+        df = df.reindex(columns=AGG_COLUMNS)
+    if start_ts is not None and 'hour_ts' in df.columns:
+        df = df[df['hour_ts'] >= start_ts]
+    return df.reset_index(drop=True)
+
+
+# ==========================
+# Incremental татах
+# ==========================
+def start_timestamp(start=None):
+    """
+    INGEST_CONFIG['start']-ийг TIMESTAMP_S болгох.
+    Эхлэх цагийг MySQL session-ий цагийн бүсээр (UTC + QUERY_CONFIG['db_tz_offset_hours'])
+    ойлгоно - анхны UNIX_TIMESTAMP('2024-01-05 00:00:00') query-тэй ижил.
+    """
+    start = pd.Timestamp(start or INGEST_CONFIG['start'])
+    return int(start.timestamp()) - QUERY_CONFIG['db_tz_offset_hours'] * 3600
+
+
+def fetch_since(engine, since_ts, vars_=None):
+    """since_ts-ээс хойшхи түүхий мөрүүдийг татах"""
+    vars_ = vars_ or ALL_VARS
+    return read_named('raw_since', engine, ttl=0, vars=list(vars_), calculation=50, since=int(since_ts))
+
+
+def stream_hourly(engine, since_ts, vars_=None, chunk_rows=None):
+    """
+    since_ts-ээс хойшхи түүхий мөрүүдийг server-side cursor-оор chunk-аар уншиж
+    цагийн нэгтгэлд дараалан нугалах. Мөрүүд TIMESTAMP_S-ээр эрэмбэлэгдсэн тул
+    зөвхөн chunk-уудын заагт орсон цагийг combine_hourly-гаар нийлүүлнэ.
+    Буцаах утга: (цагийн нэгтгэл, түүхий мөрийн тоо)
+    """
+    vars_ = vars_ or ALL_VARS
+    parts, rows = [], 0
+    for chunk in stream_named('raw_since', engine, chunk_rows,
+                              vars=list(vars_), calculation=50, since=int(since_ts)):
+        rows += len(chunk)
+        agg = aggregate_raw_hourly(chunk)
+        if parts and not agg.empty:
+            previous = parts[-1]
+            boundary = previous['hour_ts'] >= agg['hour_ts'].min()
+            if boundary.any():
+                parts[-1] = previous[~boundary]
+                agg = combine_hourly([previous[boundary], agg])
+        parts.append(agg)
+    return combine_hourly(parts), rows
+
+
+def hourly_pivot_query():
+    """Цагийн pivot query (system max + станц бүрийн хасалтын нэгтгэл) үүсгэх"""
+    columns = [PIVOT_SYSTEM_COLUMN.format(var=SYSTEM_VAR)]
+    for asset in ASSETS:
+        if asset['aggregation'] not in PIVOT_FUNCTIONS:
+            raise ValueError(f"{asset['var']}: '{asset['aggregation']}' нэгтгэлийг pushdown дэмжихгүй")
+        columns.append(PIVOT_ASSET_COLUMN.format(
+            function=PIVOT_FUNCTIONS[asset['aggregation']], var=asset['var'],
+            value=PIVOT_NETTING_VALUE[asset['netting']], column=asset['column'],
+        ))
+    select_list = ",\n    ".join(columns)
+    return f"""
+SELECT
+    TIMESTAMP_S - (TIMESTAMP_S % 3600) AS hour_ts,
+    {select_list}
+FROM z_conclusion
+WHERE VAR IN :vars
+  AND CALCULATION = 50
+  AND TIMESTAMP_S >= :since
+GROUP BY TIMESTAMP_S - (TIMESTAMP_S % 3600)
+HAVING system_load IS NOT NULL
+ORDER BY hour_ts
+"""
+
+
+def fetch_hourly_pivot(engine, since_ts, tz_offset_hours=8):
+    """
+    Pushdown горим: станцуудын хасалт, цагийн max/нэгтгэлийг MySQL дээр бодож
+    main.py-н df_load хүснэгтийг шууд буцаах
+    """
+    query = text(hourly_pivot_query()).bindparams(
+        bindparam('vars', value=ALL_VARS, expanding=True),
+        since=int(since_ts)
+    )
+    df = read_sql(query, engine)
+
+    for col in ['system_load'] + ASSET_COLUMNS:
+        df[col] = pd.to_numeric(df[col]).astype('float64')
+
+    df['load'] = df['system_load'] - df[NETTED_COLUMNS].sum(axis=1)
+    df['time_'] = pd.to_datetime(df['hour_ts'].astype('int64') + tz_offset_hours * 3600, unit='s')
+    df = df[LOAD_COLUMNS]
+
+    return df.sort_values('time_').reset_index(drop=True)
+
+
+def update_hourly_store(engine, store_dir=None):
+    """
+    Локал санг шинэчлэх:
+    1. watermark - overlap цагаас (цагийн эхэнд тааруулж) татах
+    2. Тэр цагаас хойшхи нэгтгэлийг шинээр бодож солих
+    3. Watermark-ыг шинэчлэх
+    Буцаах утга: шинээр татсан түүхий мөрийн тоо
+    """
+    store_dir = store_dir or INGEST_CONFIG['store_dir']
+    watermark = read_watermark(store_dir)
+
+    if watermark is None:
+        since_ts = start_timestamp()
+        print(f"   📦 Локал сан хоосон: {INGEST_CONFIG['start']}-аас бүгдийг татна")
+    else:
+        since_ts = int(watermark) - INGEST_CONFIG['overlap_hours'] * 3600
+        print(f"   📦 Watermark: {pd.to_datetime(watermark, unit='s')} (overlap {INGEST_CONFIG['overlap_hours']} цаг)")
+
+    # Цагийн эхэнд тааруулах - тухайн цагийн нэгтгэл бүтэн байх ёстой
+    since_ts = since_ts // 3600 * 3600
+
+    # Эхний татахад олон жилийн мөр ирж болох тул chunk-аар уншиж шууд нэгтгэнэ
+    df_new, rows = stream_hourly(engine, since_ts)
+    print(f"   📥 Шинэ түүхий мөр: {rows}")
+
+    if df_new.empty:
+        return 0
+
+    write_partitions(df_new, since_ts, store_dir)
+    write_watermark(df_new['last_ts'].max(), store_dir)
+
+    return rows
+
+
+# ==========================
+# main.py-д зориулсан цагийн хүснэгт
+# ==========================
+def asset_hourly_values(df_assets, assets=None):
+    """
+    Станцуудын цагийн нэгтгэлээс (AGG_COLUMNS) мөр бүрийн хасах утгыг векторчилж бодох.
+    Дүрэм (aggregation, netting)-ийг VAR-аар map хийж бүх станцыг нэг дор тооцно:
+    - 'both' / 'charge': утгын эсрэг тэмдэг (-v) дээр нэгтгэнэ, тэгэхээр max(-v) = -min(v)
+    - 'charge': 0-ээс доошхийг тайрна; дундаж нь charge_sum / n (тайрсны дараах дундаж)
+    - 'none': түүхий утгын нэгтгэл
+    """
+    assets = ASSETS if assets is None else assets
+    rules = {a['var']: (a['aggregation'], a['netting']) for a in assets}
+    # Дүрмийг мөр бүрт биш, ялгаатай VAR бүрт нэг удаа хайна
+    codes, uniques = pd.factorize(df_assets['VAR'])
+    aggregation = np.array([rules[var][0] for var in uniques], dtype=object)[codes]
+    netting = np.array([rules[var][1] for var in uniques], dtype=object)[codes]
+
+    n = df_assets['n'].to_numpy(dtype='float64')
+    mean = df_assets['sum'].to_numpy(dtype='float64') / n
+    high = df_assets['max'].to_numpy(dtype='float64')
+    low = df_assets['min'].to_numpy(dtype='float64')
+    last = df_assets['last'].to_numpy(dtype='float64')
+
+    negate = netting != 'none'
+    value = np.select(
+        [aggregation == 'mean', aggregation == 'max', aggregation == 'min'],
+        [np.where(negate, -mean, mean), np.where(negate, -low, high), np.where(negate, -high, low)],
+        default=np.where(negate, -last, last),
+    )
+    charge = netting == 'charge'
+    charge_mean = df_assets['charge_sum'].to_numpy(dtype='float64') / n
+    return np.where(charge, np.where(aggregation == 'mean', charge_mean, np.clip(value, 0, None)), value)
+
+
+def build_load_frame(df_hourly, tz_offset_hours=8):
+    """
+    Цагийн нэгтгэлээс main.py-н df_load хүснэгтийг үүсгэх:
+    time_, system_load, <ASSET_CONFIG-ийн баганууд>, load
+    - system_load: цагийн max
+    - станц: asset_hourly_values (бүх станц нэг pivot-оор), дутуу цаг 0
+    - load: system_load - netting != 'none' станцуудын нийлбэр
+    """
+    if df_hourly.empty:
+        return pd.DataFrame(columns=LOAD_COLUMNS)
+
+    df = df_hourly[df_hourly['VAR'].isin(ALL_VARS)]
+    system = df[df['VAR'] == SYSTEM_VAR].set_index('hour_ts')['max'].rename('system_load')
+
+    df_assets = df[df['VAR'] != SYSTEM_VAR]
+    assets = df_assets[['hour_ts', 'VAR']].assign(value=asset_hourly_values(df_assets)).pivot(
+        index='hour_ts', columns='VAR', values='value'
+    ).rename(columns=BATTERY_VARS)
+
+    df_load = system.to_frame().join(assets, how='left')
+    df_load = df_load.reindex(columns=['system_load'] + ASSET_COLUMNS).fillna({c: 0 for c in ASSET_COLUMNS})
+    df_load['load'] = df_load['system_load'] - df_load[NETTED_COLUMNS].sum(axis=1)
+
+    df_load = df_load.reset_index()
+    df_load['time_'] = pd.to_datetime(df_load['hour_ts'] + tz_offset_hours * 3600, unit='s')
+    df_load = df_load[LOAD_COLUMNS]
+
+    return df_load.sort_values('time_').reset_index(drop=True)
+
+
+def build_last_value_frame(df_hourly, var=SYSTEM_VAR, tz_offset_hours=0):
+    """Цаг бүрийн сүүлийн утга (main_system_total.py-н load)"""
+    df = df_hourly[df_hourly['VAR'] == var]
+    df_load = pd.DataFrame({
+        'time_': pd.to_datetime(df['hour_ts'] + tz_offset_hours * 3600, unit='s'),
+        'load': df['last'].astype('float64'),
+    })
+    return df_load.sort_values('time_').reset_index(drop=True)
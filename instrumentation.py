@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Үе шат бүрийн хугацаа / санах ойн хэмжилт (үргэлж идэвхтэй, бараг зардалгүй)
+- start_run(script): скриптийн эхэнд нэг удаа
+- mark(stage, rows): үе шат дуусах бүрд - өмнөх mark-аас хойшхи wall time,
+  CPU time, одоогийн RSS ба өмнөх mark-аас хойшхи өөрчлөлт (rss_delta_mb),
+  тухайн мөч хүртэлх процессын дээд RSS (process_peak_rss_mb), мөрийн тоог бүртгэнэ.
+  ru_maxrss нь процессын бүх хугацааны дээд утга тул үе шат бүрийн оргил биш
+- summary(): Laravel-ийн metrics payload-д хавсаргах товч хураангуй
+- finish_run(): ажиллалтын бичлэгийг METRICS_CONFIG['jsonl']-д нэг мөр JSON болгон нэмж,
+  тохируулсан бол Prometheus textfile (node_exporter textfile collector) бичнэ
+
+start_run дуудаагүй процесст (жишээ нь forecast_service) mark юу ч хийхгүй.
+"""
+
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config import METRICS_CONFIG
+
+_run = None
+
+
+def peak_rss_mb():
+    """Процессын эхлэлээс хойшхи дээд RSS (МБ)"""
+    if resource is None:
+        return None
+    # Linux дээр ru_maxrss нь КБ
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def current_rss_mb():
+    """Одоогийн RSS (МБ, /proc байхгүй бол None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def start_run(script):
+    """Шинэ ажиллалт эхлүүлэх"""
+    global _run
+    now_wall, now_cpu = time.perf_counter(), time.process_time()
+    _run = {
+        'run_id': uuid.uuid4().hex[:12],
+        'script': script,
+        'started_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'start_wall': now_wall,
+        'start_cpu': now_cpu,
+        'last_wall': now_wall,
+        'last_cpu': now_cpu,
+        'last_rss': current_rss_mb(),
+        'stages': [],
+    }
+    return _run['run_id']
+
+
+def mark(stage, rows=None):
+    """Өмнөх mark-аас хойшхи хэсгийг stage нэрээр бүртгэх"""
+    if _run is None:
+        return None
+    now_wall, now_cpu, rss = time.perf_counter(), time.process_time(), current_rss_mb()
+    record = {
+        'stage': stage,
+        'wall_s': round(now_wall - _run['last_wall'], 3),
+        'cpu_s': round(now_cpu - _run['last_cpu'], 3),
+        'rss_mb': rss,
+        'rss_delta_mb': None if rss is None or _run['last_rss'] is None else round(rss - _run['last_rss'], 1),
+        'process_peak_rss_mb': peak_rss_mb(),
+        'rows': None if rows is None else int(rows),
+    }
+    _run['stages'].append(record)
+    _run['last_wall'], _run['last_cpu'], _run['last_rss'] = now_wall, now_cpu, rss
+    return record
+
+
+def summary():
+    """
+    Үе шат бүрийн нэгтгэл (ижил нэртэй mark-уудыг нэмнэ).
+    Буцаах утга: {'run_id', 'total_s', 'peak_rss_mb' (процессын дээд), 'stages': {stage: {...}}}
+    """
+    if _run is None:
+        return {}
+    stages = {}
+    for record in _run['stages']:
+        entry = stages.setdefault(record['stage'], {'wall_s': 0.0, 'cpu_s': 0.0, 'rss_delta_mb': None,
+                                                    'process_peak_rss_mb': None, 'rows': None})
+        entry['wall_s'] = round(entry['wall_s'] + record['wall_s'], 3)
+        entry['cpu_s'] = round(entry['cpu_s'] + record['cpu_s'], 3)
+        if record['rss_delta_mb'] is not None:
+            entry['rss_delta_mb'] = round((entry['rss_delta_mb'] or 0) + record['rss_delta_mb'], 1)
+        entry['process_peak_rss_mb'] = record['process_peak_rss_mb']
+        if record['rows'] is not None:
+            entry['rows'] = (entry['rows'] or 0) + record['rows']
+    return {
+        'run_id': _run['run_id'],
+        'total_s': round(time.perf_counter() - _run['start_wall'], 3),
+        'cpu_s': round(time.process_time() - _run['start_cpu'], 3),
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': stages,
+    }
+
+
+def _prometheus_lines(run_summary, script):
+    lines = [
+        '# HELP forecast_stage_wall_seconds Wall time of a pipeline stage',
+        '# TYPE forecast_stage_wall_seconds gauge',
+    ]
+    for stage, entry in run_summary['stages'].items():
+        lines.append(f'forecast_stage_wall_seconds{{script="{script}",stage="{stage}"}} {entry["wall_s"]}')
+    lines += [
+        '# HELP forecast_stage_cpu_seconds CPU time of a pipeline stage',
+        '# TYPE forecast_stage_cpu_seconds gauge',
+    ]
+    for stage, entry in run_summary['stages'].items():
+        lines.append(f'forecast_stage_cpu_seconds{{script="{script}",stage="{stage}"}} {entry["cpu_s"]}')
+    lines += [
+        '# TYPE forecast_run_seconds gauge',
+        f'forecast_run_seconds{{script="{script}"}} {run_summary["total_s"]}',
+        '# TYPE forecast_run_peak_rss_megabytes gauge',
+        f'forecast_run_peak_rss_megabytes{{script="{script}"}} {run_summary["peak_rss_mb"] or 0}',
+        '# TYPE forecast_run_timestamp_seconds gauge',
+        f'forecast_run_timestamp_seconds{{script="{script}"}} {int(time.time())}',
+    ]
+    return lines
+
+
+def finish_run():
+    """Ажиллалтын бичлэгийг JSON lines (+ Prometheus textfile) болгон хадгалж хэвлэх"""
+    if _run is None:
+        return None
+    run_summary = summary()
+    record = {
+        'run_id': _run['run_id'],
+        'script': _run['script'],
+        'started_at': _run['started_at'],
+        'total_s': run_summary['total_s'],
+        'cpu_s': run_summary['cpu_s'],
+        'peak_rss_mb': run_summary['peak_rss_mb'],
+        'stages': _run['stages'],
+    }
+
+    jsonl_path = METRICS_CONFIG['jsonl']
+    if jsonl_path:
+        os.makedirs(os.path.dirname(jsonl_path) or '.', exist_ok=True)
+        with open(jsonl_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    textfile = METRICS_CONFIG['prometheus_textfile']
+    if textfile:
+        with open(textfile + '.tmp', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(_prometheus_lines(run_summary, _run['script'])) + '\n')
+        os.replace(textfile + '.tmp', textfile)
+
+    print(f"\n⏱️ Үе шатууд (нийт {run_summary['total_s']:.1f} сек, процессын дээд RSS {run_summary['peak_rss_mb']} МБ):")
+    for stage, entry in run_summary['stages'].items():
+        rows = f", {entry['rows']} мөр" if entry['rows'] is not None else ''
+        rss = f", RSS {entry['rss_delta_mb']:+.1f} МБ" if entry['rss_delta_mb'] is not None else ''
+        print(f"   {stage:16s} {entry['wall_s']:7.2f} сек (CPU {entry['cpu_s']:.2f}){rss}{rows}")
+    return record
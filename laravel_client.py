@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Laravel API руу өгөгдөл илгээх client
+- DataFrame-ийг мөр мөрөөр биш, баганаар (vectorized) JSON болгоно
+- Нэг keep-alive session, сонголтоор gzip шахалт (Content-Encoding: gzip)
+- Том хүснэгтийг batch болгон thread pool-оор зэрэг илгээнэ (max_workers хүртэл)
+- Batch бүрийн үр дүнг (амжилт, статус, алдаа, хугацаа) тайлан болгон буцаана
+"""
+
+import gzip
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import LARAVEL_API_URL, LARAVEL_LAST_HISTORY_URL, LARAVEL_CONFIG
+from offline import install
+
+# Нэмэлтээр илгээж болох баганууд (байвал payload-д орно)
+EXTRA_COLUMNS = ['system_load', 'forecast_daily', 'forecast_hourly']
+
+
+def _make_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=LARAVEL_CONFIG['max_workers'])
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    # OFFLINE_MODE=record/replay бол hook эсвэл stub adapter суулгана
+    return install(session)
+
+
+_session = _make_session()
+
+
+# ==========================
+# Serialization
+# ==========================
+def frame_to_records(df, value_column, extra_columns=None):
+    """
+    DataFrame → [{'time': ..., 'value': ..., 'system_load': ...}, ...]
+    time_ баганыг нэг дор string болгож, утгуудыг float болгоно.
+    extra_columns None бол EXTRA_COLUMNS-ээс df-д байгааг нь авна.
+    """
+    if extra_columns is None:
+        extra_columns = [c for c in EXTRA_COLUMNS if c in df.columns and c != value_column]
+
+    out = pd.DataFrame({
+        'time': pd.to_datetime(df['time_']).dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'value': df[value_column].astype('float64'),
+    })
+    for column in extra_columns:
+        out[column] = df[column].astype('float64')
+
+    return out.to_dict('records')
+
+
+def _encode(payload):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers = {'Content-Type': 'application/json'}
+    if LARAVEL_CONFIG['gzip']:
+        body = gzip.compress(body, mtime=0)  # ижил payload → ижил байт (replay-д таарна)
+        headers['Content-Encoding'] = 'gzip'
+    return body, headers
+
+
+# ==========================
+# Илгээх
+# ==========================
+def post_json(payload, label=None):
+    """
+    Нэг payload илгээх (алдаа гарвал backoff-оор дахин оролдоно).
+    Буцаах утга: {'label', 'ok', 'status', 'error', 'attempts', 'elapsed'}
+    """
+    body, headers = _encode(payload)
+    started = time.perf_counter()
+    result = {'label': label or payload.get('type'), 'ok': False, 'status': None, 'error': None}
+
+    max_retries = LARAVEL_CONFIG['max_retries']
+    for attempt in range(max_retries + 1):
+        result['attempts'] = attempt + 1
+        try:
+            response = _session.post(LARAVEL_API_URL, data=body, headers=headers,
+                                     timeout=LARAVEL_CONFIG['timeout'])
+            result['status'] = response.status_code
+            if response.status_code == 200:
+                result['ok'] = True
+                result['error'] = None
+                break
+            result['error'] = f"HTTP {response.status_code}"
+            # 4xx нь дахин оролдоход засрахгүй
+            if response.status_code < 500:
+                break
+        except requests.RequestException as e:
+            result['error'] = str(e)
+
+        if attempt < max_retries:
+            time.sleep(LARAVEL_CONFIG['backoff_seconds'] * (2 ** attempt))
+
+    result['elapsed'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def send_frame(data_type, df, value_column, extra_columns=None, batch_size=None):
+    """
+    DataFrame-ийг batch болгон зэрэг илгээх.
+    Буцаах утга: batch бүрийн post_json тайлан (дарааллаараа) + 'batch', 'rows'
+    """
+    if len(df) == 0:
+        return []
+
+    records = frame_to_records(df, value_column, extra_columns)
+    batch_size = batch_size or LARAVEL_CONFIG['batch_size']
+    batches = [records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+
+    def _send(index, batch):
+        result = post_json({'type': data_type, 'data': batch},
+                           label=f"{data_type} {index + 1}/{len(batches)}")
+        result.update(batch=index + 1, rows=len(batch))
+        return result
+
+    started = time.perf_counter()
+    if len(batches) == 1:
+        report = [_send(0, batches[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=LARAVEL_CONFIG['max_workers']) as executor:
+            report = list(executor.map(_send, range(len(batches)), batches))
+
+    print_report(data_type, report, time.perf_counter() - started)
+    return report
+
+
+def print_report(data_type, report, elapsed):
+    """Илгээлтийн товч тайлан хэвлэх"""
+    n_ok = sum(r['ok'] for r in report)
+    rows_ok = sum(r['rows'] for r in report if r['ok'])
+    rows_total = sum(r['rows'] for r in report)
+
+    if n_ok == len(report):
+        print(f"   ✅ {data_type}: {rows_total} бичлэг ({len(report)} batch, {elapsed:.1f} сек)")
+        return
+
+    print(f"   ⚠️ {data_type}: {rows_ok}/{rows_total} бичлэг, {n_ok}/{len(report)} batch амжилттай")
+    for r in report:
+        if not r['ok']:
+            print(f"      ❌ Batch {r['batch']}: {r['rows']} мөр - {r['error']} ({r['attempts']} оролдлого)")
+
+
+def get_last_history_time():
+    """Laravel дээрх түүхэн өгөгдлийн сүүлийн цаг (байхгүй бол None)"""
+    response = _session.get(LARAVEL_LAST_HISTORY_URL, timeout=LARAVEL_CONFIG['timeout'])
+    response.raise_for_status()
+    data = response.json()
+    if data.get('success') and data.get('last_time'):
+        return pd.to_datetime(data['last_time']).tz_localize(None)
+    return None
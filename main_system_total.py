@@ -9,68 +9,87 @@
 """
 
 import pandas as pd
-from sqlalchemy import create_engine
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import AdaBoostRegressor
-from sklearn.tree import DecisionTreeRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import requests
 from datetime import datetime, timedelta
 import warnings
-import time
 import numpy as np
 
 # Тохиргоо импортлох
-from config import DB_CONFIG, LOCATION, MODEL_CONFIG, PLOT_CONFIG
+from config import LOCATION, MODEL_CONFIG, PLOT_CONFIG, FILES, INGEST_CONFIG, FORECAST_CONFIG, ARCHIVE_CONFIG
+from db import get_engine, read_sql
+from outputs import write_output
+from plotting import new_chart, add_series, submit_chart, wait_charts
+from forecast_archive import archive_forecast
+from instrumentation import start_run, mark, finish_run
+from weather import get_temperature_history
+from model_registry import model_key, save_models, config_hash, tuned_model_config
+from regressors import build_regressor
+from scheduler import parse_run_mode, select_models
+from features import DAILY_FEATURES, HOURLY_FEATURES, MAX_HOURLY_HORIZON, forecast_day_ahead, forecast_hourly
+from feature_store import feature_frame
+from hourly_store import SYSTEM_VAR, start_timestamp, update_hourly_store, load_hourly_store, stream_hourly, build_last_value_frame
+from queries import last_value_per_hour_query, read_last_value_per_hour, day_range
 
 warnings.filterwarnings("ignore")
 
+# tune.py-ийн сүүлийн хувилбар (байхгүй бол config.py-ийн MODEL_CONFIG)
+MODEL_CONFIG = tuned_model_config('system_total', MODEL_CONFIG)
+
+# Үе шат бүрийн хугацаа / санах ойг бүртгэж эхлэх
+start_run('system_total')
+
 # ==========================
 # 1️⃣ MySQL холболт
 # ==========================
-engine = create_engine(
-    "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
-)
+engine = get_engine()
 
 # ==========================
 # 2️⃣ Системийн нийт хэрэглээ татах (батарей хасахгүй)
 # ==========================
 print("📊 MySQL-ээс системийн нийт хэрэглээ татаж байна...")
 
-query = """
-SELECT
-    t.max_ts AS TIMESTAMP_S,
-    CAST(z.VALUE AS DECIMAL(10,2)) AS value
-FROM z_conclusion z
-JOIN (
-    SELECT
-        MAX(TIMESTAMP_S) AS max_ts
-    FROM z_conclusion
-    WHERE VAR = 'SYSTEM_TOTAL_P'
-      AND CALCULATION = 50
-    GROUP BY FROM_UNIXTIME(TIMESTAMP_S, '%%Y-%%m-%%d %%H')
-) t ON z.TIMESTAMP_S = t.max_ts
-WHERE z.VAR = 'SYSTEM_TOTAL_P'
-  AND z.CALCULATION = 50
-ORDER BY t.max_ts
-"""
+# store / stream горимд түүх INGEST_CONFIG['start']-аас эхэлнэ (main.py-тай нэг сан),
+# 'full' горим бүх түүхийг уншина
+if INGEST_CONFIG['mode'] == 'store':
+    # Локал цагийн сан: цаг бүрийн сүүлийн утгыг сангаас уншина
+    raw_rows = update_hourly_store(engine)
+    mark('mysql_read', rows=raw_rows)
+    df_load = build_last_value_frame(load_hourly_store(), tz_offset_hours=0)
+
+    if df_load.empty:
+        print("❌ Алдаа: Өгөгдөл олдсонгүй!")
+        exit(1)
+elif INGEST_CONFIG['mode'] == 'stream':
+    # Бүх түүхий мөрийг chunk-аар урсгаж цаг бүрийн сүүлийн утгыг нэгтгэлээс авна
+    df_hourly, raw_rows = stream_hourly(engine, start_timestamp(), vars_=[SYSTEM_VAR])
+    mark('mysql_read', rows=raw_rows)
+    df_load = build_last_value_frame(df_hourly, tz_offset_hours=0)
+
+    if df_load.empty:
+        print("❌ Алдаа: Өгөгдөл олдсонгүй!")
+        exit(1)
+    print(f"✅ Stream: {raw_rows} түүхий мөр → {len(df_load)} цаг")
+else:
+    query = last_value_per_hour_query(calculation=50)
 
-df_raw = pd.read_sql(query, engine)
+    df_raw = read_sql(query, ttl=0)
+    mark('mysql_read', rows=len(df_raw))
 
-if df_raw.empty:
-    print("❌ Алдаа: Өгөгдөл олдсонгүй!")
-    exit(1)
+    if df_raw.empty:
+        print("❌ Алдаа: Өгөгдөл олдсонгүй!")
+        exit(1)
 
-print(f"✅ Түүхийн өгөгдөл: {len(df_raw)} мөр")
+    print(f"✅ Түүхийн өгөгдөл: {len(df_raw)} мөр")
 
-# UNIX timestamp-ыг datetime болгох
-df_raw['time_'] = pd.to_datetime(df_raw['TIMESTAMP_S'], unit='s')
+    # Цагийн эхлэл (hour_ts) - store / stream горимын build_last_value_frame-тэй ижил time_
+    df_raw['time_'] = pd.to_datetime(df_raw['hour_ts'], unit='s')
 
-# Query-д цаг бүрийн сүүлийн timestamp авсан учир шууд ашиглана
-df_load = df_raw[['time_', 'value']].copy()
-df_load.columns = ['time_', 'load']
+    # Утга нь цаг бүрийн сүүлийн (MAX(TIMESTAMP_S)) мөрийнх
+    df_load = df_raw[['time_', 'value']].copy()
+    df_load.columns = ['time_', 'load']
+
+mark('hour_bucketing', rows=len(df_load))
 
 print(f"\n✅ Цагийн өгөгдөл бэлэн: {len(df_load)} цаг")
 print(f"   Хугацаа: {df_load['time_'].min()} - {df_load['time_'].max()}")
@@ -78,26 +97,10 @@ print(f"   Системийн хэрэглээ: {df_load['load'].min():.0f} - {d
 
 # Өнөөдрийн бодит өгөгдлийг MySQL-ээс шууд татах (найдвартай)
 today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-query_today = """
-SELECT
-    FROM_UNIXTIME(t.max_ts, '%%Y-%%m-%%d %%H:00:00') AS time_,
-    CAST(z.VALUE AS DECIMAL(10,2)) AS load_value
-FROM z_conclusion z
-JOIN (
-    SELECT
-        MAX(TIMESTAMP_S) AS max_ts
-    FROM z_conclusion
-    WHERE VAR = 'SYSTEM_TOTAL_P'
-      AND TIMESTAMP_S >= UNIX_TIMESTAMP(CURDATE())
-      AND TIMESTAMP_S < UNIX_TIMESTAMP(CURDATE() + INTERVAL 1 DAY)
-    GROUP BY FROM_UNIXTIME(TIMESTAMP_S, '%%Y-%%m-%%d %%H')
-) t ON z.TIMESTAMP_S = t.max_ts
-WHERE z.VAR = 'SYSTEM_TOTAL_P'
-ORDER BY time_
-"""
-df_today_actual = pd.read_sql(query_today, engine)
-df_today_actual['time_'] = pd.to_datetime(df_today_actual['time_'])
-df_today_actual['load'] = pd.to_numeric(df_today_actual['load_value'])
+start_ts, end_ts = day_range()
+df_today_actual = read_last_value_per_hour(engine, start_ts=start_ts, end_ts=end_ts, calculation=None)
+df_today_actual = df_today_actual.rename(columns={'value': 'load'})[['time_', 'load']]
+mark('today_read', rows=len(df_today_actual))
 
 print(f"\n✅ Өнөөдрийн бодит: {len(df_today_actual)} цаг")
 if len(df_today_actual) > 0:
@@ -106,28 +109,6 @@ if len(df_today_actual) > 0:
 # ==========================
 # 3️⃣ Temperature Open-Meteo API-аас татах
 # ==========================
-def get_temperature_openmeteo(start_date, end_date):
-    """Open-Meteo API - ҮНЭГҮЙ, API key шаардлагагүй!"""
-    url = "https://archive-api.open-meteo.com/v1/archive"
-    params = {
-        "latitude": LOCATION['latitude'],
-        "longitude": LOCATION['longitude'],
-        "start_date": start_date,
-        "end_date": end_date,
-        "hourly": "temperature_2m",
-        "timezone": LOCATION['timezone']
-    }
-
-    response = requests.get(url, params=params)
-    data = response.json()
-
-    df = pd.DataFrame({
-        'time_': pd.to_datetime(data['hourly']['time']),
-        'temp': data['hourly']['temperature_2m']
-    })
-
-    return df
-
 # Load датаны хугацааг шалгаж температур татах
 load_start = df_load['time_'].min().strftime("%Y-%m-%d")
 load_end = df_load['time_'].max().strftime("%Y-%m-%d")
@@ -135,71 +116,34 @@ load_end = df_load['time_'].max().strftime("%Y-%m-%d")
 print("\n🌡️ Температур татаж байна (Open-Meteo API)...")
 print(f"   Хугацаа: {load_start} → {load_end}")
 
-# Хугацааг жилээр хувааж татах
-all_temp_data = []
-current_year = datetime.strptime(load_start, "%Y-%m-%d").year
-end_year = datetime.strptime(load_end, "%Y-%m-%d").year
-
-for year in range(current_year, end_year + 1):
-    try:
-        year_start = f"{year}-01-01" if year > current_year else load_start
-        year_end = f"{year}-12-31" if year < end_year else load_end
-
-        print(f"   → {year_start} ~ {year_end}")
-        df_temp_year = get_temperature_openmeteo(year_start, year_end)
-        all_temp_data.append(df_temp_year)
-        time.sleep(1)
-
-    except Exception as e:
-        print(f"   ⚠️ Алдаа {year}: {e}")
-
-# Температурын датаг нэгтгэх
-df_temp = pd.concat(all_temp_data, ignore_index=True)
-df_temp = df_temp.drop_duplicates(subset=['time_']).sort_values('time_')
+# Кэшэд байхгүй өдрүүдийг л API-аас татна
+df_temp = get_temperature_history(load_start, load_end)
+mark('open_meteo', rows=len(df_temp))
 
 print(f"✅ {len(df_temp)} цагийн температур бэлэн боллоо!")
 print(f"   Температур: {df_temp['temp'].min():.1f}°C → {df_temp['temp'].max():.1f}°C")
 print("=" * 60)
 
 # ==========================
-# 4️⃣ Load + Temperature merge
-# ==========================
-df = pd.merge(df_load, df_temp, on='time_', how='inner')
-df['wd'] = df['time_'].dt.weekday
-
-print(f"📊 Merge хийсний дараа: {len(df)} бичлэг")
-
-# ==========================
-# 5️⃣ Feature engineering
+# 4️⃣ Load + Temperature merge + Feature engineering
 # ==========================
-for i in range(1, 4):
-    df[f'load-{i}h'] = df['load'].shift(i)
-
-for i in range(1, 8):
-    df[f'load-{i}d'] = df['load'].shift(i*24)
-
-df['year'] = df['time_'].dt.year
-df['month'] = df['time_'].dt.month
-df['day'] = df['time_'].dt.day
-df['hour'] = df['time_'].dt.hour
-
-df = df.dropna()
+# Python weekday(): Даваа=0, ..., Ням=6
+df = feature_frame('system_total', df_load, df_temp, weekday='python')
+mark('merge_features', rows=len(df))
 print(f"📊 Feature engineering хийсний дараа: {len(df)} бичлэг")
 print("=" * 60)
 
 # ==========================
 # 6️⃣ Train-test split
 # ==========================
-X_daily = df[['year','month','day','hour','temp','wd',
-              'load-1d','load-2d','load-3d','load-4d',
-              'load-5d','load-6d','load-7d']]
+X_daily = df[DAILY_FEATURES]
 y_daily = df['load']
 
 x_train, x_test, y_train, y_test = train_test_split(
     X_daily, y_daily, test_size=MODEL_CONFIG['test_size'], shuffle=False
 )
 
-X_hourly = df[['month','day','hour','temp','wd','load-1h','load-2h','load-3h']]
+X_hourly = df[HOURLY_FEATURES]
 y_hourly = df['load']
 
 x_train_h, x_test_h, y_train_h, y_test_h = train_test_split(
@@ -213,23 +157,34 @@ print("=" * 60)
 # ==========================
 # 7️⃣ Модель үүсгэх
 # ==========================
-print("🤖 Модель сургаж байна...")
-
-model_daily = AdaBoostRegressor(
-    DecisionTreeRegressor(max_depth=MODEL_CONFIG['daily']['max_depth']),
-    n_estimators=MODEL_CONFIG['daily']['n_estimators'],
-    random_state=MODEL_CONFIG['daily']['random_state']
+# Сургах эсэхийг ажиллах горимоор шийднэ (--mode train|predict|auto)
+# predict горимд хадгалсан сүүлийн моделиор зөвхөн predict хийнэ
+run_mode = parse_run_mode()
+feature_columns = {'daily': list(X_daily.columns), 'hourly': list(X_hourly.columns)}
+registry_key = model_key('system_total', f"{df['time_'].max()}|{len(df)}", feature_columns, MODEL_CONFIG)
+cached_models, model_reason = select_models(
+    'system_total', registry_key, df['time_'].max(), feature_columns, MODEL_CONFIG, run_mode
 )
-model_daily.fit(x_train, y_train)
 
-model_hourly = AdaBoostRegressor(
-    DecisionTreeRegressor(max_depth=MODEL_CONFIG['hourly']['max_depth']),
-    n_estimators=MODEL_CONFIG['hourly']['n_estimators'],
-    random_state=MODEL_CONFIG['hourly']['random_state']
-)
-model_hourly.fit(x_train_h, y_train_h)
+if cached_models is not None:
+    model_daily = cached_models['daily']
+    model_hourly = cached_models['hourly']
+    print(f"✅ Хадгалсан модель ачааллаа (сургалт алгасав): {model_reason}")
+else:
+    print(f"🤖 Модель сургаж байна ({model_reason})...")
 
-print("✅ Модель бэлэн боллоо!")
+    model_daily = build_regressor(MODEL_CONFIG['daily'])
+    model_daily.fit(x_train, y_train)
+
+    model_hourly = build_regressor(MODEL_CONFIG['hourly'])
+    model_hourly.fit(x_train_h, y_train_h)
+
+    save_models(registry_key, 'system_total', {'daily': model_daily, 'hourly': model_hourly},
+                meta={'data_end': df['time_'].max(), 'rows': len(df), 'training_size': len(x_train),
+                      'features': feature_columns, 'config_hash': config_hash(MODEL_CONFIG)})
+    print("✅ Модель бэлэн боллоо!")
+
+mark('train' if cached_models is None else 'model_load', rows=len(x_train))
 
 # ==========================
 # 8️⃣ Forecast хийх + үнэлгээ
@@ -242,48 +197,17 @@ df['forecast_hourly'] = model_hourly.predict(X_hourly).round(0)
 # ==========================
 today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 tomorrow = today + timedelta(days=1)
-future_hours_daily = []
-
-for hour in range(24):
-    future_time = today + timedelta(hours=hour)
-    lag_data = df[df['time_'] < future_time].tail(24*7)
-
-    if len(lag_data) < 24*7:
-        continue
-
-    temp_current = df_temp[df_temp['time_'] == future_time]['temp'].values
-    if len(temp_current) == 0:
-        temp_current = df[df['time_'].dt.date == today.date()]['temp'].mean()
-    else:
-        temp_current = temp_current[0]
-
-    feature_daily = {
-        'year': future_time.year,
-        'month': future_time.month,
-        'day': future_time.day,
-        'hour': hour,
-        'temp': temp_current,
-        'wd': future_time.weekday(),
-        'load-1d': lag_data.iloc[-24]['load'] if len(lag_data) >= 24 else lag_data['load'].mean(),
-        'load-2d': lag_data.iloc[-48]['load'] if len(lag_data) >= 48 else lag_data['load'].mean(),
-        'load-3d': lag_data.iloc[-72]['load'] if len(lag_data) >= 72 else lag_data['load'].mean(),
-        'load-4d': lag_data.iloc[-96]['load'] if len(lag_data) >= 96 else lag_data['load'].mean(),
-        'load-5d': lag_data.iloc[-120]['load'] if len(lag_data) >= 120 else lag_data['load'].mean(),
-        'load-6d': lag_data.iloc[-144]['load'] if len(lag_data) >= 144 else lag_data['load'].mean(),
-        'load-7d': lag_data.iloc[-168]['load'] if len(lag_data) >= 168 else lag_data['load'].mean(),
-    }
-
-    pred_daily = model_daily.predict(pd.DataFrame([feature_daily]))[0]
-    future_hours_daily.append({'time_': future_time, 'forecast_daily': round(pred_daily, 0)})
-
-df_daily_forecast = pd.DataFrame(future_hours_daily)
+# 00:00 - 23:00 - 24 цагийн feature-ийг нэг дор үүсгэж нэг predict дуудна
+future_times_daily = [today + timedelta(hours=hour) for hour in range(24)]
+temp_today_mean = df[df['time_'].dt.date == today.date()]['temp'].mean()
+df_daily_forecast = forecast_day_ahead(
+    model_daily, df, df_temp, future_times_daily, temp_today_mean, weekday='python'
+)
 print(f"\n🔮 Өдрийн таамаглал: {len(df_daily_forecast)} цаг (өнөөдөр: {today.strftime('%Y-%m-%d')})")
 
 # ==========================
 # ⚡ ЦАГИЙН ТААМАГЛАЛ
 # ==========================
-future_hours_hourly = []
-
 # Сүүлийн бодит цагийг df_today_actual-аас авах (графикт зурагдсан өгөгдөл)
 if len(df_today_actual) > 0:
     last_actual_load = df_today_actual.tail(1)
@@ -300,43 +224,11 @@ else:
 print(f"⚡ Цагийн таамаглал:")
 print(f"   Сүүлийн бодит: {last_hour.strftime('%Y-%m-%d %H:%M')} = {last_load:.0f} МВт")
 
-# Өнөөдрийн 00:00-ээс сүүлийн бодит + 3 цаг хүртэл таамаглах
-end_time = last_hour + timedelta(hours=3)
-current_time = today
-
-while current_time <= end_time:
-    lag_data = df[df['time_'] < current_time].tail(24)
-
-    if len(lag_data) < 3:
-        current_time += timedelta(hours=1)
-        continue
-
-    temp_current = df_temp[df_temp['time_'] == current_time]['temp'].values
-    if len(temp_current) == 0:
-        temp_current = lag_data['temp'].mean()
-    else:
-        temp_current = temp_current[0]
-
-    feature_hourly = {
-        'month': current_time.month,
-        'day': current_time.day,
-        'hour': current_time.hour,
-        'temp': temp_current,
-        'wd': current_time.weekday(),
-        'load-1h': lag_data.iloc[-1]['load'] if len(lag_data) >= 1 else lag_data['load'].mean(),
-        'load-2h': lag_data.iloc[-2]['load'] if len(lag_data) >= 2 else lag_data['load'].mean(),
-        'load-3h': lag_data.iloc[-3]['load'] if len(lag_data) >= 3 else lag_data['load'].mean(),
-    }
-
-    pred_hourly = model_hourly.predict(pd.DataFrame([feature_hourly]))[0]
-    future_hours_hourly.append({
-        'time_': current_time,
-        'forecast_hourly': round(pred_hourly, 0)
-    })
-
-    current_time += timedelta(hours=1)
-
-df_hourly_forecast = pd.DataFrame(future_hours_hourly)
+# Өнөөдрийн 00:00-ээс сүүлийн бодит + hourly_horizon цаг хүртэл таамаглах
+hourly_horizon = min(FORECAST_CONFIG['hourly_horizon'], MAX_HOURLY_HORIZON)
+end_time = last_hour + timedelta(hours=hourly_horizon)
+
+df_hourly_forecast = forecast_hourly(model_hourly, df, df_temp, today, end_time, weekday='python')
 if len(df_hourly_forecast) > 0:
     start_hour = df_hourly_forecast['time_'].min().strftime('%H:%M')
     end_hour = df_hourly_forecast['time_'].max().strftime('%H:%M')
@@ -363,6 +255,8 @@ print(f"   RMSE: {rmse_hourly:.2f} МВт")
 print(f"   R²:   {r2_score(y_test_h, pred_hourly):.4f}")
 print("=" * 60)
 
+mark('forecast', rows=len(df_daily_forecast) + len(df_hourly_forecast))
+
 # ==========================
 # 9️⃣ График гаргах
 # ==========================
@@ -371,63 +265,61 @@ print(f"   Өнөөдрийн бодит: {len(df_today_actual)} мөр")
 if len(df_today_actual) > 0:
     print(f"   Системийн хэрэглээ: {df_today_actual['load'].min():.0f} - {df_today_actual['load'].max():.0f} МВт")
 
-fig, ax = plt.subplots(figsize=PLOT_CONFIG['figsize'])
+chart = new_chart(
+    f"Системийн нийт хэрэглээний таамаглал - {today.strftime('%Y-%m-%d')}",
+    xlim=(today - timedelta(minutes=30), today + timedelta(hours=24)),
+    legend_loc='best',
+)
 
 # 1️⃣ Бодит хэрэглээ (улаан)
 if len(df_today_actual) > 0:
-    ax.plot(df_today_actual['time_'], df_today_actual['load'],
-            color='red', linewidth=3.5, label='Системийн нийт хэрэглээ (бодит)',
-            marker='o', markersize=6, zorder=5)
+    add_series(chart, 'Системийн нийт хэрэглээ (бодит)', df_today_actual['time_'], df_today_actual['load'],
+               color='red', linewidth=3.5, marker='o', markersize=6, zorder=5)
 
 # 2️⃣ Өдрийн таамаглал (цэнхэр)
 if len(df_daily_forecast) > 0:
-    ax.plot(df_daily_forecast['time_'], df_daily_forecast['forecast_daily'],
-            color='dodgerblue', linestyle='--', linewidth=2.5,
-            label='Өдрийн таамаглал (24 цаг)',
-            marker='s', markersize=4, alpha=0.7, zorder=3)
+    add_series(chart, 'Өдрийн таамаглал (24 цаг)', df_daily_forecast['time_'], df_daily_forecast['forecast_daily'],
+               color='dodgerblue', linestyle='--', linewidth=2.5, marker='s', markersize=4, alpha=0.7, zorder=3)
 
 # 3️⃣ Цагийн таамаглал (ногоон)
 if len(df_hourly_forecast) > 0:
-    ax.plot(df_hourly_forecast['time_'], df_hourly_forecast['forecast_hourly'],
-            color='green', linestyle='-', linewidth=2.5,
-            label='Цагийн таамаглал',
-            marker='o', markersize=4, alpha=0.8, zorder=4)
-
-# График тохиргоо
-ax.set_xlabel('Цаг', fontsize=14, fontweight='bold')
-ax.set_ylabel('Хэрэглээ, МВт', fontsize=14, fontweight='bold')
-ax.set_title(f"Системийн нийт хэрэглээний таамаглал - {today.strftime('%Y-%m-%d')}",
-             fontsize=16, fontweight='bold', pad=20)
-ax.grid(True, linestyle='--', alpha=0.4, zorder=0)
-ax.legend(fontsize=11, loc='best', framealpha=0.95, edgecolor='black')
-
-ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-ax.xaxis.set_major_locator(mdates.HourLocator(interval=2))
-ax.set_xlim(today - timedelta(minutes=30), today + timedelta(hours=24))
-
-ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{int(x):,}'))
-
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig('forecast_system_total.png', dpi=PLOT_CONFIG['dpi'], bbox_inches='tight')
-plt.show()
-
-print(f"\n📊 График хадгалагдлаа: forecast_system_total.png")
+    add_series(chart, 'Цагийн таамаглал', df_hourly_forecast['time_'], df_hourly_forecast['forecast_hourly'],
+               color='green', linestyle='-', linewidth=2.5, marker='o', markersize=4, alpha=0.8, zorder=4)
+
+# Дэлгэцгүй (Agg) зурна; background горимд дараагийн алхмууд үүнийг хүлээхгүй
+submit_chart(chart, FILES['system_total_plot'])
+mark('plotting')
+
+print(f"\n📊 График ({PLOT_CONFIG['output']}): {FILES['system_total_plot']}")
 print(f"   🔴 Бодит дата: {len(df_today_actual)} цаг")
 print(f"   🔵 Өдрийн таамаглал: {len(df_daily_forecast)} цаг")
 print(f"   🟢 Цагийн таамаглал: {len(df_hourly_forecast)} цэг")
 
 # ==========================
-# 🔟 CSV хадгалах
+# 🔟 Үр дүн хадгалах (OUTPUT_CONFIG['format'], сонголтоор CSV/XLSX)
 # ==========================
-df_daily_forecast.to_csv('forecast_system_total_daily.csv', index=False)
-df_hourly_forecast.to_csv('forecast_system_total_hourly.csv', index=False)
-df.to_csv('forecast_system_total_history.csv', index=False)
-
-print("\n✅ CSV файлууд хадгалагдлаа:")
-print(f"   📁 forecast_system_total_daily.csv - Өдрийн таамаглал (24 цаг)")
-print(f"   📁 forecast_system_total_hourly.csv - Цагийн таамаглал")
-print(f"   📁 forecast_system_total_history.csv - Түүхэн өгөгдөл")
+outputs = {
+    'system_total_daily': (df_daily_forecast, "Өдрийн таамаглал (24 цаг)"),
+    'system_total_hourly': (df_hourly_forecast, "Цагийн таамаглал"),
+    'system_total_history': (df, "Түүхэн өгөгдөл"),
+}
+
+print("\n✅ Файлууд хадгалагдлаа:")
+for key, (df_out, description) in outputs.items():
+    paths = write_output(df_out, FILES[key])
+    print(f"   📁 {', '.join(paths)} - {description}")
+
+# Гаргасан таамаглалыг архивт нэмэх (дарж бичихгүй, зорилтот өдрөөр хуваана)
+issue_time = datetime.now()
+archive_forecast(df_daily_forecast, 'forecast_daily', 'daily', 'system_total', registry_key, issue_time)
+archive_forecast(df_hourly_forecast, 'forecast_hourly', 'hourly', 'system_total', registry_key, issue_time)
+print(f"   🗄️ Таамаглал архивлагдлаа: {ARCHIVE_CONFIG['dir']}/ (issue_time: {issue_time.strftime('%Y-%m-%d %H:%M:%S')})")
+mark('outputs')
+
+# Background-д зурж буй графикийг дуусгах
+for path in wait_charts():
+    print(f"   🖼️ {path}")
+mark('plot_wait')
 
 print("\n" + "=" * 60)
 print("🎉 Бүх ажил дууслаа!")
@@ -435,3 +327,5 @@ print(f"\n📊 Хураангуй:")
 print(f"   Сүүлийн бодит цаг: {last_hour.strftime('%Y-%m-%d %H:%M')}")
 print(f"   Сүүлийн бодит хэрэглээ: {last_load:.0f} МВт")
 print(f"   Цагийн таамаглал: {len(df_hourly_forecast)} цэг")
+
+finish_run()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Сургасан моделийн registry
+- Түлхүүр: сургалтын өгөгдлийн watermark + feature баганууд + MODEL_CONFIG-ийн hash
+- Ижил түлхүүртэй модель байвал дахин сургахгүй, файлаас ачаална
+- {dir}/{key}.joblib        - model_daily, model_hourly + meta
+- {dir}/{name}_latest.json  - тухайн скриптийн хамгийн сүүлийн түлхүүр
+- {tuning dir}/{name}_model_config_v001.json - tune.py-ийн ялсан MODEL_CONFIG (хувилбартай)
+"""
+
+import os
+import json
+import glob
+import hashlib
+from datetime import datetime
+
+import joblib
+
+from config import REGISTRY_CONFIG, TUNING_CONFIG
+from regressors import engine_name
+
+
+def config_hash(model_config):
+    """MODEL_CONFIG-ийн тогтвортой hash"""
+    payload = json.dumps(model_config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def model_key(name, data_watermark, feature_columns, model_config):
+    """
+    Моделийн түлхүүр үүсгэх
+    - name: скриптийн нэр ('main', 'system_total')
+    - data_watermark: сургалтын өгөгдлийн сүүлийн цаг + мөрийн тоо гэх мэт
+    - feature_columns: {'daily': [...], 'hourly': [...]}
+    """
+    payload = json.dumps({
+        'watermark': str(data_watermark),
+        'features': feature_columns,
+        'config': config_hash(model_config),
+    }, sort_keys=True)
+    return f"{name}_{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _model_path(key, registry_dir=None):
+    return os.path.join(registry_dir or REGISTRY_CONFIG['dir'], f"{key}.joblib")
+
+
+def _latest_path(name, registry_dir=None):
+    return os.path.join(registry_dir or REGISTRY_CONFIG['dir'], f"{name}_latest.json")
+
+
+def load_models(key, registry_dir=None):
+    """Түлхүүрээр модель ачаалах (байхгүй эсвэл эвдэрсэн бол None)"""
+    path = _model_path(key, registry_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        return joblib.load(path)
+    except Exception as e:
+        print(f"   ⚠️ Модель ачаалах алдаа ({path}): {e}")
+        return None
+
+
+def save_models(key, name, models, meta=None, registry_dir=None):
+    """
+    Моделиудыг атомаар хадгалж {name}_latest.json-г шинэчлэх.
+    models: {'daily': model_daily, 'hourly': model_hourly}
+    """
+    registry_dir = registry_dir or REGISTRY_CONFIG['dir']
+    os.makedirs(registry_dir, exist_ok=True)
+
+    entry = dict(models)
+    entry['meta'] = dict(meta or {}, key=key, name=name,
+                         saved_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    path = _model_path(key, registry_dir)
+    tmp_path = path + '.tmp'
+    joblib.dump(entry, tmp_path)
+    os.replace(tmp_path, path)
+
+    latest_path = _latest_path(name, registry_dir)
+    with open(latest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(entry['meta'], f, ensure_ascii=False, default=str)
+    os.replace(latest_path + '.tmp', latest_path)
+
+    prune(name, registry_dir)
+    return path
+
+
+def load_latest(name, registry_dir=None):
+    """Тухайн скриптийн хамгийн сүүлд хадгалсан моделийг ачаалах"""
+    latest_path = _latest_path(name, registry_dir)
+    if not os.path.exists(latest_path):
+        return None
+    with open(latest_path, 'r', encoding='utf-8') as f:
+        key = json.load(f)['key']
+    return load_models(key, registry_dir)
+
+
+def prune(name, registry_dir=None):
+    """Хуучин моделиудыг устгаж, сүүлийн keep_last-ыг үлдээх"""
+    registry_dir = registry_dir or REGISTRY_CONFIG['dir']
+    paths = sorted(glob.glob(os.path.join(registry_dir, f"{name}_*.joblib")), key=os.path.getmtime)
+    for path in paths[:-REGISTRY_CONFIG['keep_last']]:
+        os.remove(path)
+
+
+# ==========================
+# Тааруулсан MODEL_CONFIG (хувилбартай)
+# ==========================
+def _tuned_paths(name, tuning_dir=None):
+    tuning_dir = tuning_dir or TUNING_CONFIG['dir']
+    return sorted(glob.glob(os.path.join(tuning_dir, f"{name}_model_config_v*.json")))
+
+
+def _tuned_params(model_config):
+    """MODEL_CONFIG-ийн kind бүрээс зөвхөн тухайн engine-ийн search_space-ийн параметрүүд"""
+    tuned = {}
+    for kind, params in model_config.items():
+        if not isinstance(params, dict):
+            continue
+        space = TUNING_CONFIG['search_space'].get(engine_name(params), {})
+        tuned[kind] = {'engine': engine_name(params),
+                       'params': {key: params[key] for key in space if key in params}}
+    return tuned
+
+
+def save_tuned_config(name, model_config, base_config, report=None, tuning_dir=None):
+    """
+    Ялсан MODEL_CONFIG-ийг дараагийн хувилбарын дугаартай файлд бичих (хуучныг дарахгүй).
+    base_config: тааруулж эхэлсэн config.py-ийн MODEL_CONFIG (hash нь хадгалагдана)
+    Буцаах утга: файлын зам
+    """
+    tuning_dir = tuning_dir or TUNING_CONFIG['dir']
+    os.makedirs(tuning_dir, exist_ok=True)
+
+    paths = _tuned_paths(name, tuning_dir)
+    version = int(paths[-1].rsplit('_v', 1)[1][:-len('.json')]) + 1 if paths else 1
+    path = os.path.join(tuning_dir, f"{name}_model_config_v{version:03d}.json")
+
+    entry = {
+        'name': name,
+        'version': version,
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'config_hash': config_hash(model_config),
+        'base_config_hash': config_hash(base_config),
+        'tuned_params': _tuned_params(model_config),
+        'model_config': model_config,
+        'report': report or {},
+    }
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(entry, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def tuned_model_config(name, default, tuning_dir=None):
+    """
+    default (config.py-ийн MODEL_CONFIG) дээр хамгийн сүүлийн тааруулсан search_space-ийн
+    параметрүүдийг давхарлах. Бусад түлхүүр (engine, test_size, random_state, шинэ түлхүүр)
+    үргэлж default-аас. TUNING_CONFIG['apply'] False, файл байхгүй, эсвэл файл өөр
+    engine / өөр base MODEL_CONFIG-оос тааруулагдсан бол default хэвээр (анхааруулгатай).
+    Өөрчлөгдвөл config_hash өөрчлөгдөж модель дахин сургагдана.
+    """
+    if not TUNING_CONFIG['apply']:
+        return default
+    paths = _tuned_paths(name, tuning_dir)
+    if not paths:
+        return default
+    with open(paths[-1], 'r', encoding='utf-8') as f:
+        entry = json.load(f)
+
+    source = os.path.basename(paths[-1])
+    tuned = entry.get('tuned_params')
+    if tuned is None or entry.get('base_config_hash') is None:
+        print(f"⚠️ {source}: base MODEL_CONFIG-ийн hash-гүй хуучин файл - ашиглахгүй (tune.py-г дахин ажиллуулна уу)")
+        return default
+    for kind, values in tuned.items():
+        if kind in default and values['engine'] != engine_name(default[kind]):
+            print(f"⚠️ {source}: {kind} нь '{values['engine']}' engine-д тааруулагдсан, "
+                  f"одоо '{engine_name(default[kind])}' - ашиглахгүй")
+            return default
+    if entry['base_config_hash'] != config_hash(default):
+        print(f"⚠️ {source}: config.py-ийн MODEL_CONFIG тааруулснаас хойш өөрчлөгдсөн - ашиглахгүй "
+              f"(tune.py-г дахин ажиллуулна уу)")
+        return default
+
+    model_config = {k: (dict(v) if isinstance(v, dict) else v) for k, v in default.items()}
+    for kind, values in tuned.items():
+        if kind in model_config:
+            model_config[kind].update(values['params'])
+    return model_config
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+Офлайн record / replay (MySQL, Open-Meteo, Laravel-гүйгээр ажиллуулах)
+- OFFLINE_CONFIG['mode'] эсвэл OFFLINE_MODE орчны хувьсагч:
+    'live'   - жирийн ажиллагаа
+    'record' - weather / Laravel-ийн HTTP хариу бүрийг bundle-д бичнэ
+               (MySQL-ийн өгөгдлийг: python offline.py record-db)
+    'replay' - get_engine() нь bundle-ийн SQLite-ийг, HTTP session-ууд нь процесс доторх
+               stub server-ийг ашиглана. Сүлжээ огт шаардлагагүй
+- Bundle ({bundle_dir}):
+    z_conclusion.sqlite - z_conclusion-ы ALL_VARS мөрүүд (бүх query SQLite дээр ажиллана)
+    http.sqlite         - (method, url, body hash) → status, content-type, body
+                          + received_posts: replay-д stub-д ирсэн бичигдээгүй POST-ууд
+- Replay-д бичигдээгүй GET нь 404, бичигдээгүй POST (Laravel руу илгээх) нь
+  {"success": true} буцаана - илгээлт хаашаа ч гарахгүй, харин received_posts-д
+  хадгалагдаж received_payloads()-аар шалгагдана
+
+Хэрэглээ:
+    python offline.py record-db --since 2024-01-05
+    OFFLINE_MODE=record python main.py      # HTTP хариуг бичих
+    OFFLINE_MODE=replay python main.py      # бүрэн офлайн
+    python offline.py info
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlencode, parse_qsl
+
+import pandas as pd
+from requests.adapters import HTTPAdapter
+
+from config import OFFLINE_CONFIG
+
+MODES = ('live', 'record', 'replay')
+DB_FILE = 'z_conclusion.sqlite'
+HTTP_FILE = 'http.sqlite'
+
+HTTP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_responses (
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    body_key TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    content_type TEXT,
+    body BLOB,
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (method, url, body_key)
+);
+CREATE TABLE IF NOT EXISTS received_posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    content_encoding TEXT,
+    body BLOB,
+    received_at TEXT NOT NULL
+)
+"""
+
+_http_lock = threading.Lock()
+_stub = None
+_stub_lock = threading.Lock()
+
+
+def offline_mode():
+    """Одоогийн горим (OFFLINE_MODE орчны хувьсагч нь тохиргооноос давамгайлна)"""
+    mode = os.environ.get('OFFLINE_MODE', OFFLINE_CONFIG['mode'])
+    if mode not in MODES:
+        raise ValueError(f"OFFLINE_MODE нь {MODES}-ийн нэг байх ёстой: {mode}")
+    return mode
+
+
+def bundle_path(name):
+    return os.path.join(OFFLINE_CONFIG['bundle_dir'], name)
+
+
+def replay_database_url():
+    """replay горимд bundle-ийн SQLite URL, бусад үед None"""
+    if offline_mode() != 'replay':
+        return None
+    return f"sqlite:///{os.path.abspath(bundle_path(DB_FILE))}"
+
+
+# ==========================
+# HTTP хариу хадгалах
+# ==========================
+def request_key(method, url, body=None):
+    """Query параметрийн дарааллаас хамаарахгүй түлхүүр"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    normalized = f"{parts.scheme}://{parts.netloc}{parts.path}" + (f"?{query}" if query else '')
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    body_key = hashlib.sha256(body).hexdigest()[:16] if body else ''
+    return method.upper(), normalized, body_key
+
+
+def _connect_http():
+    os.makedirs(OFFLINE_CONFIG['bundle_dir'], exist_ok=True)
+    con = sqlite3.connect(bundle_path(HTTP_FILE))
+    con.executescript(HTTP_SCHEMA)
+    return con
+
+
+def save_response(method, url, body, status, content_type, content):
+    key = request_key(method, url, body)
+    with _http_lock:
+        con = _connect_http()
+        try:
+            con.execute(
+                "INSERT OR REPLACE INTO http_responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                key + (status, content_type, content, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+            con.commit()
+        finally:
+            con.close()
+
+
+def find_response(method, url, body=None):
+    """Бичигдсэн хариу (status, content_type, body) эсвэл None"""
+    key = request_key(method, url, body)
+    with _http_lock:
+        con = _connect_http()
+        try:
+            return con.execute(
+                "SELECT status, content_type, body FROM http_responses "
+                "WHERE method = ? AND url = ? AND body_key = ?", key
+            ).fetchone()
+        finally:
+            con.close()
+
+
+def save_received(url, content_encoding, body):
+    """Replay-д stub-д ирсэн (бичигдээгүй) POST-ийг хадгалах"""
+    with _http_lock:
+        con = _connect_http()
+        try:
+            con.execute(
+                "INSERT INTO received_posts (url, content_encoding, body, received_at) VALUES (?, ?, ?, ?)",
+                (url, content_encoding, body, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+            con.commit()
+        finally:
+            con.close()
+
+
+def received_payloads(url=None):
+    """received_posts-ийн JSON payload-ууд (ирсэн дарааллаар, gzip-ийг задлана)"""
+    with _http_lock:
+        con = _connect_http()
+        try:
+            rows = con.execute(
+                "SELECT url, content_encoding, body FROM received_posts ORDER BY id"
+            ).fetchall()
+        finally:
+            con.close()
+    payloads = []
+    for row_url, encoding, body in rows:
+        if url is not None and row_url != url:
+            continue
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        payloads.append(json.loads(body))
+    return payloads
+
+
+def _record_hook(response, *args, **kwargs):
+    """requests-ийн response hook: хариуг bundle-д бичих"""
+    request = response.request
+    save_response(request.method, request.url, request.body, response.status_code,
+                  response.headers.get('Content-Type'), response.content)
+    return response
+
+
+# ==========================
+# Replay stub server
+# ==========================
+class _StubHandler(BaseHTTPRequestHandler):
+    """/<scheme>/<host>/<path>?<query> → бичигдсэн хариу"""
+
+    def _original_url(self):
+        scheme, _, rest = self.path.lstrip('/').partition('/')
+        return f"{scheme}://{rest}"
+
+    def _reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type or 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve(self, body=None):
+        hit = find_response(self.command, self._original_url(), body)
+        if hit is not None:
+            self._reply(*hit)
+        elif self.command == 'POST':
+            save_received(self._original_url(), self.headers.get('Content-Encoding'), body)
+            self._reply(200, 'application/json', b'{"success": true, "replayed": false}')
+        else:
+            message = json.dumps({'error': 'бичигдээгүй хүсэлт', 'url': self._original_url()})
+            self._reply(404, 'application/json', message.encode('utf-8'))
+
+    def do_GET(self):
+        self._serve()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self._serve(self.rfile.read(length))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub():
+    """Процесс доторх stub server-ийг (нэг удаа) эхлүүлж base URL буцаах"""
+    global _stub
+    with _stub_lock:
+        if _stub is None:
+            server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+            threading.Thread(target=server.serve_forever, daemon=True, name='offline-stub').start()
+            _stub = server
+        host, port = _stub.server_address
+    return f"http://{host}:{port}"
+
+
+class StubAdapter(HTTPAdapter):
+    """Бүх хүсэлтийг stub server руу чиглүүлэх (анхны URL-ийг path-д хадгална)"""
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f"{start_stub()}/{parts.scheme}/{parts.netloc}{parts.path}" + \
+                      (f"?{parts.query}" if parts.query else '')
+        return super().send(request, **kwargs)
+
+
+def install(session):
+    """HTTP session-д горимын дагуу record hook эсвэл replay adapter суулгах"""
+    mode = offline_mode()
+    if mode == 'record':
+        session.hooks['response'].append(_record_hook)
+    elif mode == 'replay':
+        adapter = StubAdapter()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+    return session
+
+
+# ==========================
+# MySQL → SQLite snapshot
+# ==========================
+def record_database(since, until=None, chunk_days=30, engine=None):
+    """
+    z_conclusion-ы ALL_VARS мөрүүдийг [since, until) хугацаагаар bundle SQLite руу хуулах.
+    Сар орчмын хэсгээр уншиж санах ойг хязгаарлана. Буцаах утга: мөрийн тоо
+    """
+    from db import get_engine, read_named
+    from hourly_store import ALL_VARS
+
+    engine = engine or get_engine()
+    start = pd.Timestamp(since)
+    until = pd.Timestamp(until) if until is not None else pd.Timestamp(datetime.now()).ceil('h')
+
+    os.makedirs(OFFLINE_CONFIG['bundle_dir'], exist_ok=True)
+    path = bundle_path(DB_FILE)
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    con = sqlite3.connect(tmp_path)
+    total = 0
+    try:
+        while start < until:
+            end = min(start + pd.Timedelta(days=chunk_days), until)
+            df = read_named('snapshot_range', engine, ttl=0, vars=ALL_VARS,
+                            start_ts=int(start.timestamp()), end_ts=int(end.timestamp()))
+            df['VALUE'] = pd.to_numeric(df['VALUE']).astype('float64')
+            df.to_sql('z_conclusion', con, if_exists='append', index=False)
+            total += len(df)
+            print(f"   → {start:%Y-%m-%d} ~ {end:%Y-%m-%d}: {len(df)} мөр")
+            start = end
+        con.execute("CREATE INDEX IF NOT EXISTS idx_var_calc_ts ON z_conclusion (VAR, CALCULATION, TIMESTAMP_S)")
+        con.commit()
+    finally:
+        con.close()
+    os.replace(tmp_path, path)
+    return total
+
+
+def bundle_info():
+    """Bundle-ийн товч мэдээлэл"""
+    info = {'mode': offline_mode(), 'bundle_dir': OFFLINE_CONFIG['bundle_dir']}
+    if os.path.exists(bundle_path(DB_FILE)):
+        con = sqlite3.connect(bundle_path(DB_FILE))
+        try:
+            info['z_conclusion'] = con.execute(
+                "SELECT COUNT(*), MIN(TIMESTAMP_S), MAX(TIMESTAMP_S) FROM z_conclusion"
+            ).fetchone()
+        finally:
+            con.close()
+    if os.path.exists(bundle_path(HTTP_FILE)):
+        con = _connect_http()
+        try:
+            info['http'] = con.execute(
+                "SELECT method, COUNT(*) FROM http_responses GROUP BY method"
+            ).fetchall()
+            info['received_posts'] = con.execute("SELECT COUNT(*) FROM received_posts").fetchone()[0]
+        finally:
+            con.close()
+    return info
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else 'info'
+
+    if command == 'record-db':
+        since = argv[argv.index('--since') + 1] if '--since' in argv else None
+        if since is None:
+            from config import INGEST_CONFIG
+            since = INGEST_CONFIG['start']
+        print(f"📥 z_conclusion → {bundle_path(DB_FILE)} ({since}-аас)")
+        print(f"✅ {record_database(since)} мөр хадгалагдлаа")
+    elif command == 'info':
+        info = bundle_info()
+        print(f"📦 Bundle: {info['bundle_dir']} (горим: {info['mode']})")
+        if 'z_conclusion' in info:
+            count, first, last = info['z_conclusion']
+            if count:
+                print(f"   z_conclusion: {count} мөр, "
+                      f"{pd.to_datetime(first, unit='s')} → {pd.to_datetime(last, unit='s')}")
+        for method, count in info.get('http', []):
+            print(f"   HTTP {method}: {count} хариу")
+        if info.get('received_posts'):
+            print(f"   Replay-д ирсэн POST: {info['received_posts']}")
+    else:
+        raise ValueError(f"Тодорхойгүй команд: {command} (record-db, info)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Үр дүнгийн файлуудыг бичих / унших
+- Үндсэн формат: Parquet эсвэл Feather (OUTPUT_CONFIG['format'])
+- CSV / XLSX нь зөвхөн OUTPUT_CONFIG['exports']-д заасан үед нэмэлтээр бичигдэнэ
+- Бүх файл түр файлд бичигдээд os.replace-ээр солигдоно (хагас бичигдсэн файл үлдэхгүй)
+- Багануудыг бичихээс өмнө төрөлжүүлнэ: time_ → datetime64, Decimal/object тоо → float64
+  (уншигч тал огноо, тоог дахин parse хийх шаардлагагүй)
+
+FILES дахь нэрийн өргөтгөлийг үл тооцно: 'forecast_history.csv' → forecast_history.parquet
+"""
+
+import os
+
+import pandas as pd
+
+from config import OUTPUT_CONFIG
+
+FORMATS = {
+    'parquet': '.parquet',
+    'feather': '.feather',
+    'csv': '.csv',
+    'xlsx': '.xlsx',
+}
+
+
+def output_path(name, fmt=None):
+    """FILES-ийн нэрээс тухайн форматын файлын зам"""
+    fmt = fmt or OUTPUT_CONFIG['format']
+    return os.path.splitext(name)[0] + FORMATS[fmt]
+
+
+def typed_frame(df):
+    """Бичихээс өмнө баганын төрлийг тогтоох"""
+    df = df.reset_index(drop=True).copy()
+    for column in df.columns:
+        if column == 'time_' or column.endswith('_time'):
+            df[column] = pd.to_datetime(df[column])
+        elif df[column].dtype == object:
+            # MySQL DECIMAL → Python Decimal object-ийг float болгох
+            converted = pd.to_numeric(df[column], errors='coerce')
+            if converted.notna().sum() == df[column].notna().sum():
+                df[column] = converted.astype('float64')
+    return df
+
+
+def _write(df, path, fmt):
+    tmp_path = path + '.tmp'
+    if fmt == 'parquet':
+        df.to_parquet(tmp_path, index=False)
+    elif fmt == 'feather':
+        df.to_feather(tmp_path)
+    elif fmt == 'csv':
+        df.to_csv(tmp_path, index=False)
+    elif fmt == 'xlsx':
+        df.to_excel(tmp_path, index=False, engine='openpyxl')
+    else:
+        raise ValueError(f"Тодорхойгүй формат: {fmt}")
+    os.replace(tmp_path, path)
+
+
+def write_output(df, name, fmt=None, exports=None):
+    """
+    df-г үндсэн формат + нэмэлт export-уудаар бичих.
+    Буцаах утга: бичигдсэн файлуудын жагсаалт
+    """
+    fmt = fmt or OUTPUT_CONFIG['format']
+    exports = OUTPUT_CONFIG['exports'] if exports is None else exports
+
+    df = typed_frame(df)
+    written = []
+    for out_fmt in [fmt] + [e for e in exports if e != fmt]:
+        path = output_path(name, out_fmt)
+        _write(df, path, out_fmt)
+        written.append(path)
+    return written
+
+
+def read_output(name, fmt=None):
+    """write_output-оор бичсэн файлыг унших (үндсэн формат)"""
+    fmt = fmt or OUTPUT_CONFIG['format']
+    path = output_path(name, fmt)
+    if fmt == 'parquet':
+        return pd.read_parquet(path)
+    if fmt == 'feather':
+        return pd.read_feather(path)
+    if fmt == 'csv':
+        return pd.read_csv(path, parse_dates=['time_'])
+    return pd.read_excel(path, parse_dates=['time_'])
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+График зурах үе шат (дэлгэцгүй, үндсэн ажлыг хүлээлгэхгүй)
+- Agg backend: дэлгэцгүй сервер / cron дээр ажиллана, plt.show() байхгүй
+- Графикийг эхлээд өгөгдөл (chart spec) болгож, PNG-г background thread дээр зурна
+  → Laravel руу илгээх зэрэг ажил rasterization-ийг хүлээхгүй
+- PLOT_CONFIG['output']: 'png', 'json' (вэб frontend-д зориулсан цувааны JSON),
+  'both' эсвэл 'none'
+
+Хэрэглээ:
+    chart = new_chart(title, xlim)
+    add_series(chart, label, df['time_'], df['load'], color='red', ...)
+    submit_chart(chart, FILES['plot'])   # background-д зурна
+    ...
+    wait_charts()                        # скриптийн төгсгөлд
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+import pandas as pd
+
+from config import PLOT_CONFIG
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = []
+
+
+# ==========================
+# Chart spec
+# ==========================
+def new_chart(title, xlim, note=None, legend_loc='upper left'):
+    """Хоосон график (зөвхөн өгөгдөл - matplotlib объектгүй)"""
+    return {'title': title, 'xlim': xlim, 'note': note, 'legend_loc': legend_loc, 'series': []}
+
+
+def add_series(chart, label, times, values, **style):
+    """Нэг шугам нэмэх (style нь ax.plot-ийн kwargs)"""
+    chart['series'].append({
+        'label': label,
+        'time': pd.to_datetime(pd.Series(times)).tolist(),
+        'value': pd.Series(values).astype('float64').tolist(),
+        'style': style,
+    })
+
+
+# ==========================
+# Render
+# ==========================
+def render_png(chart, path):
+    """Agg дээр PNG зурах (pyplot-ийн глобал төлөв ашиглахгүй тул thread-safe)"""
+    fig = Figure(figsize=PLOT_CONFIG['figsize'])
+    ax = fig.add_subplot()
+
+    for series in chart['series']:
+        ax.plot(series['time'], series['value'], label=series['label'], **series['style'])
+
+    ax.set_xlabel('Цаг', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Хэрэглээ, МВт', fontsize=14, fontweight='bold')
+    ax.set_title(chart['title'], fontsize=16, fontweight='bold', pad=20)
+    ax.grid(True, linestyle='--', alpha=0.4, zorder=0)
+    ax.legend(fontsize=11, loc=chart['legend_loc'], framealpha=0.95, edgecolor='black')
+
+    if chart['note']:
+        props = dict(boxstyle='round,pad=0.5', facecolor='white', alpha=0.9, edgecolor='gray')
+        ax.text(0.98, 0.97, chart['note'], transform=ax.transAxes, fontsize=9,
+                verticalalignment='top', horizontalalignment='right',
+                bbox=props, family='monospace')
+
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+    ax.xaxis.set_major_locator(mdates.HourLocator(interval=2))
+    ax.set_xlim(*chart['xlim'])
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'{int(x):,}'))
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+
+    fig.tight_layout()
+    tmp_path = path + '.tmp.png'
+    fig.savefig(tmp_path, dpi=PLOT_CONFIG['dpi'], bbox_inches='tight')
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_series_json(chart, path):
+    """Графикийн цуваануудыг товч JSON болгох (вэб frontend өөрөө зурна)"""
+    payload = {
+        'title': chart['title'],
+        'series': [
+            {
+                'label': series['label'],
+                'color': series['style'].get('color'),
+                'time': [t.strftime('%Y-%m-%d %H:%M') for t in series['time']],
+                'value': [round(v, 1) for v in series['value']],
+            }
+            for series in chart['series']
+        ],
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return path
+
+
+def render_chart(chart, png_path, output=None):
+    """PLOT_CONFIG['output']-ийн дагуу PNG / JSON бичих"""
+    output = output or PLOT_CONFIG['output']
+    written = []
+    if output in ('json', 'both'):
+        written.append(write_series_json(chart, os.path.splitext(png_path)[0] + '.json'))
+    if output in ('png', 'both'):
+        written.append(render_png(chart, png_path))
+    return written
+
+
+# ==========================
+# Background worker
+# ==========================
+def submit_chart(chart, png_path, output=None):
+    """
+    Графикийг зурах ажлыг эхлүүлэх.
+    PLOT_CONFIG['background'] бол background thread-д, үгүй бол шууд зурна.
+    """
+    global _executor
+    if not PLOT_CONFIG['background']:
+        return render_chart(chart, png_path, output)
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='plot')
+        _pending.append(_executor.submit(render_chart, chart, png_path, output))
+    return None
+
+
+def wait_charts():
+    """Эхлүүлсэн бүх графикийг дуусахыг хүлээх. Буцаах утга: бичигдсэн файлууд"""
+    written = []
+    while _pending:
+        future = _pending.pop(0)
+        try:
+            written.extend(future.result())
+        except Exception as e:
+            print(f"   ⚠️ График зурах алдаа: {e}")
+    return written
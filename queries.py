@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Дундын SQL query-нууд
+- "Цаг бүрийн сүүлийн утга" query (индекс ашиглах боломжтой)
+- EXPLAIN ажиллуулж full scan илрүүлэх
+
+FROM_UNIXTIME(TIMESTAMP_S, '%Y-%m-%d %H')-аар GROUP BY хийх нь TIMESTAMP_S дээрх
+индексийг ашиглаж чадахгүй. Энд цагийн bucket-ыг бүхэл тооны арифметикаар
+(TIMESTAMP_S - TIMESTAMP_S % 3600) бодож, хугацааг range нөхцөлөөр хязгаарлана.
+MySQL болон SQLite (локал туршилт) хоёуланд ажиллана.
+"""
+
+import calendar
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from sqlalchemy import text
+
+from config import QUERY_CONFIG
+from db import VALUE_SQL, value_sql, read_sql
+
+HOUR_BUCKET = "TIMESTAMP_S - (TIMESTAMP_S % 3600)"
+
+# Санал болгох индекс (full scan илэрвэл хэвлэнэ)
+RECOMMENDED_INDEX = "CREATE INDEX idx_var_calc_ts ON z_conclusion (VAR, CALCULATION, TIMESTAMP_S)"
+
+
+def _range_conditions(prefix='', calculation=50, start=True, end=True):
+    conditions = [f"{prefix}VAR = :var"]
+    if calculation is not None:
+        conditions.append(f"{prefix}CALCULATION = {int(calculation)}")
+    if start:
+        conditions.append(f"{prefix}TIMESTAMP_S >= :start_ts")
+    if end:
+        conditions.append(f"{prefix}TIMESTAMP_S < :end_ts")
+    return "\n  AND ".join(conditions)
+
+
+def last_value_per_hour_sql(calculation=50, start=True, end=True, window=None):
+    """
+    Цаг бүрийн сүүлийн (MAX(TIMESTAMP_S)) утгыг авах SQL.
+    Параметрууд: :var, :start_ts (start=True бол), :end_ts (end=True бол)
+    Буцаах баганууд: hour_ts, TIMESTAMP_S, value
+    window=True бол ROW_NUMBER() ашиглана (MySQL 8+, SQLite 3.25+)
+    """
+    if window is None:
+        window = QUERY_CONFIG['use_window']
+
+    if window:
+        return f"""
+SELECT hour_ts, TIMESTAMP_S, value
+FROM (
+    SELECT
+        {HOUR_BUCKET} AS hour_ts,
+        TIMESTAMP_S,
+        {VALUE_SQL} AS value,
+        ROW_NUMBER() OVER (
+            PARTITION BY {HOUR_BUCKET}
+            ORDER BY TIMESTAMP_S DESC
+        ) AS rn
+    FROM z_conclusion
+    WHERE {_range_conditions('', calculation, start, end)}
+) t
+WHERE rn = 1
+ORDER BY hour_ts
+"""
+
+    return f"""
+SELECT
+    t.hour_ts,
+    t.max_ts AS TIMESTAMP_S,
+    {value_sql('z.VALUE')} AS value
+FROM z_conclusion z
+JOIN (
+    SELECT
+        {HOUR_BUCKET} AS hour_ts,
+        MAX(TIMESTAMP_S) AS max_ts
+    FROM z_conclusion
+    WHERE {_range_conditions('', calculation, start, end)}
+    GROUP BY {HOUR_BUCKET}
+) t ON z.TIMESTAMP_S = t.max_ts
+WHERE {_range_conditions('z.', calculation, start=False, end=False)}
+ORDER BY t.hour_ts
+"""
+
+
+def last_value_per_hour_query(var='SYSTEM_TOTAL_P', start_ts=None, end_ts=None,
+                              calculation=50, window=None):
+    """last_value_per_hour_sql-ийг параметртэйгээр sqlalchemy text болгох"""
+    sql = last_value_per_hour_sql(calculation, start_ts is not None, end_ts is not None, window)
+    params = {'var': var}
+    if start_ts is not None:
+        params['start_ts'] = int(start_ts)
+    if end_ts is not None:
+        params['end_ts'] = int(end_ts)
+    return text(sql).bindparams(**params)
+
+
+def read_last_value_per_hour(engine=None, var='SYSTEM_TOTAL_P', start_ts=None, end_ts=None,
+                             calculation=50, window=None, tz_offset_hours=None):
+    """
+    Цаг бүрийн сүүлийн утгыг DataFrame болгон буцаах:
+    time_ (цагийн эхлэл), TIMESTAMP_S, value
+    engine None бол db.get_engine() (кэштэй уншилт)
+    """
+    if tz_offset_hours is None:
+        tz_offset_hours = QUERY_CONFIG['db_tz_offset_hours']
+
+    query = last_value_per_hour_query(var, start_ts, end_ts, calculation, window)
+    df = read_sql(query, engine)
+    df['value'] = pd.to_numeric(df['value'])
+    df['time_'] = pd.to_datetime(df['hour_ts'].astype('int64') + tz_offset_hours * 3600, unit='s')
+    return df[['time_', 'TIMESTAMP_S', 'value']]
+
+
+def day_range(day=None, tz_offset_hours=None):
+    """
+    Нэг өдрийн [start_ts, end_ts) UNIX секундын хязгаар.
+    day нь tz_offset_hours цагийн бүсийн огноо (None бол өнөөдөр)
+    """
+    if tz_offset_hours is None:
+        tz_offset_hours = QUERY_CONFIG['db_tz_offset_hours']
+    if day is None:
+        day = (datetime.now(timezone.utc) + timedelta(hours=tz_offset_hours)).date()
+    start_ts = calendar.timegm(day.timetuple()) - tz_offset_hours * 3600
+    return start_ts, start_ts + 24 * 3600
+
+
+# ==========================
+# EXPLAIN шалгалт
+# ==========================
+def explain_plan(engine, query):
+    """Query-н гүйцэтгэлийн төлөвлөгөөг (EXPLAIN) DataFrame болгон буцаах"""
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == 'sqlite' else "EXPLAIN "
+    explain = text(prefix + str(query.text)).bindparams(
+        **{k: v.value for k, v in query.compile().binds.items()}
+    )
+    return pd.read_sql(explain, engine)
+
+
+def find_full_scans(engine, df_plan):
+    """
+    EXPLAIN-аас full scan хийж буй мөрүүдийг олох
+    - MySQL: type = 'ALL' (бүтэн хүснэгт) эсвэл 'index' (бүтэн индекс)
+    - SQLite: 'SCAN <table>' бөгөөд индекс ашиглаагүй
+    """
+    if df_plan.empty:
+        return df_plan
+
+    if engine.dialect.name == 'sqlite':
+        detail = df_plan['detail'].astype(str)
+        # Дэд query-н (MATERIALIZE/CO-ROUTINE) үр дүнг scan хийх нь асуудалгүй
+        derived = set(detail.str.extract(r'^(?:MATERIALIZE|CO-ROUTINE) (\w+)')[0].dropna())
+        scanned = detail.str.extract(r'^SCAN (\w+)')[0]
+        mask = scanned.notna() & ~scanned.isin(derived) & ~detail.str.contains('INDEX')
+        return df_plan[mask]
+
+    columns = {c.lower(): c for c in df_plan.columns}
+    table = df_plan[columns['table']].astype(str)
+    mask = df_plan[columns['type']].isin(['ALL', 'index']) & ~table.str.startswith('<')
+    return df_plan[mask]
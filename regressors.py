@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+MODEL_CONFIG-ийн параметрээс регрессор үүсгэх
+- main.py, main_system_total.py, tune.py, bench_models.py бүгд үүнийг ашиглана
+- params['engine'] нь ENGINES-ээс аль backend-ийг ашиглахыг сонгоно:
+    'adaboost' - AdaBoost(DecisionTree), анхны утга. Дараалсан, нэг цөмт сургалт
+    'hist_gbm' - HistGradientBoosting: утгуудыг 255 bin болгож бүх цөм дээр сургана,
+                 predict нь гүехэн модод тул хурдан
+- Тохиргоонд байхгүй параметр нь sklearn-ийн анхны утгаа авна
+  (хуучин MODEL_CONFIG-оор үүсгэсэн модель өөрчлөгдөхгүй)
+
+Шинэ backend нэмэх: params → fit/predict-тэй estimator буцаах функцийг ENGINES-д бүртгэнэ.
+"""
+
+from sklearn.ensemble import AdaBoostRegressor, HistGradientBoostingRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+DEFAULT_ENGINE = 'adaboost'
+
+
+def _adaboost(params):
+    return AdaBoostRegressor(
+        DecisionTreeRegressor(
+            max_depth=params['max_depth'],
+            min_samples_leaf=params.get('min_samples_leaf', 1),
+        ),
+        n_estimators=params['n_estimators'],
+        learning_rate=params.get('learning_rate', 1.0),
+        loss=params.get('loss', 'linear'),
+        random_state=params['random_state'],
+    )
+
+
+def _hist_gbm(params):
+    return HistGradientBoostingRegressor(
+        max_iter=params.get('max_iter', 300),
+        learning_rate=params.get('learning_rate', 0.1),
+        max_depth=params.get('max_depth'),
+        max_leaf_nodes=params.get('max_leaf_nodes', 31),
+        min_samples_leaf=params.get('min_samples_leaf', 20),
+        l2_regularization=params.get('l2_regularization', 0.0),
+        early_stopping=params.get('early_stopping', False),
+        random_state=params['random_state'],
+    )
+
+
+ENGINES = {
+    'adaboost': _adaboost,
+    'hist_gbm': _hist_gbm,
+}
+
+# bench_models.py-д MODEL_CONFIG-д сонгоогүй backend-уудыг эдгээр утгаар харьцуулна
+ENGINE_DEFAULTS = {
+    'adaboost': {'engine': 'adaboost', 'max_depth': 12, 'n_estimators': 50, 'random_state': 42},
+    'hist_gbm': {'engine': 'hist_gbm', 'max_iter': 300, 'learning_rate': 0.1, 'random_state': 42},
+}
+
+
+def engine_name(params):
+    """params-ийн backend нэр (заагаагүй бол DEFAULT_ENGINE)"""
+    return params.get('engine', DEFAULT_ENGINE)
+
+
+def build_regressor(params):
+    """MODEL_CONFIG['daily'] эсвэл MODEL_CONFIG['hourly'] → params['engine']-ийн estimator"""
+    engine = engine_name(params)
+    if engine not in ENGINES:
+        raise ValueError(f"Тодорхойгүй engine: {engine} ({', '.join(ENGINES)})")
+    return ENGINES[engine](params)
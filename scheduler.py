@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Сургалт / таамаглалын давтамжийг салгах
+- train:   моделийг заавал дахин сургана (шөнийн cron)
+- predict: хадгалсан сүүлийн моделиор зөвхөн predict хийнэ (цаг тутмын cron)
+- auto:    SCHEDULE_CONFIG-ийн дагуу сургах эсэхийг шийднэ
+           (шөнийн цаг өнгөрсөн, эсвэл N шинэ цаг хуримтлагдсан бол сургана)
+
+Cron жишээ:
+    0 2 * * *   python main.py --mode train
+    5 * * * *   python main.py --mode predict
+
+Cron байхгүй орчинд энэ файлыг шууд ажиллуулж болно:
+    python scheduler.py main.py
+"""
+
+import sys
+import time
+import subprocess
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from config import SCHEDULE_CONFIG
+from model_registry import load_models, load_latest, config_hash
+
+RUN_MODES = ('train', 'predict', 'auto')
+
+
+def parse_run_mode(argv=None):
+    """Командын мөрөөс --mode утгыг авах (байхгүй бол SCHEDULE_CONFIG['mode'])"""
+    argv = sys.argv[1:] if argv is None else argv
+    mode = SCHEDULE_CONFIG['mode']
+    for i, arg in enumerate(argv):
+        if arg == '--mode' and i + 1 < len(argv):
+            mode = argv[i + 1]
+        elif arg.startswith('--mode='):
+            mode = arg.split('=', 1)[1]
+    if mode not in RUN_MODES:
+        raise ValueError(f"--mode нь {RUN_MODES}-ийн нэг байх ёстой: {mode}")
+    return mode
+
+
+def last_retrain_time(now=None):
+    """Хамгийн сүүлийн шөнийн сургалтын товлосон цаг"""
+    now = now or datetime.now()
+    scheduled = now.replace(hour=SCHEDULE_CONFIG['retrain_hour'], minute=0, second=0, microsecond=0)
+    if scheduled > now:
+        scheduled -= timedelta(days=1)
+    return scheduled
+
+
+def incompatible_reason(meta, feature_columns, model_config):
+    """Хадгалсан модель одоогийн тохиргоотой нийцэхгүй бол шалтгааныг буцаах"""
+    if meta is None:
+        return "хадгалсан модель байхгүй"
+    if meta.get('config_hash') != config_hash(model_config):
+        return "MODEL_CONFIG өөрчлөгдсөн"
+    if meta.get('features') != feature_columns:
+        return "feature баганууд өөрчлөгдсөн"
+    return None
+
+
+def retrain_due(meta, data_end, feature_columns, model_config, now=None):
+    """
+    Дахин сургах шаардлагатай эсэх.
+    Буцаах утга: (True/False, шалтгаан)
+    """
+    reason = incompatible_reason(meta, feature_columns, model_config)
+    if reason is not None:
+        return True, reason
+
+    new_hours = int((pd.Timestamp(data_end) - pd.Timestamp(meta['data_end'])) / pd.Timedelta(hours=1))
+    if new_hours >= SCHEDULE_CONFIG['retrain_after_new_hours']:
+        return True, f"{new_hours} шинэ цаг хуримтлагдсан"
+
+    if pd.Timestamp(meta['saved_at']) < pd.Timestamp(last_retrain_time(now)):
+        return True, "шөнийн товлосон сургалт"
+
+    return False, f"сүүлийн моделиос хойш {new_hours} шинэ цаг"
+
+
+def select_models(name, registry_key, data_end, feature_columns, model_config, run_mode):
+    """
+    Ажиллах горимоос хамааран ашиглах моделийг сонгох.
+    Буцаах утга: (models эсвэл None, шалтгаан) - None бол сургах ёстой
+    """
+    if run_mode == 'train':
+        return None, "--mode train"
+
+    # Яг ижил өгөгдөл + тохиргоогоор сургасан модель байвал түүнийг ашиглана
+    models = load_models(registry_key)
+    if models is not None:
+        return models, "ижил өгөгдөл, тохиргоо"
+
+    latest = load_latest(name)
+    meta = latest['meta'] if latest is not None else None
+
+    if run_mode == 'predict':
+        # Зөвхөн нийцэхгүй (эсвэл байхгүй) үед л сургана
+        reason = incompatible_reason(meta, feature_columns, model_config)
+        if reason is not None:
+            return None, reason
+        return latest, f"predict горим ({meta['key']})"
+
+    due, reason = retrain_due(meta, data_end, feature_columns, model_config)
+    if due:
+        return None, reason
+    return latest, f"{reason} ({meta['key']})"
+
+
+# ==========================
+# Cron байхгүй үед ажиллах давталт
+# ==========================
+def run_forever(script):
+    """Цаг бүр predict, товлосон цагт train горимоор скриптийг ажиллуулах"""
+    print(f"⏰ Scheduler эхэллээ: {script}")
+    print(f"   Сургалт: өдөр бүр {SCHEDULE_CONFIG['retrain_hour']:02d}:00, бусад цагт зөвхөн predict")
+
+    while True:
+        now = datetime.now()
+        mode = 'train' if now.hour == SCHEDULE_CONFIG['retrain_hour'] else 'predict'
+        print(f"\n▶️ {now.strftime('%Y-%m-%d %H:%M')} - {script} --mode {mode}")
+        result = subprocess.run([sys.executable, script, '--mode', mode])
+        if result.returncode != 0:
+            print(f"   ⚠️ Алдаатай дууслаа: {result.returncode}")
+
+        next_run = (datetime.now() + timedelta(hours=1)).replace(
+            minute=SCHEDULE_CONFIG['minute'], second=0, microsecond=0
+        )
+        time.sleep(max(0, (next_run - datetime.now()).total_seconds()))
+
+
+if __name__ == '__main__':
+    run_forever(sys.argv[1] if len(sys.argv) > 1 else 'main.py')
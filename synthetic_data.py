@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+z_conclusion-ийг дуурайсан synthetic өгөгдөл (seed-тэй, давтагдах)
+- SYSTEM_TOTAL_P: минут тутам, өдөр / долоо хоног / жилийн улирлын хэлбэртэй
+- 3 батарей: 5 минут тутам, өдөр нарны үед цэнэглэж (сөрөг), оройн оргилд цэнэг өгнө (эерэг)
+- TIMESTAMP_S нь бодит дамжуулалт шиг хэдэн секундийн хэлбэлзэлтэй
+- Температур: цагийн, жилийн + хоногийн хэлбэлзэлтэй (Улаанбаатар орчмын)
+
+Бенчмарк, офлайн туршилтад MySQL / Open-Meteo-гүйгээр ашиглана:
+    df_raw = generate_raw(years=10)                # fetch_since-тэй ижил баганууд
+    df_temp = generate_temperature(df_load['time_'])
+    write_sqlite(df_raw, 'z_conclusion.sqlite')    # offline bundle / тестийн SQLite
+"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from hourly_store import SYSTEM_VAR, BATTERY_VARS
+
+# VAR бүрийн дээж авах давтамж (секунд)
+SAMPLE_SECONDS = {SYSTEM_VAR: 60, **{var: 300 for var in BATTERY_VARS}}
+
+# Батарей бүрийн чадал (МВт) - станц олон бол 20 / 50 / 80-аар давтана
+BATTERY_CAPACITY = {var: [20.0, 50.0, 80.0][i % 3] for i, var in enumerate(BATTERY_VARS)}
+
+DEFAULT_END = '2026-01-01'
+
+
+def _local_hours(ts, tz_offset_hours=8):
+    """UTC TIMESTAMP_S → орон нутгийн цаг (бутархайтай)"""
+    return ((ts + tz_offset_hours * 3600) % 86400) / 3600.0
+
+
+def _system_load(ts, rng):
+    hours = _local_hours(ts)
+    day_of_year = (ts // 86400) % 365.25
+    weekday = (ts // 86400 + 3) % 7  # 1970-01-01 нь Пүрэв
+
+    annual = 250 * np.cos(2 * np.pi * (day_of_year - 15) / 365.25)          # өвөл оргил
+    daily = 180 * np.sin(2 * np.pi * (hours - 9) / 24) + 120 * np.exp(-((hours - 19) ** 2) / 4)
+    weekend = np.where(weekday >= 5, -80, 0)
+    noise = rng.normal(0, 15, len(ts))
+    return 1300 + annual + daily + weekend + noise
+
+
+def _battery(ts, capacity, rng):
+    hours = _local_hours(ts)
+    charge = np.where((hours >= 10) & (hours < 15), -capacity * rng.uniform(0.5, 1.0, len(ts)), 0.0)
+    discharge = np.where((hours >= 18) & (hours < 22), capacity * rng.uniform(0.4, 0.9, len(ts)), 0.0)
+    idle = rng.random(len(ts)) < 0.15  # зарим өдөр / мөчид ажиллахгүй
+    return np.where(idle, 0.0, charge + discharge)
+
+
+def generate_raw(years=1, seed=42, end=DEFAULT_END, sample_seconds=None):
+    """
+    years жилийн түүхий мөрүүд (TIMESTAMP_S, VAR, value).
+    VAR нь categorical, value нь float64 (2 оронтой бутархай).
+    """
+    rng = np.random.default_rng(seed)
+    sample_seconds = sample_seconds or SAMPLE_SECONDS
+    end_ts = int(pd.Timestamp(end).timestamp())
+    start_ts = end_ts - int(years * 365.25 * 86400)
+
+    frames = []
+    for var, step in sample_seconds.items():
+        ts = np.arange(start_ts, end_ts, step, dtype='int64')
+        ts = ts + rng.integers(0, min(step, 10), len(ts))
+        if var == SYSTEM_VAR:
+            values = _system_load(ts, rng)
+        else:
+            values = _battery(ts, BATTERY_CAPACITY[var], rng)
+        frames.append(pd.DataFrame({
+            'TIMESTAMP_S': ts,
+            'VAR': var,
+            'value': np.round(values, 2),
+        }))
+
+    df = pd.concat(frames, ignore_index=True).sort_values('TIMESTAMP_S', kind='stable')
+    df['VAR'] = df['VAR'].astype('category')
+    return df.reset_index(drop=True)
+
+
+def generate_temperature(times, seed=42):
+    """times-ийн цаг бүрийн температур (time_, temp)"""
+    rng = np.random.default_rng(seed)
+    times = pd.DatetimeIndex(pd.Series(times).drop_duplicates().sort_values())
+    day_of_year = times.dayofyear.to_numpy()
+    hours = times.hour.to_numpy()
+    temp = (-2 - 22 * np.cos(2 * np.pi * (day_of_year - 15) / 365.25)
+            + 6 * np.sin(2 * np.pi * (hours - 9) / 24)
+            + rng.normal(0, 2, len(times)))
+    return pd.DataFrame({'time_': times, 'temp': np.round(temp, 1)})
+
+
+def write_sqlite(df_raw, path, calculation=50):
+    """generate_raw-ийн мөрүүдийг z_conclusion хүснэгттэй SQLite болгох (offline bundle-ийн бүтэц)"""
+    df = pd.DataFrame({
+        'TIMESTAMP_S': df_raw['TIMESTAMP_S'].astype('int64'),
+        'VAR': df_raw['VAR'].astype(str),
+        'VALUE': df_raw['value'].astype('float64'),
+        'CALCULATION': calculation,
+    })
+    con = sqlite3.connect(path)
+    try:
+        df.to_sql('z_conclusion', con, if_exists='replace', index=False)
+        con.execute("CREATE INDEX IF NOT EXISTS idx_var_calc_ts ON z_conclusion (VAR, CALCULATION, TIMESTAMP_S)")
+        con.commit()
+    finally:
+        con.close()
+    return path
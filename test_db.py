@@ -3,27 +3,14 @@
 MySQL өгөгдөл татах тест
 """
 import pandas as pd
-from sqlalchemy import create_engine
-from config import DB_CONFIG
+from db import get_engine, read_named
+from hourly_store import ALL_VARS
 
 print("🔗 MySQL холбогдож байна...")
 try:
-    engine = create_engine(
-        "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
-    )
+    engine = get_engine()
 
-    query = """
-    SELECT
-        TIMESTAMP_S,
-        VAR,
-        CAST(VALUE AS DECIMAL(10,2)) AS value
-    FROM z_conclusion
-    WHERE VAR IN ('SYSTEM_TOTAL_P', 'ERDENE_SPP_BHB_TOTAL_P', 'BAGANUUR_BESS_TOTAL_P_T', 'SONGINO_BESS_TOTAL_P')
-    ORDER BY TIMESTAMP_S DESC
-    LIMIT 100
-    """
-
-    df_raw = pd.read_sql(query, engine)
+    df_raw = read_named('latest_raw', engine, vars=ALL_VARS, limit=100)
 
     print(f"✅ Амжилттай холбогдлоо!")
     print(f"   Өгөгдөл: {len(df_raw)} мөр")
@@ -3,40 +3,21 @@
 main_system_total.py-н график хэсгийг туршиж үзэх
 """
 import pandas as pd
-from sqlalchemy import create_engine
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from datetime import datetime, timedelta
-from config import DB_CONFIG, PLOT_CONFIG
+from config import PLOT_CONFIG
+from db import get_engine
+from queries import read_last_value_per_hour, day_range
 
-engine = create_engine(
-    "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
-)
+engine = get_engine()
 
 today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
 print("📊 Өнөөдрийн бодит өгөгдөл татаж байна...")
-query_today = """
-SELECT
-    FROM_UNIXTIME(t.max_ts, '%%Y-%%m-%%d %%H:00:00') AS time_,
-    CAST(z.VALUE AS DECIMAL(10,2)) AS load_value
-FROM z_conclusion z
-JOIN (
-    SELECT
-        MAX(TIMESTAMP_S) AS max_ts
-    FROM z_conclusion
-    WHERE VAR = 'SYSTEM_TOTAL_P'
-      AND TIMESTAMP_S >= UNIX_TIMESTAMP(CURDATE())
-      AND TIMESTAMP_S < UNIX_TIMESTAMP(CURDATE() + INTERVAL 1 DAY)
-    GROUP BY FROM_UNIXTIME(TIMESTAMP_S, '%%Y-%%m-%%d %%H')
-) t ON z.TIMESTAMP_S = t.max_ts
-WHERE z.VAR = 'SYSTEM_TOTAL_P'
-ORDER BY time_
-"""
-
-df_today_actual = pd.read_sql(query_today, engine)
-df_today_actual['time_'] = pd.to_datetime(df_today_actual['time_'])
-df_today_actual['load'] = pd.to_numeric(df_today_actual['load_value'])
+start_ts, end_ts = day_range()
+df_today_actual = read_last_value_per_hour(engine, start_ts=start_ts, end_ts=end_ts, calculation=None)
+df_today_actual = df_today_actual.rename(columns={'value': 'load'})[['time_', 'load']]
 
 print(f"✅ Өнөөдрийн бодит: {len(df_today_actual)} цаг")
 print(f"   Системийн хэрэглээ: {df_today_actual['load'].min():.0f} - {df_today_actual['load'].max():.0f} МВт")
@@ -3,12 +3,7 @@
 Хэрэглэгчийн өгсөн query-г туршиж үзэх
 """
 import pandas as pd
-from sqlalchemy import create_engine
-from config import DB_CONFIG
-
-engine = create_engine(
-    "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
-)
+from db import read_sql
 
 # Хэрэглэгчийн өгсөн query
 query = """
@@ -29,7 +24,7 @@ WHERE z.VAR = 'system_total_p'
 ORDER BY time_
 """
 
-df = pd.read_sql(query, engine)
+df = read_sql(query)
 print(f"📊 Өнөөдрийн системийн нийт хэрэглээ:")
 print(f"   Нийт: {len(df)} цаг")
 print(f"\n{df.to_string(index=False)}")
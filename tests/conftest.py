@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Тестийн орчин
+- config: config.example.py-г 'config' нэрээр ачаална (локал config.py / MySQL шаардлагагүй)
+- synthetic_raw / synthetic_db: synthetic_data-аас seed-тэй түүхий мөрүүд болон
+  z_conclusion хүснэгттэй SQLite (offline bundle-ийн бүтэц)
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_spec = importlib.util.spec_from_file_location('config', os.path.join(ROOT, 'config.example.py'))
+config = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(config)
+sys.modules['config'] = config
+
+# Тестийн хугацаа: 6 долоо хоногийн минутын өгөгдөл (7 хоногийн lag-д хангалттай)
+SYNTHETIC_YEARS = 42 / 365.25
+SYNTHETIC_END = '2026-01-10'
+
+
+@pytest.fixture(scope='session')
+def synthetic_raw():
+    from synthetic_data import generate_raw
+    return generate_raw(years=SYNTHETIC_YEARS, seed=7, end=SYNTHETIC_END)
+
+
+@pytest.fixture(scope='session')
+def synthetic_db(tmp_path_factory, synthetic_raw):
+    """z_conclusion-той SQLite-ийн SQLAlchemy engine"""
+    from db import get_engine
+    from synthetic_data import write_sqlite
+    path = write_sqlite(synthetic_raw, str(tmp_path_factory.mktemp('bundle') / 'z_conclusion.sqlite'))
+    return get_engine(f"sqlite:///{path}")
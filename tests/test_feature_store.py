@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""feature_store: инкремент шинэчлэлт бүрийн дараа build_feature_frame-тэй ижил"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_store import read_features, update_feature_store
+from features import build_feature_frame
+
+START = pd.Timestamp('2025-01-01 01:00')
+
+
+@pytest.fixture(scope='module')
+def inputs():
+    rng = np.random.default_rng(5)
+    times = pd.date_range(START, periods=24 * 60, freq='h')
+    load = 1200 + 300 * np.sin(np.arange(len(times)) * 2 * np.pi / 24) + rng.normal(0, 20, len(times))
+    df_load = pd.DataFrame({'time_': times, 'system_load': load + 50, 'load': load.round(1)})
+    df_temp = pd.DataFrame({'time_': times, 'temp': rng.normal(-15, 8, len(times)).round(1)})
+    return df_load, df_temp
+
+
+def _until(df, day):
+    return df[df['time_'] < START + pd.Timedelta(days=day)].reset_index(drop=True)
+
+
+def _assert_matches_full(store_dir, df_load, df_temp):
+    expected = build_feature_frame(df_load, df_temp, weekday='excel')
+    actual = read_features('main', store_dir=store_dir)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_backfilled_temperature_hole(inputs, tmp_path):
+    """1-р ажиллалт: 20 дахь өдрийн орчим 2 өдрийн температур дутуу, 40 хоног; 2-р: бүрэн 60 хоног"""
+    df_load, df_temp = inputs
+    hole = (df_temp['time_'] >= START + pd.Timedelta(days=19)) & (df_temp['time_'] < START + pd.Timedelta(days=21))
+    store_dir = str(tmp_path)
+
+    run1 = _until(df_load, 40), _until(df_temp[~hole], 40)
+    update_feature_store('main', *run1, store_dir=store_dir)
+    _assert_matches_full(store_dir, *run1)
+
+    rows = update_feature_store('main', df_load, df_temp, store_dir=store_dir)
+    assert rows == len(df_load) - 24 * 19  # цоорхойн эхнээс хойш бүгд дахин бодогдоно
+    _assert_matches_full(store_dir, df_load, df_temp)
+
+
+def test_hourly_runs_with_late_temperature(inputs, tmp_path):
+    """Цаг тутмын ажиллалт: сүүлийн 2 өдрийн температур хожуу, засварлагдсан утгатай ирнэ"""
+    df_load, df_temp = inputs
+    store_dir = str(tmp_path)
+    for hours in range(24 * 30, 24 * 30 + 30, 3):
+        end = START + pd.Timedelta(hours=hours)
+        run_load = df_load[df_load['time_'] < end]
+        run_temp = df_temp[df_temp['time_'] < end - pd.Timedelta(days=2) + pd.Timedelta(hours=hours % 7)]
+        run_temp = run_temp.assign(temp=run_temp['temp'] + (run_temp['time_'] > end - pd.Timedelta(days=3)) * 0.1 * hours)
+        update_feature_store('main', run_load, run_temp, store_dir=store_dir)
+        _assert_matches_full(store_dir, run_load, run_temp)
+
+
+def test_unchanged_inputs_recompute_nothing(inputs, tmp_path):
+    df_load, df_temp = inputs
+    store_dir = str(tmp_path)
+    assert update_feature_store('main', df_load, df_temp, store_dir=store_dir) == len(df_load)
+    assert update_feature_store('main', df_load, df_temp, store_dir=store_dir) == 0
+    # Сүүлийн цагийн load засварлагдвал зөвхөн тэр цаг
+    fixed = df_load.assign(load=np.where(df_load.index == len(df_load) - 1, 999.0, df_load['load']))
+    assert update_feature_store('main', fixed, df_temp, store_dir=store_dir) == 1
+    _assert_matches_full(store_dir, fixed, df_temp)
+
+
+def test_compares_values_only_inside_window(inputs, tmp_path):
+    """Цонхноос өмнөх утгын өөрчлөлтийг (мөрийн тоо ижил) дахин бодохгүй, шинэ цагуудыг л"""
+    df_load, df_temp = inputs
+    store_dir = str(tmp_path)
+    update_feature_store('main', _until(df_load, 50), _until(df_temp, 50), store_dir=store_dir)
+
+    old_revision = df_temp.assign(temp=np.where(df_temp['time_'] < START + pd.Timedelta(days=10),
+                                                df_temp['temp'] + 1, df_temp['temp']))
+    rows = update_feature_store('main', _until(df_load, 51), _until(old_revision, 51), store_dir=store_dir)
+    assert rows == 24
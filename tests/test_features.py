@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Feature engineering: vectorized өдрийн таамаглалын feature нь хуучин давталттай ижил"""
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import DAILY_FEATURES, build_feature_frame, build_daily_forecast_features
+from hourly_store import aggregate_raw_hourly, build_load_frame
+from synthetic_data import generate_temperature
+
+
+@pytest.fixture(scope='module')
+def feature_inputs(synthetic_raw):
+    df_load = build_load_frame(aggregate_raw_hourly(synthetic_raw), tz_offset_hours=8)
+    df_temp = generate_temperature(df_load['time_'], seed=3)
+    # Хэдэн цагийн температур дутуу (merge-д мөр хасагдана)
+    df_temp = df_temp.drop(index=df_temp.index[100:110]).reset_index(drop=True)
+    return df_load, df_temp
+
+
+def _daily_features_loop(df, df_temp, today):
+    """user-008-аас өмнөх main.py-н давталт (лавлагаа)"""
+    rows = []
+    for hour in range(1, 25):
+        future_time = today + timedelta(hours=hour)
+        lag_data = df[df['time_'] < future_time].tail(24 * 7)
+        if len(lag_data) < 24 * 7:
+            continue
+        temp_current = df_temp[df_temp['time_'] == future_time]['temp'].values
+        if len(temp_current) == 0:
+            temp_current = df[df['time_'].dt.date == today.date()]['temp'].mean()
+        else:
+            temp_current = temp_current[0]
+        row = {
+            'year': future_time.year, 'month': future_time.month, 'day': future_time.day,
+            'hour': future_time.hour, 'temp': temp_current,
+            'wd': (future_time.weekday() + 1) % 7 + 1,
+        }
+        for k in range(1, 8):
+            row[f'load-{k}d'] = lag_data.iloc[-24 * k]['load']
+        rows.append(row)
+    return pd.DataFrame(rows)[DAILY_FEATURES]
+
+
+@pytest.mark.parametrize('days_back', [0, 3])
+def test_daily_forecast_features_match_loop(feature_inputs, days_back):
+    df_load, df_temp = feature_inputs
+    df = build_feature_frame(df_load, df_temp, weekday='excel')
+    today = df['time_'].max().normalize() - pd.Timedelta(days=days_back)
+    # Сүүлийн өдрийн температурыг хасаж fallback замыг шалгана
+    df_temp = df_temp[df_temp['time_'] < df['time_'].max() - pd.Timedelta(hours=5)]
+
+    expected = _daily_features_loop(df, df_temp, today)
+    fallback = df[df['time_'].dt.date == today.date()]['temp'].mean()
+    times, actual = build_daily_forecast_features(
+        df, df_temp, [today + timedelta(hours=h) for h in range(1, 25)], fallback, weekday='excel'
+    )
+
+    assert len(times) == 24
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected, check_dtype=False)
+    assert np.isfinite(actual.to_numpy(dtype=float)).all()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""forecast_archive: нэг секундэд гарсан таамаглалууд дарагдахгүй"""
+
+import os
+
+import pandas as pd
+
+from forecast_archive import archive_forecast, read_archive, latest_per_target
+
+
+def _forecast(value):
+    times = pd.date_range('2025-01-15 09:00', periods=30, freq='h')
+    return pd.DataFrame({'time_': times, 'forecast_hourly': float(value)})
+
+
+def test_same_second_issues_are_kept(tmp_path):
+    issue_time = pd.Timestamp('2025-01-15 08:05:00.250')
+    first = archive_forecast(_forecast(1), 'forecast_hourly', 'hourly', 'system_total', 'v1',
+                             issue_time=issue_time, archive_dir=str(tmp_path))
+    second = archive_forecast(_forecast(2), 'forecast_hourly', 'hourly', 'system_total', 'v1',
+                              issue_time=issue_time + pd.Timedelta(milliseconds=500), archive_dir=str(tmp_path))
+
+    assert len(first) == len(second) == 2  # хоёр зорилтот өдөр
+    assert not set(first) & set(second)
+    df = read_archive(source='system_total', kind='hourly', archive_dir=str(tmp_path))
+    assert len(df) == 60
+    assert sorted(df['value'].unique()) == [1.0, 2.0]
+    assert not any(name.endswith('.tmp') for _, _, names in os.walk(tmp_path) for name in names)
+    latest = latest_per_target(df)
+    assert len(latest) == 30 and (latest['value'] == 2.0).all()
+
+
+def test_reads_unsuffixed_names(tmp_path):
+    [path] = archive_forecast(_forecast(1).head(5), 'forecast_hourly', 'daily', 'main', 'v1',
+                              issue_time='2025-01-14 09:00', archive_dir=str(tmp_path))
+    os.rename(path, os.path.join(os.path.dirname(path), '20250114T090000_main_daily.parquet'))
+    df = read_archive(issued_from='2025-01-14 09:00', source='main', archive_dir=str(tmp_path))
+    assert len(df) == 5
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""forecast_service: LRU кэш ба оролтын шалгалт (MySQL / HTTP-гүйгээр)"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import SERVICE_CONFIG
+from features import DAILY_FEATURES, build_feature_frame
+from forecast_service import ForecastService
+from hourly_store import aggregate_raw_hourly, build_load_frame
+from synthetic_data import generate_temperature
+
+
+class MeanModel:
+    def predict(self, X):
+        return X['load-1d'].to_numpy()
+
+
+@pytest.fixture
+def service(synthetic_raw):
+    df_load = build_load_frame(aggregate_raw_hourly(synthetic_raw), tz_offset_hours=8)
+    df_temp = generate_temperature(df_load['time_'], seed=3)
+    df = build_feature_frame(df_load, df_temp, weekday='excel')
+    service = ForecastService(engine=None)
+    service.state = {
+        'df': df, 'df_load': df_load, 'df_temp': df_temp,
+        'model_daily': MeanModel(), 'model_hourly': None, 'model_key': 'test',
+        'refreshed_at': datetime.now(),
+        'day_min': (df['time_'].min() + timedelta(hours=167)).ceil('D'),
+        'day_max': df['time_'].max().normalize(),
+        'cache': OrderedDict(),
+    }
+    return service
+
+
+@pytest.mark.parametrize('temp_delta', [float('nan'), float('inf'), -1e6])
+def test_rejects_bad_temp_delta(service, temp_delta):
+    with pytest.raises(ValueError):
+        service.forecast_day(service.state['day_max'], temp_delta)
+
+
+def test_rejects_day_outside_window(service):
+    state = service.state
+    for day in (state['day_min'] - timedelta(days=1), state['day_max'] + timedelta(days=1)):
+        with pytest.raises(ValueError):
+            service.forecast_day(day)
+    assert len(service.forecast_day(state['day_max'])) == 24
+    assert len(service.forecast_day(state['day_min'])) == 24
+
+
+def test_cache_is_bounded_lru(service, monkeypatch):
+    monkeypatch.setitem(SERVICE_CONFIG, 'cache_size', 3)
+    day = service.state['day_max']
+    first = service.forecast_day(day, 0.0)
+    for delta in (1.0, 2.0, 3.0):
+        service.forecast_day(day, 0.0)  # хэрэглэсэн тул хамгийн шинэ хэвээр
+        service.forecast_day(day, delta)
+    cache = service.state['cache']
+    assert len(cache) == 3
+    assert ('day', day, 1.0) not in cache
+    assert service.forecast_day(day, 0.0) is first
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Цагийн сан: станцын хасалтын дүрэм, pushdown pivot болон pandas аргын тэнцүү байдал"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hourly_store import (AGGREGATIONS, NETTING_RULES, ASSETS, ASSET_COLUMNS, SYSTEM_VAR,
+                          aggregate_raw_hourly, asset_hourly_values, build_load_frame, combine_hourly,
+                          fetch_since, fetch_hourly_pivot, stream_hourly)
+
+NETTING_TRANSFORMS = {
+    'charge': lambda v: (-v).clip(lower=0),
+    'both': lambda v: -v,
+    'none': lambda v: v,
+}
+
+
+def _reference_asset_values(df_raw, aggregation, netting):
+    """Түүхий мөр бүрт хасалтын дүрмийг хэрэглээд дараа нь цагаар нэгтгэх (шууд тодорхойлолт)"""
+    df = df_raw.assign(hour_ts=df_raw['TIMESTAMP_S'] // 3600 * 3600,
+                       value=NETTING_TRANSFORMS[netting](df_raw['value']))
+    df = df.sort_values('TIMESTAMP_S', kind='stable')
+    return df.groupby('hour_ts')['value'].agg(aggregation).to_numpy()
+
+
+@pytest.mark.parametrize('netting', NETTING_RULES)
+@pytest.mark.parametrize('aggregation', AGGREGATIONS)
+def test_asset_hourly_values_rules(aggregation, netting):
+    rng = np.random.default_rng(1)
+    ts = np.sort(rng.integers(1_700_000_000, 1_700_000_000 + 48 * 3600, 2000))
+    df_raw = pd.DataFrame({'TIMESTAMP_S': ts, 'VAR': 'BESS_X',
+                           'value': np.round(rng.normal(0, 20, len(ts)), 2)})
+
+    actual = asset_hourly_values(aggregate_raw_hourly(df_raw),
+                                 assets=[{'var': 'BESS_X', 'aggregation': aggregation, 'netting': netting}])
+    np.testing.assert_allclose(actual, _reference_asset_values(df_raw, aggregation, netting), atol=1e-9)
+
+
+def test_load_frame_matches_per_battery_reference(synthetic_raw):
+    """Станц бүрийг тусад нь (хуучин adjust_battery_value шиг) бодсонтой ижил"""
+    df_raw = synthetic_raw.assign(VAR=synthetic_raw['VAR'].astype(str))
+    hour_ts = df_raw['TIMESTAMP_S'] // 3600 * 3600
+
+    system = df_raw[df_raw['VAR'] == SYSTEM_VAR]
+    expected = system.groupby(hour_ts[system.index])['value'].max().rename('system_load').to_frame()
+    for asset in ASSETS:
+        rows = df_raw[df_raw['VAR'] == asset['var']]
+        expected[asset['column']] = pd.Series(
+            _reference_asset_values(rows, asset['aggregation'], asset['netting']),
+            index=np.unique(hour_ts[rows.index]),
+        )
+    expected = expected.fillna({column: 0 for column in ASSET_COLUMNS})
+    netted = [a['column'] for a in ASSETS if a['netting'] != 'none']
+    expected['load'] = expected['system_load'] - expected[netted].sum(axis=1)
+    expected.insert(0, 'time_', pd.to_datetime(expected.index + 8 * 3600, unit='s'))
+
+    actual = build_load_frame(aggregate_raw_hourly(synthetic_raw), tz_offset_hours=8)
+    pd.testing.assert_frame_equal(actual, expected.reset_index(drop=True), check_dtype=False, atol=1e-9)
+
+
+def test_pushdown_pivot_matches_pandas(synthetic_db):
+    expected = build_load_frame(aggregate_raw_hourly(fetch_since(synthetic_db, 0)), tz_offset_hours=8)
+    actual = fetch_hourly_pivot(synthetic_db, 0, tz_offset_hours=8)
+
+    assert len(expected) > 24 * 30
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, atol=1e-9)
+
+
+@pytest.mark.parametrize('chunk_rows', [997, 20000, 10 ** 7])
+def test_stream_matches_full_read(synthetic_db, chunk_rows):
+    df_raw = fetch_since(synthetic_db, 0)
+    expected = aggregate_raw_hourly(df_raw)
+    actual, rows = stream_hourly(synthetic_db, 0, chunk_rows=chunk_rows)
+
+    assert rows == len(df_raw)
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False, rtol=1e-12)
+
+
+def test_combine_hourly_any_split(synthetic_raw):
+    expected = aggregate_raw_hourly(synthetic_raw)
+    cuts = [0, 1, 12345, 12346, 40000, len(synthetic_raw) // 2, len(synthetic_raw)]
+    parts = [aggregate_raw_hourly(synthetic_raw.iloc[a:b]) for a, b in zip(cuts, cuts[1:])]
+
+    actual = combine_hourly(parts[::-1])
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False, rtol=1e-12)
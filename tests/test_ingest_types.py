@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""db: түүхий мөрүүд төрөлтэй ирж, Decimal/object оролттой ижил нэгтгэл өгнө"""
+
+from decimal import Decimal
+
+import pandas as pd
+
+from db import read_named
+from hourly_store import ALL_VARS, aggregate_raw_hourly
+
+
+def test_raw_read_is_typed(synthetic_db):
+    df = read_named('raw_since', synthetic_db, ttl=0, vars=ALL_VARS, calculation=50, since=0)
+    assert len(df) > 0
+    assert df['value'].dtype == 'float64'
+    assert df['TIMESTAMP_S'].dtype == 'int64'
+    assert df['VAR'].dtype == 'category'
+
+
+def test_typed_aggregates_match_decimal_input(synthetic_db):
+    df_typed = read_named('raw_since', synthetic_db, ttl=0, vars=ALL_VARS, calculation=50, since=0)
+
+    # Хуучин замаар ирдэг хэлбэр: Decimal объект, str VAR (жижиг үсэгтэй ч байж болно)
+    df_object = pd.DataFrame({
+        'TIMESTAMP_S': df_typed['TIMESTAMP_S'].astype(object),
+        'VAR': df_typed['VAR'].astype(str).str.lower(),
+        'value': [Decimal(f"{v:.2f}") for v in df_typed['value']],
+    })
+    assert df_object['value'].dtype == object
+
+    pd.testing.assert_frame_equal(aggregate_raw_hourly(df_typed), aggregate_raw_hourly(df_object))
+    assert df_typed.memory_usage(deep=True).sum() < df_object.memory_usage(deep=True).sum() / 3
+
+
+def test_read_sql_cache_skips_large_frames(synthetic_db, monkeypatch):
+    import db
+    monkeypatch.setitem(db.DB_POOL_CONFIG, 'cache_max_rows', 50)
+    db.clear_cache()
+    large = read_named('raw_since', synthetic_db, ttl=60, vars=ALL_VARS, calculation=50, since=0)
+    assert len(large) > 50
+    assert db._cache == {}
+
+    small = read_named('latest_raw', synthetic_db, ttl=60, vars=['SYSTEM_TOTAL_P'], limit=10)
+    assert len(db._cache) == 1
+    small.iloc[0, 0] = -1
+    again = read_named('latest_raw', synthetic_db, ttl=60, vars=['SYSTEM_TOTAL_P'], limit=10)
+    assert again.iloc[0, 0] != -1
+    db.clear_cache()
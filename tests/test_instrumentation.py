@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""instrumentation: үе шатын бүртгэл"""
+
+import instrumentation
+from hourly_store import update_hourly_store
+
+
+def test_rss_delta_and_process_peak():
+    instrumentation.start_run('test')
+    instrumentation.mark('a', rows=3)
+    buffer = bytearray(64 * 1024 * 1024)
+    instrumentation.mark('b')
+    del buffer
+
+    stages = instrumentation.summary()['stages']
+    assert stages['a']['rows'] == 3 and stages['b']['rows'] is None
+    if stages['b']['rss_delta_mb'] is not None:
+        assert stages['b']['rss_delta_mb'] >= 32
+        assert stages['b']['process_peak_rss_mb'] >= stages['a']['process_peak_rss_mb']
+
+
+def test_hourly_store_does_not_mark(synthetic_db, tmp_path):
+    instrumentation.start_run('test')
+    assert update_hourly_store(synthetic_db, store_dir=str(tmp_path)) > 0
+    assert instrumentation.summary()['stages'] == {}
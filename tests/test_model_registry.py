@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""model_registry: тааруулсан параметрүүдийг config.py-ийн MODEL_CONFIG дээр давхарлах"""
+
+import copy
+import json
+
+import pytest
+
+from model_registry import save_tuned_config, tuned_model_config
+
+BASE = {
+    'daily': {'engine': 'adaboost', 'max_depth': 12, 'n_estimators': 50, 'random_state': 42},
+    'hourly': {'engine': 'adaboost', 'max_depth': 15, 'n_estimators': 50, 'random_state': 42},
+    'test_size': 0.33,
+}
+
+
+@pytest.fixture
+def tuned_dir(tmp_path):
+    tuned = copy.deepcopy(BASE)
+    tuned['daily'].update(max_depth=6, learning_rate=0.3, n_estimators=100)
+    save_tuned_config('main', tuned, BASE, tuning_dir=str(tmp_path))
+    return str(tmp_path)
+
+
+def test_overlays_search_params_only(tuned_dir):
+    config = tuned_model_config('main', BASE, tuning_dir=tuned_dir)
+    assert config['daily'] == {'engine': 'adaboost', 'max_depth': 6, 'n_estimators': 100,
+                               'random_state': 42, 'learning_rate': 0.3}
+    assert config['hourly'] == BASE['hourly'] and config['test_size'] == 0.33
+    assert BASE['daily']['max_depth'] == 12
+
+
+@pytest.mark.parametrize('edit', [
+    lambda c: c['daily'].update(engine='hist_gbm'),
+    lambda c: c.update(test_size=0.2),
+    lambda c: c['hourly'].update(random_state=7),
+])
+def test_ignores_file_tuned_from_other_base(tuned_dir, edit, capsys):
+    current = copy.deepcopy(BASE)
+    edit(current)
+    assert tuned_model_config('main', current, tuning_dir=tuned_dir) == current
+    assert '⚠️' in capsys.readouterr().out
+
+
+def test_ignores_file_without_base_hash(tmp_path, capsys):
+    path = tmp_path / 'main_model_config_v001.json'
+    path.write_text(json.dumps({'model_config': {**BASE, 'test_size': 0.5}}), encoding='utf-8')
+    assert tuned_model_config('main', BASE, tuning_dir=str(tmp_path)) == BASE
+    assert '⚠️' in capsys.readouterr().out
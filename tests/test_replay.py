@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+main.py / main_system_total.py-г OFFLINE_MODE=replay горимд бүтнээр ажиллуулах
+- Bundle: synthetic_data-ийн z_conclusion SQLite (одоо хүртэл) + Laravel-ийн last-history хариу
+- Температурын кэшийг урьдчилан бөглөнө (Archive API дуудлагагүй)
+- Гаралтын файлууд болон stub-д ирсэн Laravel payload-уудыг шалгана
+"""
+
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import LARAVEL_API_URL, LARAVEL_LAST_HISTORY_URL, OFFLINE_CONFIG, FILES, METRICS_CONFIG
+from conftest import ROOT
+from synthetic_data import generate_raw, generate_temperature, write_sqlite
+
+CONFIG_OVERRIDES = """
+MODEL_CONFIG['daily']['n_estimators'] = 5
+MODEL_CONFIG['hourly']['n_estimators'] = 5
+PLOT_CONFIG['background'] = False
+INGEST_CONFIG['start'] = '2020-01-01 00:00:00'
+OFFLINE_CONFIG['bundle_dir'] = 'offline_bundle'
+"""
+
+
+def _run(script, cwd):
+    env = dict(os.environ, OFFLINE_MODE='replay', PYTHONPATH=os.pathsep.join([str(cwd), ROOT]))
+    result = subprocess.run([sys.executable, os.path.join(ROOT, script)], cwd=cwd, env=env,
+                            capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout[-3000:] + result.stderr[-3000:]
+    return result.stdout
+
+
+@pytest.fixture(scope='module')
+def replay_run(tmp_path_factory):
+    import offline
+    import weather
+
+    cwd = tmp_path_factory.mktemp('replay')
+    bundle_dir = cwd / 'offline_bundle'
+    bundle_dir.mkdir()
+    with open(os.path.join(ROOT, 'config.example.py'), encoding='utf-8') as f:
+        (cwd / 'config.py').write_text(f.read() + CONFIG_OVERRIDES, encoding='utf-8')
+
+    # 3 долоо хоногийн өгөгдөл одоог хүртэл (скриптүүд datetime.now()-оор өнөөдрийг авна)
+    end = pd.Timestamp(datetime.now()).floor('h')
+    write_sqlite(generate_raw(years=21 / 365.25, seed=7, end=end), str(bundle_dir / offline.DB_FILE))
+
+    times = pd.date_range(end.normalize() - pd.Timedelta(days=23), end.normalize() + pd.Timedelta(days=2),
+                          freq='h', inclusive='left')
+    con = weather._connect(str(cwd / 'temperature_cache.sqlite'))
+    try:
+        weather.store_temperature(con, generate_temperature(times, seed=3),
+                                  times[0].strftime('%Y-%m-%d'), times[-1].strftime('%Y-%m-%d'))
+    finally:
+        con.close()
+
+    previous = OFFLINE_CONFIG['bundle_dir']
+    OFFLINE_CONFIG['bundle_dir'] = str(bundle_dir)
+    try:
+        offline.save_response('GET', LARAVEL_LAST_HISTORY_URL, None, 200, 'application/json',
+                               b'{"success": true, "last_time": null}')
+        logs = {'main': _run('main.py', cwd)}
+        main_posts = offline.received_payloads(LARAVEL_API_URL)
+        logs['system_total'] = _run('main_system_total.py', cwd)
+        yield {'cwd': cwd, 'logs': logs, 'posts': main_posts,
+               'all_posts': offline.received_payloads()}
+    finally:
+        OFFLINE_CONFIG['bundle_dir'] = previous
+
+
+def _read(cwd, key):
+    return pd.read_parquet(cwd / f"{os.path.splitext(FILES[key])[0]}.parquet")
+
+
+def _payload_frame(posts, data_type):
+    rows = [row for post in posts if post['type'] == data_type for row in post['data']]
+    return pd.DataFrame(rows)
+
+
+def test_main_outputs(replay_run):
+    cwd = replay_run['cwd']
+    df_daily = _read(cwd, 'daily_forecast')
+    df_hourly = _read(cwd, 'hourly_forecast')
+    df_history = _read(cwd, 'history')
+
+    assert len(df_daily) == 24
+    assert (df_daily['time_'].diff().dropna() == pd.Timedelta(hours=1)).all()
+    assert np.isfinite(df_daily['forecast_daily']).all()
+    assert len(df_hourly) > 0 and np.isfinite(df_hourly['forecast_hourly']).all()
+    assert df_history['time_'].is_monotonic_increasing
+    assert df_history[['load', 'system_load', 'temp', 'forecast_daily']].notna().all().all()
+    assert (df_history['system_load'] >= df_history['load'] - 1e-6).all()
+
+
+def test_main_laravel_payloads(replay_run):
+    cwd, posts = replay_run['cwd'], replay_run['posts']
+    types = [post['type'] for post in posts]
+    assert sorted(set(types)) == ['actual', 'daily', 'history', 'hourly', 'metrics']
+    assert types[-1] == 'metrics'
+
+    for data_type, key, column in [('daily', 'daily_forecast', 'forecast_daily'),
+                                   ('hourly', 'hourly_forecast', 'forecast_hourly'),
+                                   ('history', 'history', 'load')]:
+        df_out = _read(cwd, key)
+        sent = _payload_frame(posts, data_type).sort_values('time').reset_index(drop=True)
+        assert list(sent['time']) == list(df_out['time_'].dt.strftime('%Y-%m-%d %H:%M:%S'))
+        np.testing.assert_allclose(sent['value'], df_out[column])
+
+    history = _payload_frame(posts, 'history')
+    assert {'system_load', 'forecast_daily', 'forecast_hourly'} <= set(history.columns)
+    assert 'system_load' in _payload_frame(posts, 'actual').columns
+
+    metrics = next(post['data'] for post in posts if post['type'] == 'metrics')
+    assert metrics['training_size'] > 0 and metrics['test_size'] > 0
+    assert {'mysql_read', 'hour_bucketing', 'train', 'laravel_push'} <= set(metrics['pipeline']['stages'])
+
+
+def test_system_total_outputs(replay_run):
+    cwd = replay_run['cwd']
+    df_daily = _read(cwd, 'system_total_daily')
+    df_history = _read(cwd, 'system_total_history')
+
+    assert len(df_daily) == 24 and np.isfinite(df_daily['forecast_daily']).all()
+    assert len(df_history) > 0 and df_history['load'].notna().all()
+    # main_system_total Laravel руу юу ч илгээхгүй
+    assert len(replay_run['all_posts']) == len(replay_run['posts'])
+
+
+def test_stages_are_marked_once(replay_run):
+    with open(replay_run['cwd'] / METRICS_CONFIG['jsonl'], encoding='utf-8') as f:
+        runs = [json.loads(line) for line in f]
+    assert [run['script'] for run in runs] == ['main', 'system_total']
+    for run in runs:
+        stages = [record['stage'] for record in run['stages']]
+        assert len(stages) == len(set(stages)), stages
+        assert all('rss_delta_mb' in record and 'process_peak_rss_mb' in record for record in run['stages'])
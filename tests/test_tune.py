@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""tune: хайлтын үр дүн → MODEL_CONFIG хэлбэр"""
+
+from tune import model_params
+
+
+def test_model_params_keeps_base_values():
+    base = {'max_depth': 12, 'n_estimators': 50, 'random_state': 42}
+    params = model_params({'estimator__max_depth': 6, 'learning_rate': 0.5}, base)
+    assert params == {'engine': 'adaboost', 'max_depth': 6, 'n_estimators': 50,
+                      'random_state': 42, 'learning_rate': 0.5}
+    assert base == {'max_depth': 12, 'n_estimators': 50, 'random_state': 42}
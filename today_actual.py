@@ -3,41 +3,22 @@
 Өнөөдрийн системийн нийт хэрэглээний бодит утга
 """
 import pandas as pd
-from sqlalchemy import create_engine
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from datetime import datetime, timedelta
-from config import DB_CONFIG, PLOT_CONFIG
+from config import PLOT_CONFIG
+from db import get_engine
+from queries import read_last_value_per_hour, day_range
 
 # MySQL холболт
-engine = create_engine(
-    "mysql+pymysql://{user}:{password}@{host}:{port}/{database}?charset=utf8mb4".format(**DB_CONFIG)
-)
+engine = get_engine()
 
 print("📊 Өнөөдрийн системийн нийт хэрэглээ татаж байна...")
 
 # Өнөөдрийн өгөгдлийг татах
-query = """
-SELECT
-    FROM_UNIXTIME(t.max_ts, '%%Y-%%m-%%d %%H:00:00') AS time_,
-    z.VALUE AS load_value
-FROM z_conclusion z
-JOIN (
-    SELECT
-        MAX(TIMESTAMP_S) AS max_ts
-    FROM z_conclusion
-    WHERE VAR = 'SYSTEM_TOTAL_P'
-      AND TIMESTAMP_S >= UNIX_TIMESTAMP(CURDATE())
-      AND TIMESTAMP_S < UNIX_TIMESTAMP(CURDATE() + INTERVAL 1 DAY)
-    GROUP BY FROM_UNIXTIME(TIMESTAMP_S, '%%Y-%%m-%%d %%H')
-) t ON z.TIMESTAMP_S = t.max_ts
-WHERE z.VAR = 'SYSTEM_TOTAL_P'
-ORDER BY time_
-"""
-
-df = pd.read_sql(query, engine)
-df['time_'] = pd.to_datetime(df['time_'])
-df['load_value'] = pd.to_numeric(df['load_value'])
+start_ts, end_ts = day_range()
+df = read_last_value_per_hour(engine, start_ts=start_ts, end_ts=end_ts, calculation=None)
+df = df.rename(columns={'value': 'load_value'})[['time_', 'load_value']]
 
 print(f"✅ Өнөөдрийн өгөгдөл: {len(df)} цаг")
 if len(df) > 0:
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Өдрийн / цагийн моделийн hyperparameter тааруулах
+- MODEL_CONFIG[kind]['engine']-ийн хайх орон зайг TUNING_CONFIG['search_space']-ээс авна
+- Цагийн дарааллыг хадгалсан cross-validation (TimeSeriesSplit): fold бүр зөвхөн
+  өмнөх өгөгдлөөр сургаж дараагийн хэсгээр шалгана
+- Successive halving: бүх нэр дэвшигчийг эхлээд цөөн мөрөөр үнэлж, муу 1/factor-ыг
+  хасаад үлдсэнийг factor дахин их мөрөөр дахин үнэлнэ (гүн мод × олон estimator
+  бүхий муу нэр дэвшигч бүтэн өгөгдөл дээр сургагдахгүй)
+- Process pool (joblib/loky), TUNING_CONFIG['max_workers'] (-1 = бүх CPU)
+- Feature матрицыг нэг удаа бодож float64 numpy болгоно - joblib том массивыг
+  worker бүрт хуулахгүй, memmap-аар хуваалцана
+- Сүүлийн шатны нэр дэвшигчдийн MAE / сургалтын хугацааг (Pareto) хэвлэнэ.
+  MAE нь хамгийн сайнаасаа mae_tolerance дотор байгаа хамгийн хурдныг сонгоно
+- Ялсан тохиргоо → {dir}/{name}_model_config_v001.json (дараагийнх нь v002, ...)
+  main.py / main_system_total.py нь TUNING_CONFIG['apply'] бол сүүлийн хувилбарыг ашиглана
+
+Хэрэглээ:
+    python tune.py main
+    python tune.py system_total --kind hourly
+"""
+
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV, TimeSeriesSplit
+
+from config import MODEL_CONFIG, TUNING_CONFIG
+from db import get_engine
+from regressors import build_regressor, engine_name
+from weather import get_temperature_history
+from model_registry import save_tuned_config, tuned_model_config
+from features import DAILY_FEATURES, HOURLY_FEATURES
+from feature_store import feature_frame
+from hourly_store import update_hourly_store, load_hourly_store, build_load_frame, build_last_value_frame
+
+warnings.filterwarnings("ignore")
+
+# Скрипт бүрийн load хүснэгт, цагийн бүс, долоо хоногийн өдрийн хэлбэр
+TARGETS = {
+    'main': {'frame': build_load_frame, 'tz_offset_hours': 8, 'weekday': 'excel'},
+    'system_total': {'frame': build_last_value_frame, 'tz_offset_hours': 0, 'weekday': 'python'},
+}
+KINDS = {'daily': DAILY_FEATURES, 'hourly': HOURLY_FEATURES}
+
+# AdaBoost-ийн search_space дахь DecisionTree-ийн параметрүүд (estimator__ угтвартай)
+TREE_PARAMS = ('max_depth', 'min_samples_leaf')
+
+
+# ==========================
+# Өгөгдөл
+# ==========================
+def load_training_frame(name, engine=None):
+    """Цагийн сан + температураас сургалтын feature хүснэгт (main.py-тай ижил)"""
+    target = TARGETS[name]
+    update_hourly_store(engine or get_engine())
+    df_load = target['frame'](load_hourly_store(), tz_offset_hours=target['tz_offset_hours'])
+    if df_load.empty:
+        raise RuntimeError("Цагийн өгөгдөл олдсонгүй")
+
+    df_temp = get_temperature_history(
+        df_load['time_'].min().strftime('%Y-%m-%d'),
+        df_load['time_'].max().strftime('%Y-%m-%d')
+    )
+    # Feature сангаас зөвхөн сургалтад хэрэгтэй баганууд. Температур нь зөвхөн Archive-ийнх
+    # (main.py-д Forecast API-ийн өнөөдөр нэмэгддэг) тул main.py-н санг биш тусдаа санг ашиглана
+    columns = ['load'] + sorted(set(DAILY_FEATURES) | set(HOURLY_FEATURES))
+    return feature_frame(f"{name}_training", df_load, df_temp, weekday=target['weekday'], columns=columns)
+
+
+# ==========================
+# Хайлт
+# ==========================
+def param_grid(search_space, engine):
+    """search_space → HalvingGridSearchCV-ийн param_grid"""
+    nested = TREE_PARAMS if engine == 'adaboost' else ()
+    return {
+        (f'estimator__{key}' if key in nested else key): list(values)
+        for key, values in search_space.items()
+    }
+
+
+def model_params(grid_params, base_params):
+    """
+    HalvingGridSearchCV-ийн params → MODEL_CONFIG['daily'|'hourly'] хэлбэр.
+    Grid-д ороогүй утгууд (n_estimators, max_depth г.м.) base_params-аасаа үлдэнэ
+    """
+    params = dict(base_params, engine=engine_name(base_params))
+    params.update((key.replace('estimator__', ''), value) for key, value in grid_params.items())
+    return params
+
+
+def search(X, y, base_params, search_space=None):
+    """
+    Нэг моделийн successive halving хайлт.
+    Буцаах утга: нэр дэвшигч бүр × шат бүрийн үр дүнгийн хүснэгт
+    """
+    engine = engine_name(base_params)
+    search_space = search_space or TUNING_CONFIG['search_space'][engine]
+    cv = HalvingGridSearchCV(
+        build_regressor(base_params),
+        param_grid(search_space, engine),
+        cv=TimeSeriesSplit(n_splits=TUNING_CONFIG['n_splits']),
+        factor=TUNING_CONFIG['factor'],
+        resource='n_samples',
+        min_resources=TUNING_CONFIG['min_resources'],
+        scoring='neg_mean_absolute_error',
+        refit=False,
+        n_jobs=TUNING_CONFIG['max_workers'],
+        random_state=base_params['random_state'],
+    )
+    cv.fit(X, y)
+
+    results = cv.cv_results_
+    return pd.DataFrame({
+        'iter': results['iter'],
+        'n_resources': results['n_resources'],
+        'params': [model_params(p, base_params) for p in results['params']],
+        'mae': -results['mean_test_score'],
+        'mae_std': results['std_test_score'],
+        'fit_seconds': results['mean_fit_time'],
+        'predict_seconds': results['mean_score_time'],
+    })
+
+
+def pareto_front(df_results):
+    """Сүүлийн шатны нэр дэвшигчдээс MAE / хугацааны аль алинаар давамгайлагдаагүй нь"""
+    df = df_results[df_results['iter'] == df_results['iter'].max()]
+    df = df.sort_values(['fit_seconds', 'mae'])
+    return df[df['mae'] < df['mae'].cummin().shift(fill_value=np.inf)].reset_index(drop=True)
+
+
+def select_best(df_results, tolerance=None):
+    """MAE нь хамгийн сайнаасаа tolerance дотор байгаа хамгийн хурдан нэр дэвшигч"""
+    tolerance = TUNING_CONFIG['mae_tolerance'] if tolerance is None else tolerance
+    df = df_results[df_results['iter'] == df_results['iter'].max()]
+    close = df[df['mae'] <= df['mae'].min() * (1 + tolerance)]
+    return close.sort_values(['fit_seconds', 'mae']).iloc[0]
+
+
+def _format_params(params):
+    return ', '.join(f"{k}={v}" for k, v in params.items() if k not in ('engine', 'random_state'))
+
+
+def print_summary(kind, df_results, best):
+    """Шат бүрийн товч тайлан + Pareto"""
+    engine = df_results['params'].iloc[0]['engine']
+    print(f"\n📊 {kind} ({engine}): {df_results['params'].map(str).nunique()} нэр дэвшигч, "
+          f"{df_results['iter'].max() + 1} шат")
+    for it, df_iter in df_results.groupby('iter'):
+        print(f"   Шат {it + 1}: {len(df_iter)} нэр дэвшигч × {df_iter['n_resources'].iloc[0]} мөр, "
+              f"шилдэг MAE {df_iter['mae'].min():.2f}")
+
+    print("   ⚖️ Нарийвчлал / хурд (сүүлийн шат):")
+    for _, row in pareto_front(df_results).iterrows():
+        print(f"      MAE {row['mae']:8.2f}  сургалт {row['fit_seconds']:6.2f} сек  "
+              f"predict {row['predict_seconds']:.3f} сек  {_format_params(row['params'])}")
+    print(f"   ✅ Сонгосон: MAE {best['mae']:.2f}, {best['fit_seconds']:.2f} сек - {_format_params(best['params'])}")
+
+
+# ==========================
+# CLI
+# ==========================
+def parse_args(argv):
+    """python tune.py <main|system_total> [--kind daily|hourly]"""
+    name = argv[0] if argv and not argv[0].startswith('--') else 'main'
+    if name not in TARGETS:
+        raise ValueError(f"Нэр нь {tuple(TARGETS)}-ийн нэг байх ёстой: {name}")
+    kinds = list(KINDS)
+    for i, arg in enumerate(argv):
+        if arg == '--kind' and i + 1 < len(argv):
+            kinds = [argv[i + 1]]
+        elif arg.startswith('--kind='):
+            kinds = [arg.split('=', 1)[1]]
+    if any(kind not in KINDS for kind in kinds):
+        raise ValueError(f"--kind нь {tuple(KINDS)}-ийн нэг байх ёстой: {kinds}")
+    return name, kinds
+
+
+def main(argv=None):
+    name, kinds = parse_args(sys.argv[1:] if argv is None else argv)
+    started = time.perf_counter()
+
+    print(f"🔧 Hyperparameter тааруулалт: {name} ({', '.join(kinds)})")
+    df = load_training_frame(name)
+    print(f"   Сургалтын өгөгдөл: {len(df)} мөр, {df['time_'].min()} → {df['time_'].max()}")
+
+    # Эхлэх цэг нь одоогийн (өмнө нь тааруулсан байж болох) тохиргоо
+    model_config = {k: (dict(v) if isinstance(v, dict) else v)
+                    for k, v in tuned_model_config(name, MODEL_CONFIG).items()}
+    report = {'data_end': df['time_'].max(), 'rows': len(df)}
+
+    y = df['load'].to_numpy(dtype='float64')
+    for kind in kinds:
+        # Нэг удаа бодсон, C-contiguous float64 матриц (worker-ууд memmap-аар хуваалцана)
+        X = np.ascontiguousarray(df[KINDS[kind]].to_numpy(dtype='float64'))
+        df_results = search(X, y, model_config[kind])
+        best = select_best(df_results)
+        print_summary(kind, df_results, best)
+
+        model_config[kind] = best['params']
+        report[kind] = {
+            'mae': round(float(best['mae']), 3),
+            'fit_seconds': round(float(best['fit_seconds']), 3),
+            'candidates': int(df_results['params'].map(str).nunique()),
+            'pareto': [
+                {'params': row['params'], 'mae': round(float(row['mae']), 3),
+                 'fit_seconds': round(float(row['fit_seconds']), 3)}
+                for _, row in pareto_front(df_results).iterrows()
+            ],
+        }
+
+    path = save_tuned_config(name, model_config, MODEL_CONFIG, report)
+    print(f"\n💾 Тохиргоо хадгалагдлаа: {path}")
+    print(f"⏱️ Нийт хугацаа: {time.perf_counter() - started:.1f} сек")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Open-Meteo температур + локал кэш
+- Archive API: түүхийн цагийн температур
+- Forecast API: өнөөдрийн температур
+- Дутуу хугацааг chunk болгон хувааж thread pool-оор зэрэг татах
+  (нэг keep-alive session, timeout, exponential backoff retry, token bucket rate limit)
+- SQLite кэш: (байршил, цаг) түлхүүртэй температур + аль өдрүүд татагдсаныг
+  хадгалах coverage индекс. Зөвхөн дутуу өдрүүдийг API-аас татна.
+  Archive API сүүлийн хэдэн өдөрт null буцаадаг тул дутуу өдрийг
+  WEATHER_CONFIG['incomplete_retry_hours'] цагийн дараа л дахин татна.
+"""
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import LOCATION, WEATHER_CONFIG
+from offline import install
+
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+
+# ==========================
+# HTTP session + rate limit
+# ==========================
+class TokenBucket:
+    """Энгийн token bucket: секундэд rate токен, хамгийн ихдээ burst"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Токен гартал хүлээх"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def _make_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=WEATHER_CONFIG['max_workers'])
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    # OFFLINE_MODE=record/replay бол hook эсвэл stub adapter суулгана
+    return install(session)
+
+
+_session = _make_session()
+_rate_limiter = TokenBucket(WEATHER_CONFIG['rate_per_second'], WEATHER_CONFIG['burst'])
+
+
+# ==========================
+# Open-Meteo API
+# ==========================
+def get_temperature_openmeteo(start_date, end_date):
+    """Open-Meteo Archive API - Түүхийн температур"""
+    params = {
+        "latitude": LOCATION['latitude'],
+        "longitude": LOCATION['longitude'],
+        "start_date": start_date,
+        "end_date": end_date,
+        "hourly": "temperature_2m",
+        "timezone": LOCATION['timezone']
+    }
+
+    _rate_limiter.acquire()
+    response = _session.get(ARCHIVE_URL, params=params, timeout=WEATHER_CONFIG['timeout'])
+    response.raise_for_status()
+    data = response.json()
+
+    df = pd.DataFrame({
+        'time_': pd.to_datetime(data['hourly']['time']),
+        'temp': data['hourly']['temperature_2m']
+    })
+
+    return df
+
+
+def get_temperature_forecast():
+    """Open-Meteo Forecast API - Өнөөдрийн температур"""
+    params = {
+        "latitude": LOCATION['latitude'],
+        "longitude": LOCATION['longitude'],
+        "hourly": "temperature_2m",
+        "timezone": LOCATION['timezone'],
+        "past_days": 1,
+        "forecast_days": 1
+    }
+
+    _rate_limiter.acquire()
+    response = _session.get(FORECAST_URL, params=params, timeout=WEATHER_CONFIG['timeout'])
+    response.raise_for_status()
+    data = response.json()
+
+    df = pd.DataFrame({
+        'time_': pd.to_datetime(data['hourly']['time']),
+        'temp': data['hourly']['temperature_2m']
+    })
+
+    return df
+
+
+def fetch_archive_with_retry(start_date, end_date):
+    """Нэг chunk татах - алдаа гарвал exponential backoff-оор дахин оролдоно"""
+    max_retries = WEATHER_CONFIG['max_retries']
+    for attempt in range(max_retries + 1):
+        try:
+            return get_temperature_openmeteo(start_date, end_date)
+        except (requests.RequestException, ValueError, KeyError) as e:
+            if attempt == max_retries:
+                raise
+            wait = WEATHER_CONFIG['backoff_seconds'] * (2 ** attempt)
+            print(f"   ⚠️ {start_date} ~ {end_date} алдаа ({e}), {wait:.0f} сек дараа дахин оролдоно...")
+            time.sleep(wait)
+
+
+def split_chunks(ranges, chunk_days=None):
+    """(start, end) хугацаануудыг chunk_days өдрийн хэсгүүд болгох"""
+    chunk_days = chunk_days or WEATHER_CONFIG['chunk_days']
+    chunks = []
+    for range_start, range_end in ranges:
+        chunk_start = pd.Timestamp(range_start)
+        range_end = pd.Timestamp(range_end)
+        while chunk_start <= range_end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), range_end)
+            chunks.append((chunk_start.strftime('%Y-%m-%d'), chunk_end.strftime('%Y-%m-%d')))
+            chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def fetch_archive_parallel(chunks):
+    """
+    Chunk-уудыг thread pool-оор зэрэг татах.
+    Буцаах утга: ([(start, end, df), ...], [(start, end, алдаа), ...])
+    """
+    results, failed = [], []
+    if not chunks:
+        return results, failed
+
+    with ThreadPoolExecutor(max_workers=WEATHER_CONFIG['max_workers']) as executor:
+        futures = {
+            executor.submit(fetch_archive_with_retry, chunk_start, chunk_end): (chunk_start, chunk_end)
+            for chunk_start, chunk_end in chunks
+        }
+        for future in as_completed(futures):
+            chunk_start, chunk_end = futures[future]
+            try:
+                results.append((chunk_start, chunk_end, future.result()))
+            except Exception as e:
+                failed.append((chunk_start, chunk_end, e))
+
+    return results, failed
+
+
+# ==========================
+# SQLite кэш
+# ==========================
+def _location_key():
+    return round(LOCATION['latitude'], 4), round(LOCATION['longitude'], 4)
+
+
+def _connect(cache_path=None):
+    con = sqlite3.connect(cache_path or WEATHER_CONFIG['cache_path'])
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS temperature (
+            lat REAL, lon REAL, time_ TEXT, temp REAL,
+            PRIMARY KEY (lat, lon, time_)
+        )
+    """)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS coverage (
+            lat REAL, lon REAL, day TEXT, complete INTEGER, fetched_at TEXT,
+            PRIMARY KEY (lat, lon, day)
+        )
+    """)
+    return con
+
+
+def covered_days(con, start_date, end_date):
+    """Кэшэд бүрэн (24 цаг) байгаа эсвэл саяхан татаж үзсэн өдрүүд"""
+    lat, lon = _location_key()
+    retry_after = (datetime.now() - timedelta(hours=WEATHER_CONFIG['incomplete_retry_hours'])).strftime('%Y-%m-%d %H:%M:%S')
+    rows = con.execute(
+        "SELECT day FROM coverage WHERE lat = ? AND lon = ? AND day BETWEEN ? AND ? "
+        "AND (complete = 1 OR fetched_at >= ?)",
+        (lat, lon, start_date, end_date, retry_after)
+    ).fetchall()
+    return {r[0] for r in rows}
+
+
+def missing_ranges(con, start_date, end_date):
+    """Кэшэд байхгүй өдрүүдийг үргэлжилсэн (start, end) хэсгүүд болгох"""
+    covered = covered_days(con, start_date, end_date)
+    days = pd.date_range(start_date, end_date, freq='D').strftime('%Y-%m-%d')
+
+    ranges = []
+    range_start = prev = None
+    for day in days:
+        if day in covered:
+            continue
+        if range_start is not None and day == (pd.Timestamp(prev) + timedelta(days=1)).strftime('%Y-%m-%d'):
+            prev = day
+            continue
+        if range_start is not None:
+            ranges.append((range_start, prev))
+        range_start = prev = day
+    if range_start is not None:
+        ranges.append((range_start, prev))
+
+    return ranges
+
+
+def store_temperature(con, df, start_date, end_date):
+    """Температурыг кэшэд бичиж, татсан өдрүүдийг coverage-д тэмдэглэх"""
+    lat, lon = _location_key()
+    fetched_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    df = df.dropna(subset=['temp'])
+
+    times = df['time_'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    con.executemany(
+        "INSERT OR REPLACE INTO temperature (lat, lon, time_, temp) VALUES (?, ?, ?, ?)",
+        [(lat, lon, t, float(v)) for t, v in zip(times, df['temp'])]
+    )
+
+    # 24 цаг бүрэн биш өдрүүдийг complete = 0 гэж тэмдэглэнэ
+    hours_per_day = df.groupby(df['time_'].dt.strftime('%Y-%m-%d')).size()
+    days = pd.date_range(start_date, end_date, freq='D').strftime('%Y-%m-%d')
+    con.executemany(
+        "INSERT OR REPLACE INTO coverage (lat, lon, day, complete, fetched_at) VALUES (?, ?, ?, ?, ?)",
+        [(lat, lon, day, int(hours_per_day.get(day, 0) >= 24), fetched_at) for day in days]
+    )
+    con.commit()
+    return int((hours_per_day >= 24).sum())
+
+
+def load_temperature(con, start_date, end_date):
+    """Кэшээс хугацааны температурыг унших"""
+    lat, lon = _location_key()
+    df = pd.read_sql_query(
+        "SELECT time_, temp FROM temperature WHERE lat = ? AND lon = ? AND time_ >= ? AND time_ < ? ORDER BY time_",
+        con,
+        params=(lat, lon, start_date, (pd.Timestamp(end_date) + timedelta(days=1)).strftime('%Y-%m-%d'))
+    )
+    df['time_'] = pd.to_datetime(df['time_'])
+    return df
+
+
+def get_temperature_history(start_date, end_date, cache_path=None):
+    """
+    start_date ~ end_date хугацааны цагийн температур (кэштэй).
+    Кэшэд байгаа өдрүүдийг API-аас дахин татахгүй.
+    """
+    con = _connect(cache_path)
+    try:
+        ranges = missing_ranges(con, start_date, end_date)
+        if not ranges:
+            print("   ✅ Бүх өдөр кэшэд байна (API дуудлагагүй)")
+
+        chunks = split_chunks(ranges)
+        if chunks:
+            print(f"   → {len(chunks)} chunk зэрэг татаж байна ({WEATHER_CONFIG['max_workers']} thread)...")
+
+        results, failed = fetch_archive_parallel(chunks)
+
+        # SQLite холболт thread-safe биш тул үндсэн thread дээр бичнэ
+        for chunk_start, chunk_end, df_chunk in results:
+            store_temperature(con, df_chunk, chunk_start, chunk_end)
+
+        # Амжилтгүй chunk coverage-д орохгүй тул дараагийн удаа дахин татагдана
+        for chunk_start, chunk_end, e in failed:
+            print(f"   ❌ {chunk_start} ~ {chunk_end}: {WEATHER_CONFIG['max_retries']} удаа оролдоод амжилтгүй ({e})")
+
+        return load_temperature(con, start_date, end_date)
+    finally:
+        con.close()